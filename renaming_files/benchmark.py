@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Measure throughput of discovery, renaming, collection generation and validation.
+Synthesizes source_folder/WGS_CSBD and source_folder/GBDF trees using the real TS folder
+naming patterns, runs each pipeline stage separately and reports the timings as JSON.
+
+Usage:
+    python benchmark.py                                        # small default run
+    python benchmark.py --ts-folders 1000 --payloads 500 --payload-size 4096 --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+from typing import Dict, List, Any, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from dynamic_models import discover_ts_folders, WGS_CSBD_FAMILIES, GBDF_FAMILIES
+from main_processor import rename_files
+from postman_generator import PostmanCollectionGenerator, BODY_MODES
+
+
+# Bumped whenever the report layout changes, so stored results stay comparable
+BENCHMARK_VERSION = 1
+
+# Folder name per model family, matching the patterns in dynamic_models.MODEL_FAMILIES
+FAMILY_FOLDER_TEMPLATES = {
+    "revenue": "TS_{ts}_REVENUE_WGS_CSBD_{edit_id}_{code}_sur",
+    "revenue_sub_edit": "TS_{ts}_Revenue code Services not payable on Facility claim Sub Edit 5_WGS_CSBD_{edit_id}_{code}_sur",
+    "lab_panel": "TS_{ts}_Lab panel Model_WGS_CSBD_{edit_id}_{code}_sur",
+    "recovery_room": "TS_{ts}_Recovery Room Reimbursement_WGS_CSBD_{edit_id}_{code}_sur",
+    "covid": "TS_{ts}_Covid_WGS_CSBD_{edit_id}_{code}_sur",
+    "laterality": "TS_{ts}_Laterality Policy-Disgnosis to Diagnosis_WGS_CSBD_{edit_id}_{code}_sur",
+    "device_dependent": "TS_{ts}_Device Dependent Procedures(R1)-1B_WGS_CSBD_{edit_id}_{code}_sur",
+    "revenue_model": "TS_{ts}_revenue model_WGS_CSBD_{edit_id}_{code}_sur",
+    "revenue_hcpcs": "TS_{ts}_Revenue Code to HCPCS Xwalk-1B_WGS_CSBD_{edit_id}_{code}_sur",
+    "incidental": "TS_{ts}_Incidentcal Services Facility_WGS_CSBD_{edit_id}_{code}_sur",
+    "revenue_model_v3": "TS_{ts}_Revenue model CR v3_WGS_CSBD_{edit_id}_{code}_sur",
+    "hcpcs_revenue": "TS_{ts}_HCPCS to Revenue Code Xwalk_WGS_CSBD_{edit_id}_{code}_sur",
+    "multiple_em": "TS_{ts}_Multiple E&M Same day_WGS_CSBD_{edit_id}_{code}_sur",
+    "gbdf_covid": "TS_{ts}_Covid_gbdf_mcr_{edit_id}_{code}_sur",
+}
+
+# Source filename suffixes, in the proportions they are generated
+PAYLOAD_SUFFIXES = ["deny", "bypass", "market", "date"]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _make_payload(index: int, payload_size: int) -> str:
+    """Build a claim-like JSON payload of roughly payload_size bytes."""
+    claim = {
+        "claim": {
+            "id": f"CLM{index:09d}",
+            "member": {"id": f"MBR{index:08d}", "plan": "WGS"},
+            "lines": []
+        }
+    }
+    line_number = 0
+    text = json.dumps(claim, indent=2)
+    while len(text) < payload_size:
+        line_number += 1
+        claim["claim"]["lines"].append({
+            "line": line_number,
+            "revenue_code": f"0{line_number % 1000:03d}",
+            "hcpcs": f"G{line_number % 10000:04d}",
+            "units": line_number % 7 + 1,
+            "charge": round(line_number * 12.5, 2)
+        })
+        text = json.dumps(claim, indent=2)
+    return text
+
+
+def build_source_tree(work_dir: str, ts_folders: int, gbdf_folders: int, payloads: int,
+                      payload_size: int) -> Dict[str, int]:
+    """Create a synthetic source_folder tree under work_dir.
+
+    WGS_CSBD folders cycle through every WGS_CSBD model family; each TS folder gets a
+    regression subfolder with `payloads` files in the TC#XX_XXXXX#suffix.json template.
+
+    Args:
+        work_dir: Directory to create source_folder in
+        ts_folders: Number of WGS_CSBD TS folders
+        gbdf_folders: Number of GBDF TS folders
+        payloads: Payload files per TS folder
+        payload_size: Approximate size of each payload in bytes
+
+    Returns:
+        Dictionary with the number of folders, files and bytes created
+    """
+    # Payload sizes vary slightly with the line count, so a handful of variants is plenty
+    payload_texts = [_make_payload(i, payload_size).encode('utf-8') for i in range(8)]
+    stats = {"folders": 0, "files": 0, "bytes": 0}
+
+    for tree, count, families in (("WGS_CSBD", ts_folders, WGS_CSBD_FAMILIES), ("GBDF", gbdf_folders, GBDF_FAMILIES)):
+        base_dir = os.path.join(work_dir, "source_folder", tree)
+        os.makedirs(base_dir, exist_ok=True)
+
+        for k in range(count):
+            family = families[k % len(families)]
+            # TS numbers are at most 3 digits; unique edit IDs keep folder names distinct
+            folder_name = FAMILY_FOLDER_TEMPLATES[family].format(
+                ts=f"{k % 999 + 1:02d}", edit_id=f"bench{tree[0].lower()}{k:05d}", code=f"00W{k % 100:02d}"
+            )
+            regression_dir = os.path.join(base_dir, folder_name, "regression")
+            os.makedirs(regression_dir)
+            stats["folders"] += 1
+
+            for i in range(payloads):
+                data = payload_texts[i % len(payload_texts)]
+                suffix = PAYLOAD_SUFFIXES[i % len(PAYLOAD_SUFFIXES)]
+                with open(os.path.join(regression_dir, f"TC#{i:05d}_{k:05d}#{suffix}.json"), 'wb') as f:
+                    f.write(data)
+                stats["files"] += 1
+                stats["bytes"] += len(data)
+
+    return stats
+
+
+def _tree_size(paths: List[str]) -> Dict[str, int]:
+    """Count the files and bytes of JSON files directly inside each of `paths`."""
+    files = 0
+    total = 0
+    for path in paths:
+        if not os.path.isdir(path):
+            continue
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    files += 1
+                    total += entry.stat().st_size
+    return {"files": files, "bytes": total}
+
+
+def _stage_result(seconds: float, files: int, total_bytes: int, **extra) -> Dict[str, Any]:
+    result = {
+        "seconds": round(seconds, 4),
+        "files": files,
+        "bytes": total_bytes,
+        "files_per_sec": round(files / seconds, 1) if seconds > 0 else None,
+        "mb_per_sec": round(total_bytes / (1024 * 1024) / seconds, 2) if seconds > 0 else None,
+        # ru_maxrss is a high-water mark, so this is the peak up to the end of the stage
+        "peak_rss_mb": _peak_rss_mb()
+    }
+    result.update(extra)
+    return result
+
+
+def run_benchmark(work_dir: str, ts_folders: int = 20, gbdf_folders: int = 2, payloads: int = 50,
+                  payload_size: int = 2048, body_mode: str = "pretty", read_concurrency: int = 1) -> Dict[str, Any]:
+    """Synthesize a source tree in work_dir and time each pipeline stage.
+
+    The working directory is switched to work_dir for the run, since the pipeline uses
+    paths relative to it. Console output of the stages is discarded so printing does
+    not dominate the timings.
+
+    Args:
+        work_dir: Empty directory to build the tree in
+        ts_folders: Number of WGS_CSBD TS folders
+        gbdf_folders: Number of GBDF TS folders
+        payloads: Payload files per TS folder
+        payload_size: Approximate size of each payload in bytes
+        body_mode: Body mode used for collection generation
+        read_concurrency: Payload files read in parallel during collection generation
+
+    Returns:
+        Benchmark report dictionary
+    """
+    original_cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        start = time.perf_counter()
+        tree = build_source_tree(".", ts_folders, gbdf_folders, payloads, payload_size)
+        setup_seconds = time.perf_counter() - start
+
+        stages = {}
+        devnull = open(os.devnull, 'w')
+        try:
+            with contextlib.redirect_stdout(devnull):
+                base_dirs = [(os.path.join("source_folder", "WGS_CSBD"), False),
+                             (os.path.join("source_folder", "GBDF"), True)]
+
+                # Discovery, cold (full scan) and warm (served from the discovery cache)
+                start = time.perf_counter()
+                models = []
+                for base_dir, _ in base_dirs:
+                    models.extend(discover_ts_folders(base_dir, use_wgs_csbd_destination=True, refresh=True))
+                stages["discover"] = _stage_result(time.perf_counter() - start, tree["folders"], 0,
+                                                   models=len(models))
+
+                start = time.perf_counter()
+                cached_count = sum(len(discover_ts_folders(base_dir, use_wgs_csbd_destination=True))
+                                   for base_dir, _ in base_dirs)
+                stages["discover_cached"] = _stage_result(time.perf_counter() - start, tree["folders"], 0,
+                                                          models=cached_count)
+
+                # Renaming and moving
+                start = time.perf_counter()
+                for model in models:
+                    rename_files(model["edit_id"], model["code"], model["source_dir"], model["dest_dir"],
+                                 generate_postman=False)
+                seconds = time.perf_counter() - start
+                moved = _tree_size([model["dest_dir"] for model in models])
+                stages["rename"] = _stage_result(seconds, moved["files"], moved["bytes"])
+
+                # Collection generation, one collection per model as main_processor does
+                collections = []
+                start = time.perf_counter()
+                for model in models:
+                    output_dir = os.path.join("postman_collections", "GBDF" if "GBDF" in model["dest_dir"] else "WGS_CSBD")
+                    os.makedirs(output_dir, exist_ok=True)
+                    generator = PostmanCollectionGenerator(source_dir=model["dest_dir"], output_dir=output_dir,
+                                                           body_mode=body_mode,
+                                                           read_concurrency=read_concurrency)
+                    path = generator.generate_postman_collection(model["postman_collection_name"],
+                                                                 model["postman_file_name"])
+                    if path:
+                        collections.append((generator, path))
+                seconds = time.perf_counter() - start
+                collection_bytes = sum(os.path.getsize(path) for _, path in collections)
+                stages["generate"] = _stage_result(seconds, moved["files"], moved["bytes"],
+                                                   collections=len(collections), output_bytes=collection_bytes)
+
+                # Validation of every generated collection
+                start = time.perf_counter()
+                invalid = sum(1 for generator, path in collections if not generator.validate_collection(path)["valid"])
+                stages["validate"] = _stage_result(time.perf_counter() - start, len(collections), collection_bytes,
+                                                   invalid=invalid)
+        finally:
+            devnull.close()
+    finally:
+        os.chdir(original_cwd)
+
+    return {
+        "benchmark_version": BENCHMARK_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "ts_folders": ts_folders,
+            "gbdf_folders": gbdf_folders,
+            "payloads": payloads,
+            "payload_size": payload_size,
+            "body_mode": body_mode,
+            "read_concurrency": read_concurrency
+        },
+        "setup": {"seconds": round(setup_seconds, 4), **tree},
+        "stages": stages,
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+
+def main():
+    """Main function for standalone execution."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark TS discovery, renaming, Postman generation and validation on a synthetic tree"
+    )
+    parser.add_argument("--ts-folders", type=int, default=20, help="Number of WGS_CSBD TS folders (default: 20)")
+    parser.add_argument("--gbdf-folders", type=int, default=2, help="Number of GBDF TS folders (default: 2)")
+    parser.add_argument("--payloads", type=int, default=50, help="Payload files per TS folder (default: 50)")
+    parser.add_argument("--payload-size", type=int, default=2048, help="Approximate payload size in bytes (default: 2048)")
+    parser.add_argument("--body-mode", choices=BODY_MODES, default="pretty", help="Body mode for collection generation")
+    parser.add_argument("--read-concurrency", type=int, default=1, help="Payload files read in parallel (default: 1)")
+    parser.add_argument("--work-dir", help="Directory to build the synthetic tree in (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic tree after the run")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+
+    args = parser.parse_args()
+
+    if args.work_dir:
+        work_dir = os.path.abspath(args.work_dir)
+        if os.path.exists(work_dir) and os.listdir(work_dir):
+            print(f"ERROR: Work directory '{work_dir}' is not empty", file=sys.stderr)
+            sys.exit(1)
+        os.makedirs(work_dir, exist_ok=True)
+    else:
+        work_dir = tempfile.mkdtemp(prefix="ts_benchmark_")
+
+    try:
+        report = run_benchmark(work_dir, args.ts_folders, args.gbdf_folders, args.payloads,
+                               args.payload_size, args.body_mode, args.read_concurrency)
+    finally:
+        if args.keep:
+            print(f"Synthetic tree kept in: {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+        print(f"SUCCESS: Benchmark report written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Collection Checks - Per-item checks for Postman collections.
+Used by PostmanCollectionGenerator.validate_collection. Items are checked as they are
+read from the collection, either in-process or in chunks on a pool of worker processes
+so that parsing every embedded body of a large suite is spread across all cores.
+"""
+
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, wait
+from typing import Any, List, Optional, Tuple
+
+from filename_parser import SUFFIX_LOOKUP, parse_filename
+
+
+# A chunk is handed to a worker once it holds this many items or body characters
+CHUNK_ITEMS = 256
+CHUNK_CHARS = 1 << 22
+
+# Suffixes allowed in the renamed (5-part) template
+RENAMED_SUFFIXES = frozenset(SUFFIX_LOOKUP.values())
+
+
+def check_item(item: Any, minimal: bool, check_names: bool = False) -> List[str]:
+    """Check one collection item (v2.1 or minimal format).
+
+    Args:
+        item: Decoded collection item
+        minimal: True for the minimal format (request fields on the item itself)
+        check_names: Also check that request names follow the TC#id#edit#code#suffix template
+
+    Returns:
+        List of problems found, empty if the item is fine
+    """
+    if not isinstance(item, dict):
+        return ["not an object"]
+    name = item.get("name")
+    label = f"'{name}'" if isinstance(name, str) else "(unnamed)"
+    problems = []
+    if not isinstance(name, str) or not name:
+        problems.append("missing name")
+
+    if minimal:
+        request = item
+    else:
+        if "request" not in item and isinstance(item.get("item"), list):
+            # v2.1 folder
+            for index, child in enumerate(item["item"], 1):
+                problems.extend(f"{label} > item {index}: {problem}"
+                                for problem in check_item(child, minimal=False, check_names=check_names))
+            return problems
+        request = item.get("request")
+        if isinstance(request, str):
+            # A request given only by its URL
+            request = {"method": "GET", "url": request}
+        elif not isinstance(request, dict):
+            return problems + [f"{label}: missing request"]
+
+    if check_names and isinstance(name, str) and name:
+        parsed = parse_filename(name + ".json")
+        if parsed is None or not parsed.is_renamed or not all(parsed):
+            problems.append(f"{label}: name does not match TC#id#edit#code#suffix")
+        elif parsed.suffix not in RENAMED_SUFFIXES:
+            problems.append(f"{label}: unknown suffix '{parsed.suffix}'")
+
+    if not isinstance(request.get("method"), str) or not request.get("method"):
+        problems.append(f"{label}: missing request method")
+    url = request.get("url")
+    if not (isinstance(url, str) and url) and not (isinstance(url, dict) and (url.get("raw") or url.get("host"))):
+        problems.append(f"{label}: missing request URL")
+
+    body = request.get("body")
+    if isinstance(body, dict) and body.get("mode") == "raw":
+        raw = body.get("raw")
+        language = ((body.get("options") or {}).get("raw") or {}).get("language", "json")
+        if not isinstance(raw, str):
+            problems.append(f"{label}: raw body is not a string")
+        elif language == "json" and raw.strip():
+            try:
+                json.loads(raw)
+            except ValueError as e:
+                problems.append(f"{label}: raw body is not valid JSON ({e})")
+    return problems
+
+
+def _check_chunk(chunk: List[Tuple[int, Any, bool]], check_names: bool) -> List[Tuple[int, str]]:
+    """Check a chunk of (index, item, minimal) entries; runs in a worker process."""
+    return [(index, problem)
+            for index, item, minimal in chunk
+            for problem in check_item(item, minimal, check_names)]
+
+
+def _item_chars(item: Any) -> int:
+    """Rough size of an item: the length of its raw body, which dominates checking time."""
+    if isinstance(item, dict):
+        request = item.get("request", item)
+        body = request.get("body") if isinstance(request, dict) else None
+        if isinstance(body, dict) and isinstance(body.get("raw"), str):
+            return len(body["raw"])
+    return 0
+
+
+class ItemChecker:
+    """Check collection items as they are read, optionally on a pool of worker processes.
+
+    Items are added in collection order with add(). With one job each item is checked
+    straight away; otherwise items are batched into chunks for the workers. finish()
+    waits for the outstanding chunks and returns every problem found, ordered by item index.
+    """
+
+    def __init__(self, check_names: bool = False, jobs: int = 1, time_budget: Optional[float] = None):
+        """Create a checker.
+
+        Args:
+            check_names: Also check request names against the renamed template
+            jobs: Worker processes to check chunks on; 1 checks in-process
+            time_budget: Seconds after which no further items are checked (None for no limit)
+        """
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        self.check_names = check_names
+        self.jobs = jobs
+        self.deadline = time.monotonic() + time_budget if time_budget is not None else None
+        self.checked = 0
+        self.skipped = 0
+        self._problems: List[Tuple[int, str]] = []
+        self._chunk: List[Tuple[int, Any, bool]] = []
+        self._chunk_chars = 0
+        # (future, item count) for chunks handed to the pool, oldest first
+        self._pending = deque()
+        self._executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+
+    def __enter__(self) -> "ItemChecker":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes, dropping chunks not yet started.
+
+        Chunks already running are waited for; each is at most CHUNK_CHARS of bodies, so
+        this overruns the time budget by little.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def expired(self) -> bool:
+        """True once the time budget is used up."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def _time_left(self) -> Optional[float]:
+        """Seconds left in the time budget (None for no limit)."""
+        return max(0.0, self.deadline - time.monotonic()) if self.deadline is not None else None
+
+    def add(self, index: int, item: Any, minimal: bool):
+        """Queue an item for checking (skipped once the time budget is used up)."""
+        if self.expired():
+            self.skipped += 1
+            return
+        if self._executor is None:
+            self._problems.extend((index, problem) for problem in check_item(item, minimal, self.check_names))
+            self.checked += 1
+            return
+        self._chunk.append((index, item, minimal))
+        self._chunk_chars += _item_chars(item)
+        if len(self._chunk) >= CHUNK_ITEMS or self._chunk_chars >= CHUNK_CHARS:
+            self._flush()
+
+    def _flush(self):
+        """Hand the current chunk to the pool."""
+        chunk, self._chunk, self._chunk_chars = self._chunk, [], 0
+        if not chunk:
+            return
+        self._pending.append((self._executor.submit(_check_chunk, chunk, self.check_names), len(chunk)))
+        # Bound the items held in memory: wait for the oldest chunk once every worker has a spare one queued
+        while len(self._pending) > self.jobs * 2:
+            future, count = self._pending.popleft()
+            try:
+                problems = future.result(timeout=self._time_left())
+            except TimeoutError:
+                # Out of time: abandoned like the chunks still unfinished in finish()
+                future.cancel()
+                self.skipped += count
+                continue
+            self._problems.extend(problems)
+            self.checked += count
+
+    def finish(self) -> List[Tuple[int, str]]:
+        """Check the remaining items and return all problems as (item index, problem) pairs.
+
+        Chunks still unfinished when the time budget runs out are abandoned and counted
+        as skipped.
+        """
+        try:
+            self._flush()
+            if self._pending:
+                wait([future for future, _ in self._pending], timeout=self._time_left())
+                for future, count in self._pending:
+                    if future.done():
+                        self._problems.extend(future.result())
+                        self.checked += count
+                    else:
+                        self.skipped += count
+                self._pending.clear()
+        finally:
+            self.close()
+        self._problems.sort(key=lambda entry: entry[0])
+        return self._problems
@@ -0,0 +1,280 @@
+"""
+Collection Stream - Read a Postman collection file one request at a time.
+Used by PostmanCollectionGenerator.validate_collection so that checking a collection of
+any size only needs memory for its largest single item, not for the whole document, and
+by the generator to check large payload files without reading them into one string.
+"""
+
+import json
+import re
+from typing import Any, Iterable, Iterator, Optional, TextIO, Tuple
+
+
+# Text read from the file at a time; a buffer is grown beyond this only for larger items
+CHUNK_SIZE = 1 << 16
+
+# A value ending this close to the end of the buffer may continue past it (e.g. "1." + "5")
+_BOUNDARY_SLACK = 16
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+# Only checks syntax: every parsed value is dropped straight away
+_CHECKING_DECODER = json.JSONDecoder(
+    object_pairs_hook=lambda pairs: None,
+    parse_float=lambda text: None,
+    parse_int=lambda text: None,
+    parse_constant=lambda text: None
+)
+
+# Events yielded by iter_collection
+VALUE = "value"
+ARRAY = "array"
+ELEMENT = "element"
+
+
+class CollectionFormatError(ValueError):
+    """The collection file is not valid JSON, or not a JSON object."""
+
+
+class _TextBuffer:
+    """A sliding window over a text file, holding the unconsumed text from `pos` on."""
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        # Characters dropped from the front of the buffer, for error offsets
+        self.offset = 0
+        self.eof = False
+
+    def fill(self, at_least: int = 0) -> bool:
+        """Read at least one more chunk (and at least `at_least` characters); False at end of file."""
+        if self.eof:
+            return False
+        wanted = max(self._chunk_size, at_least)
+        pieces = []
+        while wanted > 0:
+            piece = self._f.read(min(wanted, self._chunk_size * 16))
+            if not piece:
+                self.eof = True
+                break
+            pieces.append(piece)
+            wanted -= len(piece)
+        if not pieces:
+            return False
+        if self.pos:
+            # Drop consumed text so the buffer only holds what is still needed
+            self.offset += self.pos
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        self.text += "".join(pieces)
+        return True
+
+    def skip_whitespace(self) -> bool:
+        """Move to the next non-whitespace character; False if there is none."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return True
+            if not self.fill():
+                return False
+
+    def peek(self) -> Optional[str]:
+        """Next non-whitespace character, or None at the end of the file."""
+        return self.text[self.pos] if self.skip_whitespace() else None
+
+    def expect(self, chars: str) -> str:
+        """Consume the next non-whitespace character, which must be one of `chars`."""
+        char = self.peek()
+        if char is None or char not in chars:
+            found = repr(char) if char is not None else "end of file"
+            raise CollectionFormatError(f"Expected {' or '.join(repr(c) for c in chars)}, found {found} "
+                                        f"(char {self.offset + self.pos})")
+        self.pos += 1
+        return char
+
+    def _truncated(self, e: json.JSONDecodeError) -> bool:
+        """Whether a decode error may only mean the value is cut off at the end of the buffer."""
+        return not self.eof and (e.pos >= len(self.text) - _BOUNDARY_SLACK
+                                 or e.msg.startswith("Unterminated string"))
+
+    def decode(self, decoder: json.JSONDecoder = _DECODER) -> Any:
+        """Decode the JSON value at the current position, reading more text as needed."""
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as e:
+                # Taken before fill() moves the buffer
+                error_at = self.offset + e.pos
+                if self._truncated(e) and self.fill(at_least=len(self.text) - self.pos):
+                    continue
+                raise CollectionFormatError(f"{e.msg} (char {error_at})") from None
+            if end >= len(self.text) - _BOUNDARY_SLACK and self.fill(at_least=len(self.text) - self.pos):
+                # A number (or the file) could continue past the buffer; decode again to be sure
+                continue
+            self.pos = end
+            return value
+
+    def _check_or_open(self) -> Optional[str]:
+        """Check and move past the value at the current position if it fits in the buffer.
+
+        An array or object that does not fit is only opened: its "[" or "{" is consumed and
+        returned, for the caller to check its members one at a time.
+        """
+        if not self.skip_whitespace():
+            raise CollectionFormatError(f"Expecting value (char {self.offset + self.pos})")
+        while True:
+            try:
+                _, end = _CHECKING_DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as e:
+                error_at = self.offset + e.pos
+                if self._truncated(e):
+                    opening = self.text[self.pos]
+                    if opening in "[{":
+                        self.pos += 1
+                        return opening
+                    if self.fill(at_least=len(self.text) - self.pos):
+                        continue
+                raise CollectionFormatError(f"{e.msg} (char {error_at})") from None
+            if end >= len(self.text) - _BOUNDARY_SLACK and self.fill(at_least=len(self.text) - self.pos):
+                continue
+            self.pos = end
+            return None
+
+    def _member_key(self):
+        """Consume an object member's key and the colon after it."""
+        if self.peek() != '"':
+            self.expect('"')
+        self.decode()
+        self.expect(":")
+
+    def skip_value(self):
+        """Check the JSON value at the current position and move past it without keeping it.
+
+        Arrays and objects too large for the buffer are entered and their members checked one
+        at a time, so memory stays bounded by the buffer and the largest single string or
+        number, however large the value is.
+        """
+        # Closing characters of the arrays and objects entered, innermost last
+        closers = []
+        while True:
+            opening = self._check_or_open()
+            if opening is not None:
+                closer = "}" if opening == "{" else "]"
+                if self.peek() == closer:
+                    self.pos += 1
+                else:
+                    closers.append(closer)
+                    if closer == "}":
+                        self._member_key()
+                    continue
+            # A whole value was passed: move on to the next member, closing finished containers
+            while closers:
+                closer = closers[-1]
+                if self.expect("," + closer) == closer:
+                    closers.pop()
+                    continue
+                if closer == "}":
+                    self._member_key()
+                break
+            else:
+                return
+
+
+class _PieceReader:
+    """Minimal text file interface (read) over an iterable of text pieces."""
+
+    def __init__(self, pieces: Iterable[str]):
+        self._pieces = iter(pieces)
+        self._pending = ""
+
+    def read(self, size: int) -> str:
+        while len(self._pending) < size:
+            piece = next(self._pieces, None)
+            if piece is None:
+                break
+            self._pending += piece
+        text, self._pending = self._pending[:size], self._pending[size:]
+        return text
+
+
+def check_json(pieces: Iterable[str], chunk_size: int = CHUNK_SIZE):
+    """Check that text given in pieces is exactly one valid JSON document.
+
+    The text is never joined into one string: see _TextBuffer.skip_value.
+
+    Args:
+        pieces: The document text, in pieces of any size
+        chunk_size: Characters to read at a time
+
+    Raises:
+        CollectionFormatError: If the text is not valid JSON
+    """
+    buffer = _TextBuffer(_PieceReader(pieces), chunk_size)
+    buffer.skip_value()
+    if buffer.peek() is not None:
+        raise CollectionFormatError(f"Extra data (char {buffer.offset + buffer.pos})")
+
+
+def check_json_text(text: str):
+    """Check that a string already in memory is exactly one valid JSON document.
+
+    Unlike json.loads, no Python objects are built for the document: each parsed value is
+    dropped straight away.
+
+    Raises:
+        CollectionFormatError: If the text is not valid JSON
+    """
+    try:
+        _CHECKING_DECODER.decode(text)
+    except json.JSONDecodeError as e:
+        raise CollectionFormatError(f"{e.msg} (char {e.pos})") from None
+
+
+def iter_collection(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str, Any]]:
+    """Read a collection document incrementally.
+
+    Top-level arrays (such as "item" or "items") are never held in memory as a whole:
+    their elements are decoded and yielded one at a time.
+
+    Args:
+        f: Collection file opened for reading as text
+        chunk_size: Characters to read at a time
+
+    Yields:
+        (key, event, value) tuples for each top-level key, in file order:
+        (key, VALUE, value) for a value that is not an array, (key, ARRAY, None) at the
+        start of an array, followed by (key, ELEMENT, element) for each of its elements
+
+    Raises:
+        CollectionFormatError: If the file is not valid JSON or not a JSON object
+    """
+    buffer = _TextBuffer(f, chunk_size)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        buffer.pos += 1
+    else:
+        while True:
+            if buffer.peek() != '"':
+                buffer.expect('"')
+            key = buffer.decode()
+            buffer.expect(":")
+            if buffer.peek() == "[":
+                buffer.pos += 1
+                yield key, ARRAY, None
+                if buffer.peek() == "]":
+                    buffer.pos += 1
+                else:
+                    while True:
+                        yield key, ELEMENT, buffer.decode()
+                        if buffer.expect(",]") == "]":
+                            break
+            else:
+                yield key, VALUE, buffer.decode()
+            if buffer.expect(",}") == "}":
+                break
+    if buffer.peek() is not None:
+        raise CollectionFormatError(f"Extra data (char {buffer.offset + buffer.pos})")
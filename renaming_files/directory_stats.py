@@ -0,0 +1,188 @@
+"""
+Directory Stats - Payload statistics for every directory of a source tree in one pass.
+Used by PostmanCollectionGenerator (get_directory_stats / get_all_directory_stats) for the
+list-directories and stats commands: each directory tree is walked once with os.scandir
+and every filename is parsed once.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from filename_parser import parse_filename
+
+
+# On-disk stats cache. Like the discovery cache (see dynamic_models) it lives next to the
+# scanned source directory rather than inside it, so writing it never changes a scanned mtime.
+STATS_CACHE_FILENAME = ".directory_stats_cache.json"
+STATS_CACHE_VERSION = 1
+
+
+def get_stats_cache_path(source_dir: str) -> str:
+    """Return the stats cache file used for source_dir."""
+    return os.path.join(os.path.dirname(os.path.abspath(source_dir)), STATS_CACHE_FILENAME)
+
+
+def _walk_json_files(dir_path: str) -> Tuple[List[str], Dict[str, int]]:
+    """List the .json filenames anywhere under dir_path.
+
+    Symlinked directories are not descended into, as with Path.glob("**/*.json").
+
+    Returns:
+        Tuple of (filenames, mtimes) where mtimes maps every directory walked, relative to
+        dir_path ("." for dir_path itself), to its mtime taken before it was listed
+    """
+    filenames = []
+    mtimes = {".": os.stat(dir_path).st_mtime_ns}
+    pending = [(dir_path, ".")]
+    while pending:
+        path, relative = pending.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    child = entry.name if relative == "." else f"{relative}/{entry.name}"
+                    mtimes[child] = entry.stat(follow_symlinks=False).st_mtime_ns
+                    pending.append((entry.path, child))
+                elif entry.name.endswith(".json"):
+                    filenames.append(entry.name)
+    return filenames, mtimes
+
+
+def summarize_filenames(dir_name: str, filenames: List[str]) -> Dict[str, Any]:
+    """Build the statistics for a directory from the names of its payload files.
+
+    Args:
+        dir_name: Directory name reported in the statistics
+        filenames: Names of the .json files in the directory tree
+
+    Returns:
+        Dictionary with directory_name, total_files, file_types (suffix histogram) and
+        sorted edit_ids, eob_codes and suffixes of the renamed (5-part) filenames
+    """
+    file_types = {}
+    edit_ids = set()
+    eob_codes = set()
+    for filename in filenames:
+        parsed = parse_filename(filename)
+        if parsed is not None and parsed.is_renamed:
+            file_types[parsed.suffix] = file_types.get(parsed.suffix, 0) + 1
+            edit_ids.add(parsed.edit_id)
+            eob_codes.add(parsed.eob_code)
+
+    return {
+        "directory_name": dir_name,
+        "total_files": len(filenames),
+        "file_types": file_types,
+        "edit_ids": sorted(edit_ids),
+        "eob_codes": sorted(eob_codes),
+        "suffixes": sorted(file_types)
+    }
+
+
+def scan_directory_stats(dir_path: str, dir_name: Optional[str] = None) -> Dict[str, Any]:
+    """Compute the statistics of one directory tree in a single walk (no caching).
+
+    Args:
+        dir_path: Directory to scan
+        dir_name: Name reported in the statistics (default: dir_path as given)
+
+    Returns:
+        Statistics dictionary (see summarize_filenames)
+    """
+    filenames, _ = _walk_json_files(dir_path)
+    return summarize_filenames(dir_name if dir_name is not None else dir_path, filenames)
+
+
+def _read_stats_cache(cache_path: str) -> Dict:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != STATS_CACHE_VERSION:
+        return {}
+    return cache
+
+
+def _cached_stats(dir_path: str, entry: Any) -> Optional[Dict[str, Any]]:
+    """Return the cached statistics if no directory under dir_path has a new mtime.
+
+    Adding, removing or renaming a file or subdirectory changes the mtime of the directory
+    holding it, and the statistics depend on nothing but names, so one stat per directory
+    (rather than a listing) is enough to tell whether the tree changed. A file rewritten in
+    place does not change any directory mtime and is not noticed (list-directories --refresh).
+    """
+    try:
+        for relative, mtime_ns in entry["mtimes"].items():
+            if os.stat(os.path.join(dir_path, relative)).st_mtime_ns != mtime_ns:
+                return None
+        return entry["stats"]
+    except (OSError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _save_stats_cache(source_dir: str, entries: Dict[str, Dict]):
+    """Store the per-directory entries for source_dir. Failures (e.g. read-only shares) are ignored."""
+    cache_path = get_stats_cache_path(source_dir)
+    cache = _read_stats_cache(cache_path)
+    cache["version"] = STATS_CACHE_VERSION
+    cache.setdefault("sources", {})[os.path.abspath(source_dir)] = entries
+
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def collect_directory_stats(source_dir: str, use_cache: bool = True,
+                            refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Compute the statistics of every directory directly under source_dir.
+
+    source_dir is listed once and each directory tree under it is walked once. With the
+    cache, a directory whose tree has no new mtimes is not walked at all.
+
+    Args:
+        source_dir: Source directory (e.g. renaming_jsons)
+        use_cache: If False, neither read nor write the stats cache
+        refresh: If True, ignore the stats cache and rescan (the cache is rewritten)
+
+    Returns:
+        Dictionary mapping each directory name, in sorted order, to its statistics
+        (see summarize_filenames)
+    """
+    if not os.path.isdir(source_dir):
+        return {}
+
+    with os.scandir(source_dir) as entries:
+        dir_names = sorted(entry.name for entry in entries if entry.is_dir())
+
+    cached = {}
+    if use_cache and not refresh:
+        cached = _read_stats_cache(get_stats_cache_path(source_dir)).get("sources", {}).get(
+            os.path.abspath(source_dir), {})
+
+    stats = {}
+    entries = {}
+    changed = False
+    for dir_name in dir_names:
+        dir_path = os.path.join(source_dir, dir_name)
+        dir_stats = _cached_stats(dir_path, cached[dir_name]) if dir_name in cached else None
+        if dir_stats is not None:
+            entries[dir_name] = cached[dir_name]
+        else:
+            filenames, mtimes = _walk_json_files(dir_path)
+            dir_stats = summarize_filenames(dir_name, filenames)
+            entries[dir_name] = {"mtimes": mtimes, "stats": dir_stats}
+            changed = True
+        stats[dir_name] = dir_stats
+
+    if use_cache and (changed or set(entries) != set(cached)):
+        _save_stats_cache(source_dir, entries)
+
+    return stats
@@ -6,8 +6,9 @@ Automatically detects TS_XX_REVENUE_WGS_CSBD_* folders and extracts model parame
 
 import os
 import re
-import glob
-from typing import List, Dict, Optional
+import json
+import fnmatch
+from typing import List, Dict, Optional, Tuple
 
 
 def normalize_ts_number(ts_number_raw: str) -> str:
@@ -89,239 +90,426 @@ def format_ts_argument(ts_number: str) -> str:
         return ts_number
 
 
-def discover_ts_folders(base_dir: str = ".", use_wgs_csbd_destination: bool = False) -> List[Dict]:
+# Folder-name globs that mark a directory as a TS folder candidate.
+# Candidates that match a glob but none of the model families are reported with a warning.
+WGS_CSBD_FOLDER_GLOBS = [
+    "TS_*_REVENUE_WGS_CSBD_*_payloads_sur",
+    "TS_*_REVENUE_WGS_CSBD_*_ayloads_sur",
+    "TS_*_REVENUE_WGS_CSBD_*_sur",
+    "TS_*_Revenue code Services not payable on Facility claim Sub Edit *_WGS_CSBD_*_sur",
+    "TS_*_Lab panel Model_WGS_CSBD_*_sur",
+    "TS_*_Recovery Room Reimbursement_WGS_CSBD_*_sur",
+    "TS_*_Covid_WGS_CSBD_*_sur",
+    "TS_*_Laterality Policy-Disgnosis to Diagnosis_WGS_CSBD_*_sur",
+    "TS_*_Device Dependent Procedures(R1)-1B_WGS_CSBD_*_sur",
+    "TS_*_revenue model_WGS_CSBD_*_sur",
+    "TS_*_Revenue Code to HCPCS Xwalk-1B_WGS_CSBD_*_sur",
+    "TS_*_Incidentcal Services Facility_WGS_CSBD_*_sur",
+    "TS_*_Revenue model CR v3_WGS_CSBD_*_sur",
+    "TS_*_HCPCS to Revenue Code Xwalk_WGS_CSBD_*_sur",
+    "TS_*_Multiple E&M Same day_WGS_CSBD_*_sur",
+]
+
+GBDF_FOLDER_GLOBS = [
+    "TS_*_Covid_gbdf_mcr_*_sur",
+]
+
+# Model families keyed by name:
+#   (folder description regex, collection label template, Postman file prefix)
+# The description sits between "TS_XX_" and "_EDITID_CODE_sur" in the folder name.
+# A label of None falls back to generate_postman_collection_name().
+MODEL_FAMILIES = {
+    "revenue": (r"REVENUE_WGS_CSBD", None, "revenue_wgs_csbd"),
+    "revenue_sub_edit": (r"Revenue code Services not payable on Facility claim Sub Edit (?P<sub_edit>\d+)_WGS_CSBD",
+                         "Revenue code Services not payable on Facility claim Sub Edit {sub_edit}", "revenue_wgs_csbd"),
+    "lab_panel": (r"Lab panel Model_WGS_CSBD", "Lab panel Model", "lab_wgs_csbd"),
+    "recovery_room": (r"Recovery Room Reimbursement_WGS_CSBD", "Recovery Room Reimbursement", "recovery_wgs_csbd"),
+    "covid": (r"Covid_WGS_CSBD", "Covid", "covid_wgs_csbd"),
+    "laterality": (r"Laterality Policy-Disgnosis to Diagnosis_WGS_CSBD", "Laterality", "laterality_wgs_csbd"),
+    "device_dependent": (r"Device Dependent Procedures\(R1\)-1B_WGS_CSBD", "Device Dependent Procedures", "device_wgs_csbd"),
+    "revenue_model": (r"revenue model_WGS_CSBD", "revenue model", "revenue_wgs_csbd"),
+    "revenue_hcpcs": (r"Revenue Code to HCPCS Xwalk-1B_WGS_CSBD", "Revenue Code to HCPCS Xwalk-1B", "revenue_wgs_csbd"),
+    "incidental": (r"Incidentcal Services Facility_WGS_CSBD", "Incidentcal Services Facility", "incidentcal_wgs_csbd"),
+    "revenue_model_v3": (r"Revenue model CR v3_WGS_CSBD", "Revenue model CR v3", "revenue_model_wgs_csbd"),
+    "hcpcs_revenue": (r"HCPCS to Revenue Code Xwalk_WGS_CSBD", "HCPCS to Revenue Code Xwalk", "hcpcs_wgs_csbd"),
+    "multiple_em": (r"Multiple E&M Same day_WGS_CSBD", "Multiple E&M Same day", "multiple_em_wgs_csbd"),
+    # GBDF collections have always been named after the WGS_CSBD Covid collection
+    "gbdf_covid": (r"Covid_gbdf_mcr", "Covid", "covid_wgs_csbd"),
+}
+
+WGS_CSBD_FAMILIES = [family for family in MODEL_FAMILIES if family != "gbdf_covid"]
+GBDF_FAMILIES = ["gbdf_covid"]
+
+
+def _compile_folder_globs(patterns: List[str]) -> "re.Pattern":
+    """Combine folder-name globs into a single precompiled regex."""
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+def _compile_family_matcher(families: List[str]) -> "re.Pattern":
+    """
+    Build one precompiled alternation matching every family in `families`.
+    
+    Each family is a named group, so the matching family is read straight off the
+    match object instead of trying one regex per family in turn.
+    Supports 1-3 digit TS numbers and any alphanumeric edit_id and EOB code.
+    """
+    alternation = "|".join(f"(?P<{family}>{MODEL_FAMILIES[family][0]})" for family in families)
+    return re.compile(
+        rf"TS_(?P<ts_number>\d{{1,3}})_(?:{alternation})_(?P<edit_id>[A-Za-z0-9]+)_(?P<code>[A-Za-z0-9]+)_sur$"
+    )
+
+
+_WGS_CSBD_CANDIDATES = _compile_folder_globs(WGS_CSBD_FOLDER_GLOBS)
+_GBDF_CANDIDATES = _compile_folder_globs(GBDF_FOLDER_GLOBS)
+_WGS_CSBD_MATCHER = _compile_family_matcher(WGS_CSBD_FAMILIES)
+_GBDF_MATCHER = _compile_family_matcher(GBDF_FAMILIES)
+
+
+def _scan_candidate_folders(base_dir: str, candidates: "re.Pattern") -> List[Tuple[str, int]]:
+    """
+    List candidate TS folders in a single os.scandir pass over base_dir.
+    
+    Returns:
+        Sorted list of (folder path, mtime_ns) tuples; each folder appears once
+        even if several globs match it
+    """
+    if not os.path.isdir(base_dir):
+        return []
+    
+    with os.scandir(base_dir) as entries:
+        folders = [
+            (os.path.join(base_dir, entry.name), entry.stat().st_mtime_ns)
+            for entry in entries
+            if candidates.match(entry.name) and entry.is_dir()
+        ]
+    
+    return sorted(folders)
+
+
+# On-disk discovery cache. It lives next to the scanned base directory (e.g.
+# source_folder/.discovery_cache.json for source_folder/WGS_CSBD) rather than
+# inside it, so writing the cache never changes the base directory's mtime.
+DISCOVERY_CACHE_FILENAME = ".discovery_cache.json"
+DISCOVERY_CACHE_VERSION = 1
+
+
+def get_discovery_cache_path(base_dir: str) -> str:
+    """Return the discovery cache file used for base_dir."""
+    return os.path.join(os.path.dirname(os.path.abspath(base_dir)), DISCOVERY_CACHE_FILENAME)
+
+
+def _discovery_cache_key(base_dir: str, use_wgs_csbd_destination: bool) -> str:
+    # Model paths are relative to the working directory, so the key includes
+    # both the absolute and the given form of base_dir
+    return json.dumps([os.path.abspath(base_dir), base_dir, use_wgs_csbd_destination])
+
+
+def _read_discovery_cache(cache_path: str) -> Dict:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != DISCOVERY_CACHE_VERSION:
+        return {}
+    return cache
+
+
+def _load_cached_models(base_dir: str, use_wgs_csbd_destination: bool) -> Optional[List[Dict]]:
+    """
+    Load discovered models from the cache if base_dir and every TS folder are unchanged.
+    
+    Returns:
+        Cached model configurations, or None when the cache is missing or stale
+    """
+    cache = _read_discovery_cache(get_discovery_cache_path(base_dir))
+    entry = cache.get("entries", {}).get(_discovery_cache_key(base_dir, use_wgs_csbd_destination))
+    if not entry:
+        return None
+    
+    try:
+        # Adding, removing or renaming a TS folder changes the base directory's mtime;
+        # adding or removing a regression subfolder changes the TS folder's mtime
+        if os.stat(base_dir).st_mtime_ns != entry["base_mtime_ns"]:
+            return None
+        for folder_name, mtime_ns in entry["folders"].items():
+            if os.stat(os.path.join(base_dir, folder_name)).st_mtime_ns != mtime_ns:
+                return None
+    except (OSError, KeyError, TypeError):
+        return None
+    
+    return entry.get("models")
+
+
+def _save_cached_models(base_dir: str, use_wgs_csbd_destination: bool, base_mtime_ns: int,
+                        folder_mtimes: Dict[str, int], models: List[Dict]):
+    """Store discovered models in the cache. Failures (e.g. read-only shares) are ignored."""
+    cache_path = get_discovery_cache_path(base_dir)
+    cache = _read_discovery_cache(cache_path)
+    cache["version"] = DISCOVERY_CACHE_VERSION
+    cache.setdefault("entries", {})[_discovery_cache_key(base_dir, use_wgs_csbd_destination)] = {
+        "base_mtime_ns": base_mtime_ns,
+        "folders": folder_mtimes,
+        "models": models
+    }
+    
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def _build_model_config(folder_path: str, match: "re.Match", is_gbdf: bool,
+                        use_wgs_csbd_destination: bool) -> Dict:
+    """
+    Build a model configuration from a parsed TS folder name.
+    
+    Args:
+        folder_path: Path to the TS folder
+        match: Family matcher result for the folder name
+        is_gbdf: True when the folder lives in the GBDF source tree
+        use_wgs_csbd_destination: If True, WGS_CSBD models go to renaming_jsons/WGS_CSBD
+        
+    Returns:
+        Model configuration dictionary
+    """
+    folder_name = os.path.basename(folder_path)
+    ts_number_raw = match.group("ts_number")
+    edit_id = match.group("edit_id")
+    code = match.group("code")
+    family = next(name for name in MODEL_FAMILIES if match.groupdict().get(name) is not None)
+    
+    # Normalize TS number to handle different digit patterns
+    ts_number = normalize_ts_number(ts_number_raw)
+    
+    # Generate destination directory name
+    # Handle "payloads_sur", "ayloads_sur" (typo), and "_sur" patterns
+    if "_payloads_sur" in folder_name:
+        dest_folder_name = folder_name.replace("_payloads_sur", "_payloads_dis")
+    elif "_ayloads_sur" in folder_name:
+        dest_folder_name = folder_name.replace("_ayloads_sur", "_payloads_dis")
+    elif "_sur" in folder_name:
+        dest_folder_name = folder_name.replace("_sur", "_dis")
+    else:
+        dest_folder_name = folder_name  # fallback
+    
+    # Generate destination directory based on model type
+    if is_gbdf:
+        # GBDF MCR models go to GBDF subdirectory
+        dest_dir = os.path.join("renaming_jsons", "GBDF", dest_folder_name, "regression")
+    elif use_wgs_csbd_destination:
+        # WGS_CSBD models with flag go to WGS_CSBD subdirectory
+        dest_dir = os.path.join("renaming_jsons", "WGS_CSBD", dest_folder_name, "regression")
+    else:
+        # Default to renaming_jsons root
+        dest_dir = os.path.join("renaming_jsons", dest_folder_name, "regression")
+    
+    # Generate Postman collection and file names from the model family
+    _, label_template, file_prefix = MODEL_FAMILIES[family]
+    if label_template is None:
+        postman_collection_name = generate_postman_collection_name(ts_number)
+    else:
+        label = label_template.format(sub_edit=match.groupdict().get("sub_edit"))
+        postman_collection_name = f"TS_{ts_number}_{label}_Collection"
+    postman_file_name = f"{file_prefix}_{edit_id}_{code.lower()}.json"
+    
+    return {
+        "ts_number": ts_number,
+        "ts_number_raw": ts_number_raw,  # Keep original for reference
+        "edit_id": edit_id,
+        "code": code,
+        "source_dir": os.path.join(folder_path, "regression"),
+        "dest_dir": dest_dir,
+        "postman_collection_name": postman_collection_name,
+        "postman_file_name": postman_file_name,
+        "folder_name": folder_name,
+        "model_family": family
+    }
+
+
+def discover_ts_folders(base_dir: str = ".", use_wgs_csbd_destination: bool = False,
+                        refresh: bool = False, use_cache: bool = True) -> List[Dict]:
     """
     Discover all TS_XX_REVENUE_WGS_CSBD_* folders and extract model parameters.
     Supports flexible digit patterns: TS01-TS09, TS10-TS99, TS100-TS999
     Also supports GBDF MCR patterns
     
+    The base directory is listed once; each entry is checked against a single
+    precompiled candidate regex and parsed with a single family alternation.
+    Results are cached on disk and reused while neither base_dir nor any TS
+    folder in it has a new mtime.
+    
     Args:
         base_dir: Base directory to search for TS folders
+        use_wgs_csbd_destination: If True, WGS_CSBD models go to renaming_jsons/WGS_CSBD
+        refresh: If True, ignore the discovery cache and rescan (the cache is rewritten)
+        use_cache: If False, neither read nor write the discovery cache
         
     Returns:
         List of model configurations extracted from folder names
     """
+    if use_cache and not refresh:
+        cached_models = _load_cached_models(base_dir, use_wgs_csbd_destination)
+        if cached_models is not None:
+            print(f"Scanning for TS folders in: {base_dir}")
+            print(f"Loaded {len(cached_models)} TS models from discovery cache")
+            return cached_models
+    
     models = []
     
     # Check if this is a GBDF directory
     is_gbdf = "GBDF" in base_dir
     
     if is_gbdf:
-        # GBDF MCR patterns
-        pattern1 = os.path.join(base_dir, "TS_*_Covid_gbdf_mcr_*_sur")
-        ts_folders = glob.glob(pattern1)
+        candidates, matcher = _GBDF_CANDIDATES, _GBDF_MATCHER
     else:
-        # WGS_CSBD patterns
-        # Pattern to match TS_XX_REVENUE_WGS_CSBD_* folders
-        # Handle both "payloads_sur" and "_sur" patterns
-        # Also handle new Revenue code pattern and Lab panel Model pattern
-        pattern1 = os.path.join(base_dir, "TS_*_REVENUE_WGS_CSBD_*_payloads_sur")
-        pattern2 = os.path.join(base_dir, "TS_*_REVENUE_WGS_CSBD_*_ayloads_sur")
-        pattern3 = os.path.join(base_dir, "TS_*_REVENUE_WGS_CSBD_*_sur")
-        pattern4 = os.path.join(base_dir, "TS_*_Revenue code Services not payable on Facility claim Sub Edit *_WGS_CSBD_*_sur")
-        pattern5 = os.path.join(base_dir, "TS_*_Lab panel Model_WGS_CSBD_*_sur")
-        pattern6 = os.path.join(base_dir, "TS_*_Recovery Room Reimbursement_WGS_CSBD_*_sur")
-        pattern7 = os.path.join(base_dir, "TS_*_Covid_WGS_CSBD_*_sur")
-        pattern8 = os.path.join(base_dir, "TS_*_Laterality Policy-Disgnosis to Diagnosis_WGS_CSBD_*_sur")
-        pattern9 = os.path.join(base_dir, "TS_*_Device Dependent Procedures(R1)-1B_WGS_CSBD_*_sur")
-        pattern10 = os.path.join(base_dir, "TS_*_revenue model_WGS_CSBD_*_sur")
-        pattern11 = os.path.join(base_dir, "TS_*_Revenue Code to HCPCS Xwalk-1B_WGS_CSBD_*_sur")
-        pattern12 = os.path.join(base_dir, "TS_*_Incidentcal Services Facility_WGS_CSBD_*_sur")
-        pattern13 = os.path.join(base_dir, "TS_*_Revenue model CR v3_WGS_CSBD_*_sur")
-        pattern14 = os.path.join(base_dir, "TS_*_HCPCS to Revenue Code Xwalk_WGS_CSBD_*_sur")
-        pattern15 = os.path.join(base_dir, "TS_*_Multiple E&M Same day_WGS_CSBD_*_sur")
-        ts_folders = (glob.glob(pattern1) + glob.glob(pattern2) + glob.glob(pattern3) + 
-                     glob.glob(pattern4) + glob.glob(pattern5) + glob.glob(pattern6) + 
-                     glob.glob(pattern7) + glob.glob(pattern8) + glob.glob(pattern9) + 
-                     glob.glob(pattern10) + glob.glob(pattern11) + glob.glob(pattern12) + 
-                     glob.glob(pattern13) + glob.glob(pattern14) + glob.glob(pattern15))
+        candidates, matcher = _WGS_CSBD_CANDIDATES, _WGS_CSBD_MATCHER
+    
+    # Take the base directory's mtime before listing it so a concurrent change invalidates the cache
+    try:
+        base_mtime_ns = os.stat(base_dir).st_mtime_ns
+    except OSError:
+        base_mtime_ns = None
+    
+    ts_folders = _scan_candidate_folders(base_dir, candidates)
     
     print(f"Scanning for TS folders in: {base_dir}")
     print(f"Found {len(ts_folders)} TS folders")
     
-    for folder_path in ts_folders:
+    for folder_path, _ in ts_folders:
         folder_name = os.path.basename(folder_path)
         
-        # Extract parameters using flexible regex pattern
-        # Pattern 1: TS_XX_REVENUE_WGS_CSBD_EDIT_ID_EOB_CODE_sur (original pattern)
-        # Pattern 2: TS_XX_Revenue code Services not payable on Facility claim Sub Edit X_WGS_CSBD_RULEREVE00000X_00W28_sur (new pattern)
-        # Supports 1-3 digit TS numbers: TS_1, TS_01, TS_001, TS_10, TS_100, etc.
-        # Supports any alphanumeric edit_id and EOB code formats
         # Examples: TS_60_REVENUE_WGS_CSBD_ASDFGJEUSK_00W29_sur, TS_07_REVENUE_WGS_CSBD_rvn011_00W11_sur
         # Examples: TS_03_Revenue code Services not payable on Facility claim Sub Edit 5_WGS_CSBD_RULEREVE000005_00W28_sur
+        match = matcher.match(folder_name)
         
-        # Try original pattern first
-        match = re.match(r'TS_(\d{1,3})_REVENUE_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
-        
-        # If no match, try new Revenue code pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_Revenue code Services not payable on Facility claim Sub Edit \d+_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
-        
-        # If no match, try Lab panel Model pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_Lab panel Model_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
-        
-        # If no match, try Recovery Room Reimbursement pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_Recovery Room Reimbursement_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
-        
-        # If no match, try Covid pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_Covid_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
-        
-        # If no match, try Laterality Policy pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_Laterality Policy-Disgnosis to Diagnosis_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
-        
-        # If no match, try Device Dependent Procedures pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_Device Dependent Procedures\(R1\)-1B_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
-        
-        # If no match, try revenue model pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_revenue model_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
-        
-        # If no match, try Revenue Code to HCPCS Xwalk-1B pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_Revenue Code to HCPCS Xwalk-1B_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
+        if match:
+            # Check if regression subfolder exists
+            if not os.path.exists(os.path.join(folder_path, "regression")):
+                print(f"Warning: Regression folder not found in {folder_name}")
+                continue
+            
+            model_config = _build_model_config(folder_path, match, is_gbdf, use_wgs_csbd_destination)
+            models.append(model_config)
+            print(f"Discovered: TS_{model_config['ts_number']} ({model_config['edit_id']}_{model_config['code']}) [Raw: {model_config['ts_number_raw']}]")
+        else:
+            print(f"Warning: Could not parse folder name: {folder_name}")
+    
+    if use_cache and base_mtime_ns is not None:
+        folder_mtimes = {os.path.basename(path): mtime_ns for path, mtime_ns in ts_folders}
+        _save_cached_models(base_dir, use_wgs_csbd_destination, base_mtime_ns, folder_mtimes, models)
+    
+    return models
+
+
+class ModelIndex:
+    """In-memory index of discovered models keyed by TS number, edit_id and code."""
+    
+    _RANGE_PATTERN = re.compile(r'^(\d{1,3})-(\d{1,3})$')
+    _TS_PATTERN = re.compile(r'^(?:TS_?)?(\d{1,3})$', re.IGNORECASE)
+    
+    def __init__(self, models: List[Dict]):
+        self.models = list(models)
+        self.by_ts_number = {}
+        self.by_edit_id = {}
+        self.by_code = {}
         
-        # If no match, try Incidentcal Services Facility pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_Incidentcal Services Facility_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
+        for model in self.models:
+            # Several folders may share a TS number (e.g. one per edit ID); all of them are kept
+            self.by_ts_number.setdefault(normalize_ts_number(model["ts_number"]), []).append(model)
+            self.by_edit_id.setdefault(model["edit_id"], []).append(model)
+            self.by_code.setdefault(model["code"], []).append(model)
         
-        # If no match, try Revenue model CR v3 pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_Revenue model CR v3_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
+        self._ts_numbers_by_value = sorted(self.by_ts_number, key=int)
+    
+    def matches(self, ts_number: str) -> List[Dict]:
+        """
+        Get every model with a TS number in any supported format (e.g., "1", "01", "TS01").
         
-        # If no match, try HCPCS to Revenue Code Xwalk pattern
+        Returns:
+            Matching model configuration dicts in discovery order (empty if none match)
+        """
+        match = self._TS_PATTERN.match(ts_number.strip())
         if not match:
-            match = re.match(r'TS_(\d{1,3})_HCPCS to Revenue Code Xwalk_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
+            return []
+        return list(self.by_ts_number.get(normalize_ts_number(match.group(1)), []))
+    
+    def get(self, ts_number: str) -> Optional[Dict]:
+        """
+        Get the model for a TS number in any supported format (e.g., "1", "01", "TS01").
         
-        # If no match, try Multiple E&M Same day pattern
-        if not match:
-            match = re.match(r'TS_(\d{1,3})_Multiple E&M Same day_WGS_CSBD_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
+        Returns:
+            Model configuration dict or None if not found
+            
+        Raises:
+            ValueError: If more than one model has the TS number
+        """
+        matches = self.matches(ts_number)
+        if len(matches) > 1:
+            raise ValueError(self._ambiguous_message(matches[0]["ts_number"], matches))
+        return matches[0] if matches else None
+    
+    @staticmethod
+    def _ambiguous_message(ts_number: str, matches: List[Dict]) -> str:
+        models = ", ".join(f"{model['edit_id']}_{model['code']}" for model in matches)
+        return (f"TS{ts_number} is ambiguous: it matches {len(matches)} models ({models}); "
+                f"select them by edit ID or code instead")
+    
+    def resolve(self, selection: str) -> List[Dict]:
+        """
+        Resolve a comma-separated model selection against the index.
         
-        # If no match and this is GBDF, try GBDF MCR pattern
-        if not match and is_gbdf:
-            match = re.match(r'TS_(\d{1,3})_Covid_gbdf_mcr_([A-Za-z0-9]+)_([A-Za-z0-9]+)_sur$', folder_name)
+        Each entry may be a TS number ("07", "TS07"), an inclusive TS range ("100-250"),
+        an edit_id ("RULEEM000001") or a code ("00W28").
         
-        if match:
-            ts_number_raw = match.group(1)
-            edit_id = match.group(2)
-            code = match.group(3)
+        Args:
+            selection: Selection string, e.g. "01,07,46" or "100-250,RULEEM000001"
             
-            # Normalize TS number to handle different digit patterns
-            ts_number = normalize_ts_number(ts_number_raw)
+        Returns:
+            Selected models in selection order, without duplicates
             
-            # Check if regression subfolder exists
-            regression_path = os.path.join(folder_path, "regression")
-            if not os.path.exists(regression_path):
-                print(f"Warning: Regression folder not found in {folder_name}")
+        Raises:
+            ValueError: If a TS number, edit_id or code is not in the index, or a single TS
+                number matches more than one model
+        """
+        selected = []
+        seen = set()
+        
+        for token in (part.strip() for part in selection.split(",")):
+            if not token:
                 continue
             
-            # Generate destination directory name
-            # Handle "payloads_sur", "ayloads_sur" (typo), and "_sur" patterns
-            if "_payloads_sur" in folder_name:
-                dest_folder_name = folder_name.replace("_payloads_sur", "_payloads_dis")
-            elif "_ayloads_sur" in folder_name:
-                dest_folder_name = folder_name.replace("_ayloads_sur", "_payloads_dis")
-            elif "_sur" in folder_name:
-                dest_folder_name = folder_name.replace("_sur", "_dis")
+            range_match = self._RANGE_PATTERN.match(token)
+            if range_match:
+                low, high = sorted(int(bound) for bound in range_match.groups())
+                # A range selects every model whose TS number is inside it
+                matches = [model for ts in self._ts_numbers_by_value if low <= int(ts) <= high
+                           for model in self.by_ts_number[ts]]
+            elif self._TS_PATTERN.match(token):
+                model = self.get(token)
+                if model is None:
+                    raise ValueError(f"TS{self._TS_PATTERN.match(token).group(1)} model not found!")
+                matches = [model]
+            elif token in self.by_edit_id:
+                matches = self.by_edit_id[token]
+            elif token in self.by_code:
+                matches = self.by_code[token]
             else:
-                dest_folder_name = folder_name  # fallback
+                raise ValueError(f"No model found for '{token}' (expected a TS number, range, edit ID or code)")
             
-            # Generate destination directory based on model type
-            if is_gbdf:
-                # GBDF MCR models go to GBDF subdirectory
-                dest_dir = os.path.join("renaming_jsons", "GBDF", dest_folder_name, "regression")
-            elif use_wgs_csbd_destination:
-                # WGS_CSBD models with flag go to WGS_CSBD subdirectory
-                dest_dir = os.path.join("renaming_jsons", "WGS_CSBD", dest_folder_name, "regression")
-            else:
-                # Default to renaming_jsons root
-                dest_dir = os.path.join("renaming_jsons", dest_folder_name, "regression")
-            
-            # Generate Postman collection name with flexible formatting
-            # For Revenue code Services models, use the full descriptive name
-            if "Revenue code Services not payable on Facility claim" in folder_name:
-                # Extract the Sub Edit number and create proper collection name
-                sub_edit_match = re.search(r'Sub Edit (\d+)', folder_name)
-                if sub_edit_match:
-                    sub_edit_num = sub_edit_match.group(1)
-                    postman_collection_name = f"TS_{ts_number}_Revenue code Services not payable on Facility claim Sub Edit {sub_edit_num}_Collection"
-                else:
-                    postman_collection_name = generate_postman_collection_name(ts_number)
-                postman_file_name = f"revenue_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "Lab panel Model" in folder_name:
-                # For Lab panel Model, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_Lab panel Model_Collection"
-                postman_file_name = f"lab_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "Recovery Room Reimbursement" in folder_name:
-                # For Recovery Room Reimbursement, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_Recovery Room Reimbursement_Collection"
-                postman_file_name = f"recovery_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "Covid" in folder_name:
-                # For Covid, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_Covid_Collection"
-                postman_file_name = f"covid_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "Laterality Policy" in folder_name:
-                # For Laterality Policy, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_Laterality_Collection"
-                postman_file_name = f"laterality_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "Device Dependent Procedures" in folder_name:
-                # For Device Dependent Procedures, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_Device Dependent Procedures_Collection"
-                postman_file_name = f"device_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "revenue model" in folder_name:
-                # For revenue model, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_revenue model_Collection"
-                postman_file_name = f"revenue_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "Revenue Code to HCPCS Xwalk-1B" in folder_name:
-                # For Revenue Code to HCPCS Xwalk-1B, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_Revenue Code to HCPCS Xwalk-1B_Collection"
-                postman_file_name = f"revenue_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "Incidentcal Services Facility" in folder_name:
-                # For Incidentcal Services Facility, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_Incidentcal Services Facility_Collection"
-                postman_file_name = f"incidentcal_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "Revenue model CR v3" in folder_name:
-                # For Revenue model CR v3, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_Revenue model CR v3_Collection"
-                postman_file_name = f"revenue_model_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "HCPCS to Revenue Code Xwalk" in folder_name:
-                # For HCPCS to Revenue Code Xwalk, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_HCPCS to Revenue Code Xwalk_Collection"
-                postman_file_name = f"hcpcs_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "Multiple E&M Same day" in folder_name:
-                # For Multiple E&M Same day, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_Multiple E&M Same day_Collection"
-                postman_file_name = f"multiple_em_wgs_csbd_{edit_id}_{code.lower()}.json"
-            elif "Covid_gbdf_mcr" in folder_name:
-                # For GBDF MCR Covid, use the full descriptive name
-                postman_collection_name = f"TS_{ts_number}_Covid_gbdf_mcr_Collection"
-                postman_file_name = f"covid_gbdf_mcr_{edit_id}_{code.lower()}.json"
-            else:
-                postman_collection_name = generate_postman_collection_name(ts_number)
-                postman_file_name = f"revenue_wgs_csbd_{edit_id}_{code.lower()}.json"
-            
-            model_config = {
-                "ts_number": ts_number,
-                "ts_number_raw": ts_number_raw,  # Keep original for reference
-                "edit_id": edit_id,
-                "code": code,
-                "source_dir": regression_path,
-                "dest_dir": dest_dir,
-                "postman_collection_name": postman_collection_name,
-                "postman_file_name": postman_file_name,
-                "folder_name": folder_name
-            }
-            
-            models.append(model_config)
-            print(f"Discovered: TS_{ts_number} ({edit_id}_{code}) [Raw: {ts_number_raw}]")
-        else:
-            print(f"Warning: Could not parse folder name: {folder_name}")
-    
-    return models
+            for model in matches:
+                if id(model) not in seen:
+                    seen.add(id(model))
+                    selected.append(model)
+        
+        return selected
 
 
 def get_model_by_ts_number(ts_number: str, base_dir: str = ".") -> Optional[Dict]:
@@ -409,20 +597,29 @@ def print_discovered_models(models: List[Dict]):
         print()
 
 
-def print_nested_models_display():
+def print_nested_models_display(refresh: bool = False, include_wgs_csbd: bool = True, include_gbdf: bool = True):
     """
     Display all models in a nested, hierarchical structure showing WGS_CSBD and GBDF categories.
     This provides a clear, organized view of all available models.
+    
+    Args:
+        refresh: If True, bypass the discovery cache and rescan the source trees
+        include_wgs_csbd: If False, skip scanning and listing source_folder/WGS_CSBD
+        include_gbdf: If False, skip scanning and listing source_folder/GBDF
     """
     print("\n" + "=" * 80)
     print("🏗️  NESTED MODEL STRUCTURE")
     print("=" * 80)
     
     # Get WGS_CSBD models
-    wgs_csbd_models = discover_ts_folders("source_folder/WGS_CSBD", use_wgs_csbd_destination=True)
+    wgs_csbd_models = []
+    if include_wgs_csbd:
+        wgs_csbd_models = discover_ts_folders("source_folder/WGS_CSBD", use_wgs_csbd_destination=True, refresh=refresh)
     
     # Get GBDF models
-    gbdf_models = discover_ts_folders("source_folder/GBDF", use_wgs_csbd_destination=False)
+    gbdf_models = []
+    if include_gbdf:
+        gbdf_models = discover_ts_folders("source_folder/GBDF", use_wgs_csbd_destination=False, refresh=refresh)
     
     total_models = len(wgs_csbd_models) + len(gbdf_models)
     
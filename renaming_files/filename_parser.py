@@ -0,0 +1,86 @@
+"""
+Filename Parser - Shared parsing of test case payload filenames.
+Used by the renamer (main_processor.rename_files) and the Postman generator, so both
+agree on the templates and each distinct filename is only split once per run.
+
+Templates:
+    TC#XX_XXXXX#suffix.json                   (3 parts, as exported)
+    TC#XX_XXXXX#edit_id#suffix.json           (4 parts)
+    TC#XX_XXXXX#edit_id#eob_code#suffix.json  (5 parts, renamed / Postman-ready)
+"""
+
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+
+# Source suffixes by test category, and the suffix they are renamed to
+SUFFIX_CATEGORIES = {
+    "positive": {
+        "deny": "LR",    # deny -> LR
+    },
+    "negative": {
+        "bypass": "NR",  # bypass -> NR
+    },
+    "Exclusion": {
+        "market": "EX",  # market -> EX
+        "date": "EX"     # date -> EX
+    }
+}
+
+# Flattened source suffix -> renamed suffix lookup
+SUFFIX_LOOKUP = {
+    source: target
+    for category in SUFFIX_CATEGORIES.values()
+    for source, target in category.items()
+}
+
+# Number of distinct filenames remembered; enough for the largest regression runs
+PARSE_CACHE_SIZE = 1 << 17
+
+
+class ParsedFilename(NamedTuple):
+    """Components of a payload filename."""
+    tc_prefix: str                # TC
+    tc_id: str                    # 000001_53626
+    edit_id: Optional[str]        # rvn002 (4- and 5-part names)
+    eob_code: Optional[str]       # 00W06 (5-part names)
+    suffix: str                   # deny/bypass/market/date, or LR/NR/EX once renamed
+    original_filename: str
+    part_count: int               # 3, 4 or 5
+
+    @property
+    def is_renamed(self) -> bool:
+        """True for the 5-part template produced by the renamer."""
+        return self.part_count == 5
+
+    @property
+    def mapped_suffix(self) -> str:
+        """Suffix in the renamed template (unknown suffixes are kept as-is)."""
+        return SUFFIX_LOOKUP.get(self.suffix, self.suffix)
+
+    def renamed(self, edit_id: str, code: str) -> str:
+        """Filename in the 5-part template for the given model."""
+        return f"{self.tc_prefix}#{self.tc_id}#{edit_id}#{code}#{self.mapped_suffix}.json"
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_filename(filename: str) -> Optional[ParsedFilename]:
+    """Parse a payload filename in the 3-, 4- or 5-part template.
+
+    Args:
+        filename: Filename (not a path), e.g. TC#01_12345#deny.json
+
+    Returns:
+        ParsedFilename, or None if the name is not a .json file with 3 to 5 parts
+    """
+    if not filename.endswith('.json'):
+        return None
+
+    parts = filename[:-len('.json')].split('#')
+    if len(parts) == 3:
+        return ParsedFilename(parts[0], parts[1], None, None, parts[2], filename, 3)
+    if len(parts) == 4:
+        return ParsedFilename(parts[0], parts[1], parts[2], None, parts[3], filename, 4)
+    if len(parts) == 5:
+        return ParsedFilename(parts[0], parts[1], parts[2], parts[3], parts[4], filename, 5)
+    return None
@@ -1088,8 +1088,8 @@ class ProfessionalReportGenerator:
         
         # Get TS models information
         try:
-            from models_config import get_models_config
-            models = get_models_config(use_dynamic=True)
+            from models_config import get_default_models_config
+            models = get_default_models_config()
             stats['ts_models'] = models
             stats['active_suites'] = len(models)
             
@@ -11,14 +11,100 @@ Supports both single model processing and batch processing of multiple models.
 
 import os
 import re
+import json
+import io
+import errno
 import shutil
 import sys
 import subprocess
 import argparse
-from postman_generator import PostmanCollectionGenerator
+import contextlib
+import itertools
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from postman_generator import (PostmanCollectionGenerator, add_generator_arguments, check_generator_arguments,
+                               generator_options as postman_generator_options)
+from pipeline_metrics import PipelineMetrics, ProgressLine
+from filename_parser import parse_filename
+from profiling import profiled
+from run_journal import DEFAULT_JOURNAL_PATH, RunJournal, UnfinishedJournalError, model_key
 
 
-def rename_files(edit_id="rvn001", code="00W5", source_dir=None, dest_dir=None, generate_postman=True, postman_collection_name=None, postman_file_name=None):
+def _silent(*args, **kwargs):
+    """Stand-in for print() when per-file output is turned off."""
+
+
+def move_file(source_path, dest_path):
+    """Move a single file, renaming it in place whenever possible.
+    
+    When source and destination live on the same device the file is moved with
+    os.replace(), so its contents are never read or rewritten. Across devices the
+    file is copied, flushed to disk with fsync and only then is the source removed.
+    
+    Args:
+        source_path: Path of the file to move
+        dest_path: Destination path (including the new filename)
+        
+    Returns:
+        Tuple of (method, size) where method is "renamed" or "copied"
+    """
+    size = os.path.getsize(source_path)
+    dest_parent = os.path.dirname(dest_path) or "."
+    
+    if os.stat(source_path).st_dev == os.stat(dest_parent).st_dev:
+        try:
+            os.replace(source_path, dest_path)
+            return "renamed", size
+        except OSError as e:
+            # Bind mounts can share st_dev yet still refuse a rename
+            if e.errno != errno.EXDEV:
+                raise
+    
+    shutil.copy2(source_path, dest_path)
+    with open(dest_path, 'r+b') as f:
+        os.fsync(f.fileno())
+    os.remove(source_path)
+    return "copied", size
+
+
+def move_and_read_file(source_path, dest_path):
+    """Move a single file like move_file(), also returning its contents.
+    
+    The file is read exactly once: just before the in-place rename on the same
+    device, or as the source of the copy across devices.
+    
+    Args:
+        source_path: Path of the file to move
+        dest_path: Destination path (including the new filename)
+        
+    Returns:
+        Tuple of (method, size, contents) where method is "renamed" or "copied"
+    """
+    with open(source_path, 'rb') as f:
+        data = f.read()
+    dest_parent = os.path.dirname(dest_path) or "."
+    
+    if os.stat(source_path).st_dev == os.stat(dest_parent).st_dev:
+        try:
+            os.replace(source_path, dest_path)
+            return "renamed", len(data), data
+        except OSError as e:
+            # Bind mounts can share st_dev yet still refuse a rename
+            if e.errno != errno.EXDEV:
+                raise
+    
+    with open(dest_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    shutil.copystat(source_path, dest_path)
+    os.remove(source_path)
+    return "copied", len(data), data
+
+
+def rename_files(edit_id="rvn001", code="00W5", source_dir=None, dest_dir=None, generate_postman=True, postman_collection_name=None, postman_file_name=None,
+                 generator_options=None, quiet=False, metrics=None, fused=False, journal=None):
     """Rename files and optionally generate Postman collection for a specific model.
     
     Args:
@@ -29,22 +115,17 @@ def rename_files(edit_id="rvn001", code="00W5", source_dir=None, dest_dir=None,
         generate_postman: If True, generate Postman collection after renaming
         postman_collection_name: Name for the Postman collection
         postman_file_name: Custom filename for the Postman collection JSON file
+        generator_options: Extra keyword arguments for PostmanCollectionGenerator (e.g. {"body_mode": "raw"})
+        quiet: If True, replace the per-file output with a throttled progress line
+        metrics: Optional PipelineMetrics receiving stage times, per-file latency and counters
+        fused: If True (and generate_postman), build the collection while moving the files from
+            the bytes read during the move, instead of reading every payload again afterwards.
+            Ignored for incremental or deterministic generator_options
+        journal: Optional run_journal.ModelJournal. Each move and the collection are recorded in
+            it, and files it lists as moved by an interrupted run count as renamed, so a resumed
+            model only moves what is left and still gets its collection
     """
     
-    # Mapping for suffixes based on the expected output format
-    suffix_mapping = {
-        "positive": {
-            "deny": "LR",    # deny -> LR
-        },
-        "negative": {
-            "bypass": "NR",  # bypass -> NR
-        },
-        "Exclusion": {
-            "market": "EX",   # market -> EX
-            "date": "EX"      # date -> EX
-        }
-    }
-    
     # Auto-generate paths if not provided
     if source_dir is None:
         source_dir = f"source_folder/WGS_CSBD/TS_01_REVENUE_WGS_CSBD_{edit_id}_{code}_payloads_sur/regression"
@@ -63,84 +144,70 @@ def rename_files(edit_id="rvn001", code="00W5", source_dir=None, dest_dir=None,
     # Get all JSON files in the source directory
     json_files = [f for f in os.listdir(source_dir) if f.endswith('.json')]
     
-    print("Files to be renamed and moved:")
-    print("=" * 60)
+    # Quiet mode replaces the per-file lines with a throttled progress line
+    log = _silent if quiet else print
+    model_label = f"{edit_id}_{code}"
+    progress = ProgressLine(f"Renaming {model_label}", len(json_files)) if quiet else None
+    if journal and journal.resumed:
+        recovered = journal.recover_moves(dest_dir, edit_id, code, pending=json_files)
+        if recovered:
+            print(f"Resuming: {recovered} files found in {dest_dir} without a journaled move")
+    # A resumed model's earlier files are no longer in memory, so its collection is built from dest_dir
+    previously_moved = list(journal.moved.values()) if journal else []
+    fused = fused and generate_postman and not previously_moved
+    if fused and generator_options and (generator_options.get("incremental") or generator_options.get("deterministic")):
+        # Both need every payload up front, so the collection is built from dest_dir afterwards
+        print("Fused mode is off for this run: incremental and deterministic collections are built after the move")
+        fused = False
     
-    renamed_files = []
+    if previously_moved:
+        print(f"Resuming: {len(previously_moved)} files were moved by the interrupted run")
     
-    for filename in json_files:
-        # Parse the current filename
-        parts = filename.split('#')
-        
-        if len(parts) == 3:
-            # Handle 3-part template: TC#XX_XXXXX#suffix.json
-            tc_part = parts[0]  # TC
-            tc_id_part = parts[1]  # 01_12345
-            suffix = parts[2].replace('.json', '')  # deny, bypass, market
-            
-            # Get the correct suffix mapping for the new template
-            mapped_suffix = suffix
-            for category in suffix_mapping.values():
-                if suffix in category:
-                    mapped_suffix = category[suffix]
-                    break
-            
-            # Create new filename according to new template: TC#XX_XXXXX#rvn001#00W5#LR.json
-            new_filename = f"{tc_part}#{tc_id_part}#{edit_id}#{code}#{mapped_suffix}.json"
-            
-            print(f"Current: {filename}")
-            print(f"Converting to new template...")
-            print(f"New:     {new_filename}")
-            print(f"Moving to: {dest_dir}")
-            print("-" * 40)
+    log("Files to be renamed and moved:")
+    log("=" * 60)
+    
+    renamed_files = list(previously_moved)
+    previously_moved_names = set(previously_moved)
+    # method -> [file count, bytes]
+    move_stats = {"renamed": [0, 0], "copied": [0, 0]}
+    file_errors = {"failed": 0, "skipped": 0}
+    
+    def move_payloads():
+        """Move every file; in fused mode yield (dest_path, parsed_name, contents) for each moved file."""
+        for done, filename in enumerate(json_files):
+            if progress:
+                progress.update(done)
             
-            # Source and destination paths - normalize paths for Windows compatibility
-            source_path = os.path.normpath(os.path.join(source_dir, filename))
-            dest_path = os.path.normpath(os.path.join(dest_dir, new_filename))
+            # Parse the current filename (3-, 4- or 5-part template)
+            parsed = parse_filename(filename)
             
-            # Handle Windows MAX_PATH limitation (260 characters)
-            # Use UNC path prefix to bypass the limit if path is too long
-            if len(os.path.abspath(dest_path)) > 260:
-                source_path = "\\\\?\\" + os.path.abspath(source_path)
-                dest_path = "\\\\?\\" + os.path.abspath(dest_path)
+            if parsed is None:
+                print(f"Warning: {filename} doesn't match expected format (needs 3, 4, or 5 parts)")
+                file_errors["skipped"] += 1
+                continue
             
-            try:
-                # Copy the file to destination with new name
-                # Use shutil.copy2 for cross-platform compatibility
-                shutil.copy2(source_path, dest_path)
-                print(f"Successfully copied and renamed: {filename} -> {new_filename}")
+            if parsed.is_renamed:
+                # 5-part template (already converted): only files for this model are moved, as-is
+                if parsed.edit_id != edit_id or parsed.eob_code != code:
+                    print(f"Warning: {filename} has different model parameters ({parsed.edit_id}_{parsed.eob_code}) than target ({edit_id}_{code})")
+                    file_errors["skipped"] += 1
+                    continue
                 
-                # Remove the original file
-                os.remove(source_path)
-                print(f"Removed original file: {filename}")
-                
-                renamed_files.append(new_filename)
-                
-            except Exception as e:
-                print(f"Error processing {filename}: {e}")
-                
-        elif len(parts) == 4:
-            # Handle 4-part template: TC#XX_XXXXX#edit_id#suffix.json
-            tc_part = parts[0]  # TC
-            tc_id_part = parts[1]  # 01_12345
-            file_edit_id = parts[2]  # rvn001
-            suffix = parts[3].replace('.json', '')  # deny, bypass, market
-            
-            # Get the correct suffix mapping for the new template
-            mapped_suffix = suffix
-            for category in suffix_mapping.values():
-                if suffix in category:
-                    mapped_suffix = category[suffix]
-                    break
-            
-            # Create new filename according to new template: TC#XX_XXXXX#rvn001#00W5#LR.json
-            new_filename = f"{tc_part}#{tc_id_part}#{edit_id}#{code}#{mapped_suffix}.json"
+                new_filename = filename  # Keep the same name
+                log(f"Current: {filename}")
+                log(f"Already in correct format, moving as-is...")
+            else:
+                # Create new filename according to new template: TC#XX_XXXXX#rvn001#00W5#LR.json
+                new_filename = parsed.renamed(edit_id, code)
+                log(f"Current: {filename}")
+                if parsed.part_count == 3:
+                    log(f"Converting to new template...")
+                else:
+                    log(f"Converting from 4-part to 5-part template...")
+                log(f"New:     {new_filename}")
             
-            print(f"Current: {filename}")
-            print(f"Converting from 4-part to 5-part template...")
-            print(f"New:     {new_filename}")
-            print(f"Moving to: {dest_dir}")
-            print("-" * 40)
+            log(f"Moving to: {dest_dir}")
+            log("-" * 40)
             
             # Source and destination paths - normalize paths for Windows compatibility
             source_path = os.path.normpath(os.path.join(source_dir, filename))
@@ -153,69 +220,45 @@ def rename_files(edit_id="rvn001", code="00W5", source_dir=None, dest_dir=None,
                 dest_path = "\\\\?\\" + os.path.abspath(dest_path)
             
             try:
-                # Copy the file to destination with new name
-                shutil.copy2(source_path, dest_path)
-                print(f"Successfully copied and renamed: {filename} -> {new_filename}")
-                
-                # Remove the original file
-                os.remove(source_path)
-                print(f"Removed original file: {filename}")
+                # Rename in place on the same device, copy + remove across devices
+                move_start = time.perf_counter()
+                if fused:
+                    method, size, data = move_and_read_file(source_path, dest_path)
+                else:
+                    method, size = move_file(source_path, dest_path)
+                if metrics:
+                    metrics.record_file(time.perf_counter() - move_start)
+                move_stats[method][0] += 1
+                move_stats[method][1] += size
+                if parsed.is_renamed:
+                    log(f"Successfully moved ({method}): {filename}")
+                else:
+                    log(f"Successfully {method} and moved: {filename} -> {new_filename}")
                 
-                renamed_files.append(new_filename)
+                if journal:
+                    journal.record_move(filename, new_filename)
+                if new_filename not in previously_moved_names:
+                    renamed_files.append(new_filename)
                 
             except Exception as e:
                 print(f"Error processing {filename}: {e}")
-                
-        elif len(parts) == 5:
-            # Handle 5-part template: TC#XX_XXXXX#edit_id#code#suffix.json (already converted)
-            tc_part = parts[0]  # TC
-            tc_id_part = parts[1]  # 01_12345
-            file_edit_id = parts[2]  # rvn001
-            file_code = parts[3]  # 00W5
-            suffix = parts[4].replace('.json', '')  # LR, NR, EX
-            
-            # Check if this file matches our target model
-            if file_edit_id == edit_id and file_code == code:
-                # File is already in correct format, just move it
-                new_filename = filename  # Keep the same name
-                
-                print(f"Current: {filename}")
-                print(f"Already in correct format, moving as-is...")
-                print(f"Moving to: {dest_dir}")
-                print("-" * 40)
-                
-                # Source and destination paths
-                source_path = os.path.join(source_dir, filename)
-                dest_path = os.path.join(dest_dir, new_filename)
-                
-                try:
-                    # Copy the file to destination
-                    shutil.copy2(source_path, dest_path)
-                    print(f"Successfully moved: {filename}")
-                    
-                    # Remove the original file
-                    os.remove(source_path)
-                    print(f"Removed original file: {filename}")
-                    
-                    renamed_files.append(new_filename)
-                    
-                except Exception as e:
-                    print(f"Error processing {filename}: {e}")
-            else:
-                print(f"Warning: {filename} has different model parameters ({file_edit_id}_{file_code}) than target ({edit_id}_{code})")
+                file_errors["failed"] += 1
                 continue
-        else:
-            print(f"Warning: {filename} doesn't match expected format (needs 3, 4, or 5 parts)")
-            continue
-    
-    print("\n" + "=" * 60)
-    print("Renaming and moving completed!")
-    print(f"Files moved to: {dest_dir}")
+            
+            if fused:
+                yield Path(dest_path), parse_filename(new_filename), data
     
-    # Generate Postman collection if requested
-    if generate_postman and renamed_files:
+    def generate_collection(preloaded=None):
+        """Generate the model's Postman collection, from preloaded payloads in fused mode.
+        
+        Returns:
+            Path of the collection file, or None if it could not be generated
+        """
+        nonlocal postman_collection_name
+        
         print("\n" + "=" * 60)
-        print("Generating Postman collection...")
+        print("Generating Postman collection while moving files..." if preloaded is not None
+              else "Generating Postman collection...")
         print("-" * 40)
         
         try:
@@ -229,7 +272,9 @@ def rename_files(edit_id="rvn001", code="00W5", source_dir=None, dest_dir=None,
             
             generator = PostmanCollectionGenerator(
                 source_dir=dest_dir,  # Use the specific model's destination directory
-                output_dir=output_dir
+                output_dir=output_dir,
+                metrics=metrics,
+                **(generator_options or {})
             )
             
             # Extract collection name from destination directory if not provided
@@ -253,35 +298,271 @@ def rename_files(edit_id="rvn001", code="00W5", source_dir=None, dest_dir=None,
             custom_filename = postman_file_name
             
             # Generate collection
-            collection_path = generator.generate_postman_collection(postman_collection_name, custom_filename)
+            collection_path = generator.generate_postman_collection(postman_collection_name, custom_filename,
+                                                                    preloaded=preloaded)
             
             if collection_path:
+                if journal:
+                    journal.record_collection(collection_path)
                 print(f"Postman collection generated: {collection_path}")
                 print(f"Collection name: {postman_collection_name}")
-                print("\nReady for API testing!")
-                print("=" * 60)
-                print("To use this collection:")
-                print("1. Open Postman")
-                print("2. Click 'Import'")
-                print(f"3. Select the file: {collection_path}")
-                print("4. Start testing your APIs!")
+                if metrics:
+                    metrics.count(model_label, "collections_generated")
+                if not quiet:
+                    print("\nReady for API testing!")
+                    print("=" * 60)
+                    print("To use this collection:")
+                    print("1. Open Postman")
+                    print("2. Click 'Import'")
+                    print(f"3. Select the file: {collection_path}")
+                    print("4. Start testing your APIs!")
             else:
                 print("Failed to generate Postman collection")
+            return collection_path
                 
         except Exception as e:
             print(f"Error generating Postman collection: {e}")
+            return None
+    
+    rename_start = time.perf_counter()
+    payloads = move_payloads()
+    collection_path = None
+    if fused:
+        # The collection is written while the files are moved, from the bytes read by the move
+        first_payload = next(payloads, None)
+        if first_payload is not None:
+            collection_path = generate_collection(itertools.chain([first_payload], payloads))
+    # Moves any files left if the collection could not be generated (always all of them otherwise)
+    for _ in payloads:
+        pass
+    
+    if progress:
+        progress.finish(len(json_files))
+    if metrics:
+        # In fused mode this includes building the collection
+        metrics.add_stage_time("rename", time.perf_counter() - rename_start)
+        metrics.count(model_label, "files_renamed", move_stats["renamed"][0])
+        metrics.count(model_label, "files_copied", move_stats["copied"][0])
+        metrics.count(model_label, "bytes_moved", move_stats["renamed"][1] + move_stats["copied"][1])
+        metrics.count(model_label, "files_failed", file_errors["failed"])
+        metrics.count(model_label, "files_skipped", file_errors["skipped"])
+    
+    print("\n" + "=" * 60)
+    print("Renaming and moving completed!")
+    print(f"Files moved to: {dest_dir}")
+    print(f"Renamed in place: {move_stats['renamed'][0]} files ({move_stats['renamed'][1]} bytes)")
+    print(f"Copied across devices: {move_stats['copied'][0]} files ({move_stats['copied'][1]} bytes)")
+    
+    # Generate Postman collection if requested
+    if generate_postman and renamed_files and not fused:
+        collection_path = generate_collection()
+    
+    if journal:
+        if renamed_files and (collection_path or not generate_postman) and not file_errors["failed"]:
+            journal.record_done(len(renamed_files))
+        journal.close()
     
     return renamed_files
 
 
-def process_multiple_models(models_config, generate_postman=True):
+def _process_model_worker(model_config, generate_postman=True, generator_options=None, quiet=False,
+                          collect_metrics=False, profile_prefix=None, fused=False, journal=None):
+    """Process a single model inside a worker process.
+
+    Console output is captured per model so that models running concurrently
+    don't interleave their lines; the parent prints each block when the model finishes.
+
+    Args:
+        model_config: Model configuration dictionary
+        generate_postman: If True, generate Postman collection after renaming
+        generator_options: Extra keyword arguments for PostmanCollectionGenerator
+        quiet: If True, suppress the per-file output
+        collect_metrics: If True, return a PipelineMetrics snapshot for the parent to merge
+        profile_prefix: If set, profile this model and write <prefix>.TS_XX_<edit_id>_<code>.* files
+        fused: If True, build the collection while moving the files (see rename_files)
+        journal: Optional run_journal.ModelJournal for the model (see rename_files)
+
+    Returns:
+        Dictionary with the model identifiers, renamed files, error message, captured output
+        and metrics snapshot
     """
-    Process multiple models with their respective configurations.
+    result = {
+        "ts_number": model_config.get("ts_number", "??"),
+        "edit_id": model_config.get("edit_id"),
+        "code": model_config.get("code"),
+        "files": [],
+        "error": None,
+        "output": "",
+        "metrics": None
+    }
+    metrics = PipelineMetrics() if collect_metrics else None
+
+    if profile_prefix:
+        label = f"TS_{result['ts_number']}_{result['edit_id']}_{result['code']}"
+        profiler = profiled(f"{profile_prefix}.{label}", quiet=True)
+    else:
+        profiler = contextlib.nullcontext()
     
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer), profiler:
+        try:
+            renamed_files = rename_files(
+                edit_id=model_config.get("edit_id"),
+                code=model_config.get("code"),
+                source_dir=model_config.get("source_dir"),
+                dest_dir=model_config.get("dest_dir"),
+                generate_postman=generate_postman,
+                postman_collection_name=model_config.get("postman_collection_name"),
+                postman_file_name=model_config.get("postman_file_name"),
+                generator_options=generator_options,
+                quiet=quiet,
+                metrics=metrics,
+                fused=fused,
+                journal=journal
+            )
+            result["files"] = renamed_files or []
+        except Exception as e:
+            result["error"] = str(e)
+
+    result["output"] = buffer.getvalue()
+    if metrics:
+        result["metrics"] = metrics.snapshot()
+    return result
+
+
+def process_models_parallel(models_config, generate_postman=True, jobs=None, generator_options=None, quiet=False,
+                            metrics=None, profile_prefix=None, fused=False, journal=None):
+    """
+    Process multiple models concurrently using a pool of worker processes.
+
+    Models are independent (each has its own source and destination directory),
+    so every model is renamed and its Postman collection generated in a separate
+    worker. Each model's output is printed as one block once it completes.
+
     Args:
         models_config: List of dictionaries containing model configurations
         generate_postman: Whether to generate Postman collections for each model
+        jobs: Number of worker processes (None or <= 0 uses the CPU count)
+        generator_options: Extra keyword arguments for PostmanCollectionGenerator
+        quiet: If True, suppress the per-file output of each model
+        metrics: Optional PipelineMetrics; each worker's metrics are merged into it
+        profile_prefix: If set, each worker profiles its model into <prefix>.TS_XX_<edit_id>_<code>.*
+        fused: If True, build each collection while moving the files (see rename_files)
+        journal: Optional run_journal.RunJournal recording each model's progress
+
+    Returns:
+        Tuple of (successful_models, failed_models), in the same order as models_config
+    """
+    if jobs is not None and jobs <= 0:
+        jobs = None
+
+    successful_models = []
+    failed_models = []
+    total = len(models_config)
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(_process_model_worker, model_config, generate_postman, generator_options,
+                            quiet, metrics is not None, profile_prefix, fused,
+                            journal.model(model_key(model_config["source_dir"])) if journal else None): index
+            for index, model_config in enumerate(models_config)
+        }
+
+        for done, future in enumerate(as_completed(futures), 1):
+            index = futures[future]
+            model_config = models_config[index]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. broken process pool)
+                result = {
+                    "ts_number": model_config.get("ts_number", "??"),
+                    "edit_id": model_config.get("edit_id"),
+                    "code": model_config.get("code"),
+                    "files": [],
+                    "error": str(e),
+                    "output": "",
+                    "metrics": None
+                }
+            if metrics:
+                metrics.merge(result["metrics"])
+
+            label = f"TS_{result['ts_number']} ({result['edit_id']}_{result['code']})"
+            print(f"\nINFO Completed Model {done}/{total}: {label}")
+            print("-" * 40)
+            print(result["output"], end="")
+
+            if result["error"]:
+                print(f"ERROR Model {label}: Failed with error - {result['error']}")
+                failed_models.append((index, {
+                    "ts_number": result["ts_number"],
+                    "edit_id": result["edit_id"],
+                    "code": result["code"],
+                    "reason": result["error"]
+                }))
+            elif result["files"]:
+                print(f"SUCCESS Model {label}: Successfully processed {len(result['files'])} files")
+                successful_models.append((index, {
+                    "ts_number": result["ts_number"],
+                    "edit_id": result["edit_id"],
+                    "code": result["code"],
+                    "files_count": len(result["files"]),
+                    "files": result["files"]
+                }))
+            else:
+                print(f"WARNING  Model {label}: No files were processed")
+                failed_models.append((index, {
+                    "ts_number": result["ts_number"],
+                    "edit_id": result["edit_id"],
+                    "code": result["code"],
+                    "reason": "No files found or processed"
+                }))
+
+    # Report in the original model order regardless of completion order
+    successful_models = [model for _, model in sorted(successful_models, key=lambda entry: entry[0])]
+    failed_models = [model for _, model in sorted(failed_models, key=lambda entry: entry[0])]
+    return successful_models, failed_models
+
+
+def skip_completed_models(models_config, journal):
+    """Drop the models a resumed journal lists as complete.
+
+    Args:
+        models_config: List of model configuration dictionaries
+        journal: run_journal.RunJournal, or None to keep every model
+
+    Returns:
+        The models still to process, in their original order
+    """
+    if journal is None:
+        return models_config
     
+    remaining = []
+    for model_config in models_config:
+        if journal.is_done(model_key(model_config["source_dir"])):
+            print(f"SKIP Model TS_{model_config.get('ts_number', '??')} "
+                  f"({model_config.get('edit_id')}_{model_config.get('code')}): completed in the journaled run")
+        else:
+            remaining.append(model_config)
+    return remaining
+
+
+def process_multiple_models(models_config, generate_postman=True, jobs=1, generator_options=None, quiet=False,
+                            metrics=None, fused=False, journal=None):
+    """
+    Process multiple models with their respective configurations.
+
+    Args:
+        models_config: List of dictionaries containing model configurations
+        generate_postman: Whether to generate Postman collections for each model
+        jobs: Number of models to process concurrently (1 = sequential)
+        generator_options: Extra keyword arguments for PostmanCollectionGenerator
+        quiet: If True, replace per-file output with a progress line per model
+        metrics: Optional PipelineMetrics collecting stage times and counters
+        fused: If True, build each collection while moving the files (see rename_files)
+        journal: Optional run_journal.RunJournal; models it lists as complete are skipped and
+            the others record their progress in it
+
     Example models_config:
     [
         {
@@ -304,11 +585,19 @@ def process_multiple_models(models_config, generate_postman=True):
     print("Starting Multi-Model Processing")
     print("=" * 80)
     
+    models_config = skip_completed_models(models_config, journal)
     total_processed = 0
     successful_models = []
     failed_models = []
-    
-    for i, model_config in enumerate(models_config, 1):
+
+    sequential_models = models_config
+    if jobs != 1 and len(models_config) > 1:
+        successful_models, failed_models = process_models_parallel(models_config, generate_postman, jobs, generator_options,
+                                                                   quiet, metrics, fused=fused, journal=journal)
+        total_processed = sum(model["files_count"] for model in successful_models)
+        sequential_models = []
+
+    for i, model_config in enumerate(sequential_models, 1):
         edit_id = model_config.get("edit_id")
         code = model_config.get("code")
         source_dir = model_config.get("source_dir")
@@ -330,7 +619,12 @@ def process_multiple_models(models_config, generate_postman=True):
                 source_dir=source_dir,
                 dest_dir=dest_dir,
                 generate_postman=generate_postman,
-                postman_collection_name=postman_collection_name
+                postman_collection_name=postman_collection_name,
+                generator_options=generator_options,
+                quiet=quiet,
+                metrics=metrics,
+                fused=fused,
+                journal=journal.model(model_key(source_dir)) if journal else None
             )
             
             if renamed_files:
@@ -381,6 +675,33 @@ def process_multiple_models(models_config, generate_postman=True):
     return successful_models, failed_models
 
 
+def report_metrics(metrics, metrics_json=None):
+    """Write run metrics to metrics_json, or print them as JSON if no path was given.
+    
+    Args:
+        metrics: PipelineMetrics for the run (nothing is reported if None)
+        metrics_json: Optional output file path
+    """
+    if metrics is None:
+        return
+    
+    if metrics_json:
+        try:
+            metrics.write_json(metrics_json)
+            print(f"\nSUCCESS Metrics written to: {metrics_json}")
+        except OSError as e:
+            print(f"\nERROR Could not write metrics to {metrics_json}: {e}")
+    else:
+        print("\nMETRICS")
+        print(json.dumps(metrics.summary(), indent=2))
+
+
+# TS numbers that still have a dedicated --TSNN flag (any TS number can be selected with --ts),
+# in the order their models have always been processed in
+LEGACY_TS_FLAGS = ["01", "02", "10", "04", "03", "05", "06", "07", "08", "09",
+                   "11", "12", "13", "14", "15", "46", "47"]
+
+
 def main():
     """Main function with comprehensive command line interface."""
     
@@ -399,6 +720,10 @@ Examples:
   # Process GBDF MCR models (GBDF MCR flag required)
   python main_processor.py --gbdf_mcr --TS47    # Process TS47 model (Covid GBDF MCR)
   
+  # Process any selection of TS models (numbers, ranges, edit IDs or codes)
+  python main_processor.py --wgs_csbd --ts 01,07,46
+  python main_processor.py --wgs_csbd --ts 100-250
+  
   # Process all discovered models
   python main_processor.py --wgs_csbd --all     # Process all discovered WGS_CSBD models
   python main_processor.py --gbdf_mcr --all     # Process all discovered GBDF MCR models
@@ -406,6 +731,13 @@ Examples:
   # List available models
   python main_processor.py --list    # List all available TS models
   
+  # Process all models using 8 parallel workers
+  python main_processor.py --wgs_csbd --all --jobs 8
+  
+  # Journal a batch run, then finish it if it crashed or was killed (skips the recorded work)
+  python main_processor.py --wgs_csbd --all --journal
+  python main_processor.py --wgs_csbd --all --resume
+  
   # Skip Postman generation
   python main_processor.py --wgs_csbd --TS07 --no-postman
   python main_processor.py --gbdf_mcr --TS47 --no-postman
@@ -458,12 +790,38 @@ Examples:
                        help="Process TS46 model (Multiple E&M Same day)")
     parser.add_argument("--TS47", action="store_true", 
                        help="Process TS47 model (Covid GBDF MCR)")
+    parser.add_argument("--ts", type=str, metavar="SELECTION",
+                       help="Process selected TS models, e.g. 01,07,46 or 100-250 (edit IDs and codes also accepted)")
     parser.add_argument("--all", action="store_true", 
                        help="Process all discovered models")
     parser.add_argument("--list", action="store_true", 
                        help="List all available TS models")
     parser.add_argument("--no-postman", action="store_true", 
                        help="Skip Postman collection generation")
+    add_generator_arguments(parser)
+    parser.add_argument("--fused", action="store_true",
+                       help="Build each Postman collection while moving its files, reading every payload only once "
+                            "(not with --incremental or --deterministic)")
+    parser.add_argument("--refresh-discovery", action="store_true",
+                       help="Ignore the cached TS folder discovery results and rescan source_folder")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                       help="Number of models to process in parallel (default: 1, 0 = one per CPU)")
+    parser.add_argument("--journal", nargs="?", const=DEFAULT_JOURNAL_PATH, metavar="PATH",
+                       help=f"Record every moved file and generated collection of the run in PATH, so it can be resumed "
+                            f"(default PATH: {DEFAULT_JOURNAL_PATH})")
+    parser.add_argument("--resume", action="store_true",
+                       help="Continue the run recorded in the journal: skip completed models and move only the files left")
+    parser.add_argument("--fresh", action="store_true",
+                       help="Start a new journal even if the existing one belongs to a run that did not finish")
+    parser.add_argument("--quiet", action="store_true",
+                       help="Replace per-file output with a progress line and print run metrics as JSON at the end")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                       help="Write stage timings, per-model counters and per-file latency percentiles to PATH")
+    parser.add_argument("--profile", action="store_true",
+                       help="Profile the run with cProfile (writes .pstats, flamegraph .collapsed and .hot.json files; "
+                            "with --jobs each worker also writes its own)")
+    parser.add_argument("--profile-output", default="main_processor_profile", metavar="PREFIX",
+                       help="Path prefix for the profile files (default: main_processor_profile)")
     
     # Add custom parameter arguments
     parser.add_argument("--edit-id", type=str, help="Custom edit ID (e.g., rvn001)")
@@ -473,36 +831,38 @@ Examples:
     parser.add_argument("--collection-name", type=str, help="Custom Postman collection name")
     
     args = parser.parse_args()
+    check_generator_arguments(parser, args)
+    if args.fused and (args.incremental or args.deterministic):
+        parser.error("--fused cannot be combined with --incremental or --deterministic")
+    if args.resume and args.fresh:
+        parser.error("--resume cannot be combined with --fresh")
+    if (args.resume or args.fresh) and args.journal is None:
+        args.journal = DEFAULT_JOURNAL_PATH
     
-    # Load model configurations with dynamic discovery
-    try:
-        from models_config import get_models_config, get_model_by_ts
-        models_config = get_models_config(use_dynamic=True, use_wgs_csbd_destination=args.wgs_csbd, use_gbdf_mcr=args.gbdf_mcr)
-        print("Configuration loaded with dynamic discovery")
-    except ImportError as e:
-        print(f"Error: {e}")
-        print("Please ensure models_config.py and dynamic_models.py exist.")
-        sys.exit(1)
+    if args.profile:
+        with profiled(args.profile_output):
+            run(args)
+    else:
+        run(args)
+
+
+def run(args):
+    """Process models as selected by the parsed command line arguments."""
     
-    # Handle --list option
+    generator_options = postman_generator_options(args)
+    metrics = PipelineMetrics() if args.quiet or args.metrics_json else None
+    
+    # Handle --list option (before loading configurations so only the listed trees are scanned)
     if args.list:
-        try:
-            from dynamic_models import print_nested_models_display
-            print_nested_models_display()
-        except ImportError:
-            print("\nINFO AVAILABLE TS MODELS")
-            print("=" * 50)
-            if models_config:
-                for model in models_config:
-                    print(f"TS_{model['ts_number']}: {model['edit_id']}_{model['code']}")
-                    print(f"  FOLDER Source: {model['source_dir']}")
-                    print(f"  FOLDER Dest:   {model['dest_dir']}")
-                    print()
-            else:
-                print("No TS models found")
+        # --wgs_csbd / --gbdf_mcr narrow the listing; with neither (or both) flag, list everything
+        list_wgs_csbd = args.wgs_csbd or not args.gbdf_mcr
+        list_gbdf = args.gbdf_mcr or not args.wgs_csbd
+        from dynamic_models import print_nested_models_display
+        print_nested_models_display(refresh=args.refresh_discovery,
+                                    include_wgs_csbd=list_wgs_csbd, include_gbdf=list_gbdf)
         sys.exit(0)
     
-    # Handle custom parameters
+    # Handle custom parameters (no model discovery needed)
     if args.edit_id and args.code:
         print(f"\nTOOL Processing custom model: {args.edit_id}_{args.code}")
         print("=" * 60)
@@ -514,7 +874,11 @@ Examples:
                 source_dir=args.source_dir,
                 dest_dir=args.dest_dir,
                 generate_postman=not args.no_postman,
-                postman_collection_name=args.collection_name
+                postman_collection_name=args.collection_name,
+                generator_options=generator_options,
+                quiet=args.quiet,
+                metrics=metrics,
+                fused=args.fused
             )
             
             if renamed_files:
@@ -526,148 +890,59 @@ Examples:
             print(f"ERROR Custom model {args.edit_id}_{args.code}: Failed with error - {e}")
             sys.exit(1)
         
+        report_metrics(metrics, args.metrics_json)
         sys.exit(0)
     
+    # Load model configurations with dynamic discovery
+    try:
+        from models_config import get_models_config, get_model_by_ts
+        with metrics.stage("discovery") if metrics else contextlib.nullcontext():
+            models_config = get_models_config(use_dynamic=True, use_wgs_csbd_destination=args.wgs_csbd,
+                                              use_gbdf_mcr=args.gbdf_mcr, refresh_discovery=args.refresh_discovery)
+        print("Configuration loaded with dynamic discovery")
+    except ImportError as e:
+        print(f"Error: {e}")
+        print("Please ensure models_config.py and dynamic_models.py exist.")
+        sys.exit(1)
+    
     # Determine which models to process
     models_to_process = []
     
     # Handle specific TS numbers for available models
+    from dynamic_models import ModelIndex
+    model_index = ModelIndex(models_config)
     
-    if args.TS01:
-        ts01_model = next((model for model in models_config if model.get("ts_number") == "01"), None)
-        if ts01_model:
-            models_to_process.append(ts01_model)
-        else:
-            print("ERROR Error: TS01 model not found!")
-            sys.exit(1)
-    
-    if args.TS02:
-        ts02_model = next((model for model in models_config if model.get("ts_number") == "02"), None)
-        if ts02_model:
-            models_to_process.append(ts02_model)
-        else:
-            print("ERROR Error: TS02 model not found!")
-            sys.exit(1)
-    
-    if args.TS10:
-        ts10_model = next((model for model in models_config if model.get("ts_number") == "10"), None)
-        if ts10_model:
-            models_to_process.append(ts10_model)
-        else:
-            print("ERROR Error: TS10 model not found!")
-            sys.exit(1)
-    
-
-    if args.TS04:
-        ts04_model = next((model for model in models_config if model.get("ts_number") == "04"), None)
-        if ts04_model:
-            models_to_process.append(ts04_model)
-        else:
-            print("ERROR Error: TS04 model not found!")
-            sys.exit(1)
-    
-    if args.TS03:
-        ts03_model = next((model for model in models_config if model.get("ts_number") == "03"), None)
-        if ts03_model:
-            models_to_process.append(ts03_model)
-        else:
-            print("ERROR Error: TS03 model not found!")
-            sys.exit(1)
-    
-    if args.TS05:
-        ts05_model = next((model for model in models_config if model.get("ts_number") == "05"), None)
-        if ts05_model:
-            models_to_process.append(ts05_model)
-        else:
-            print("ERROR Error: TS05 model not found!")
-            sys.exit(1)
-    
-    if args.TS06:
-        ts06_model = next((model for model in models_config if model.get("ts_number") == "06"), None)
-        if ts06_model:
-            models_to_process.append(ts06_model)
-        else:
-            print("ERROR Error: TS06 model not found!")
-            sys.exit(1)
-    
-    if args.TS07:
-        ts07_model = next((model for model in models_config if model.get("ts_number") == "07"), None)
-        if ts07_model:
-            models_to_process.append(ts07_model)
-        else:
-            print("ERROR Error: TS07 model not found!")
-            sys.exit(1)
-    
-    if args.TS08:
-        ts08_model = next((model for model in models_config if model.get("ts_number") == "08"), None)
-        if ts08_model:
-            models_to_process.append(ts08_model)
-        else:
-            print("ERROR Error: TS08 model not found!")
-            sys.exit(1)
-    
-    if args.TS09:
-        ts09_model = next((model for model in models_config if model.get("ts_number") == "09"), None)
-        if ts09_model:
-            models_to_process.append(ts09_model)
-        else:
-            print("ERROR Error: TS09 model not found!")
-            sys.exit(1)
-    
-    if args.TS11:
-        ts11_model = next((model for model in models_config if model.get("ts_number") == "11"), None)
-        if ts11_model:
-            models_to_process.append(ts11_model)
-        else:
-            print("ERROR Error: TS11 model not found!")
-            sys.exit(1)
+    # The legacy --TSNN flags keep selecting the first model with the TS number; only
+    # --ts rejects a TS number that several models share
+    for ts_number in LEGACY_TS_FLAGS:
+        if getattr(args, f"TS{ts_number}"):
+            ts_models = model_index.matches(ts_number)
+            if not ts_models:
+                print(f"ERROR Error: TS{ts_number} model not found!")
+                sys.exit(1)
+            ts_model = ts_models[0]
+            if len(ts_models) > 1:
+                others = ", ".join(f"{model['edit_id']}_{model['code']}" for model in ts_models[1:])
+                print(f"WARNING  --TS{ts_number} selects {ts_model['edit_id']}_{ts_model['code']}; "
+                      f"TS{ts_number} is shared with {others} (select those with --ts by edit ID or code)")
+            models_to_process.append(ts_model)
     
-    if args.TS12:
-        ts12_model = next((model for model in models_config if model.get("ts_number") == "12"), None)
-        if ts12_model:
-            models_to_process.append(ts12_model)
-        else:
-            print("ERROR Error: TS12 model not found!")
+    if args.ts:
+        if not args.wgs_csbd and not args.gbdf_mcr:
+            print("ERROR Error: Either --wgs_csbd or --gbdf_mcr flag is required for --ts selections!")
+            print("\nPlease specify which type of models to select from:")
+            print("  python main_processor.py --wgs_csbd --ts 01,07,46")
+            print("  python main_processor.py --gbdf_mcr --ts 47")
+            print("\nUse --help for more information.")
             sys.exit(1)
-    
-    if args.TS13:
-        ts13_model = next((model for model in models_config if model.get("ts_number") == "13"), None)
-        if ts13_model:
-            models_to_process.append(ts13_model)
-        else:
-            print("ERROR Error: TS13 model not found!")
-            sys.exit(1)
-    
-    if args.TS14:
-        ts14_model = next((model for model in models_config if model.get("ts_number") == "14"), None)
-        if ts14_model:
-            models_to_process.append(ts14_model)
-        else:
-            print("ERROR Error: TS14 model not found!")
-            sys.exit(1)
-    
-    if args.TS15:
-        ts15_model = next((model for model in models_config if model.get("ts_number") == "15"), None)
-        if ts15_model:
-            models_to_process.append(ts15_model)
-        else:
-            print("ERROR Error: TS15 model not found!")
-            sys.exit(1)
-    
-    if args.TS46:
-        ts46_model = next((model for model in models_config if model.get("ts_number") == "46"), None)
-        if ts46_model:
-            models_to_process.append(ts46_model)
-        else:
-            print("ERROR Error: TS46 model not found!")
-            sys.exit(1)
-    
-    if args.TS47:
-        ts47_model = next((model for model in models_config if model.get("ts_number") == "47"), None)
-        if ts47_model:
-            models_to_process.append(ts47_model)
-        else:
-            print("ERROR Error: TS47 model not found!")
+        
+        try:
+            selected_ids = {id(ts_model) for ts_model in models_to_process}
+            for ts_model in model_index.resolve(args.ts):
+                if id(ts_model) not in selected_ids:
+                    models_to_process.append(ts_model)
+        except ValueError as e:
+            print(f"ERROR Error: {e}")
             sys.exit(1)
     
     if args.all:
@@ -740,6 +1015,7 @@ Examples:
         print("  --wgs_csbd --TS15    Process TS15 model (revenue model)")
         print("  --wgs_csbd --TS46    Process TS46 model (Multiple E&M Same day)")
         print("  --gbdf_mcr --TS47    Process TS47 model (Covid GBDF MCR)")
+        print("  --wgs_csbd --ts 01,07,46    Process a selection of TS models (numbers, ranges like 100-250)")
         print("  --wgs_csbd --all     Process all discovered WGS_CSBD models")
         print("  --gbdf_mcr --all     Process all discovered GBDF MCR models")
         print("  --list    List all available TS models")
@@ -749,13 +1025,39 @@ Examples:
     # Process selected models
     generate_postman = not args.no_postman
     
+    journal = None
+    if args.journal:
+        try:
+            journal = RunJournal(args.journal, resume=args.resume, fresh=args.fresh,
+                                 options={"generate_postman": generate_postman, "generator_options": generator_options})
+        except UnfinishedJournalError as e:
+            print(f"ERROR {e}")
+            sys.exit(1)
+        if args.resume:
+            models_to_process = skip_completed_models(models_to_process, journal)
+            if not models_to_process:
+                print(f"SUCCESS All selected models were completed by the journaled run ({args.journal})")
+                journal.finish()
+                report_metrics(metrics, args.metrics_json)
+                return
+    
     print(f"\nSTARTING Processing {len(models_to_process)} model(s)...")
     print("=" * 60)
     
     total_processed = 0
     successful_models = []
+    sequential_models = models_to_process
     
-    for i, model_config in enumerate(models_to_process, 1):
+    if args.jobs != 1 and len(models_to_process) > 1:
+        print(f"Running with {args.jobs if args.jobs > 0 else os.cpu_count()} parallel workers")
+        successful_models, _ = process_models_parallel(models_to_process, generate_postman, args.jobs, generator_options,
+                                                       args.quiet, metrics,
+                                                       args.profile_output if args.profile else None, fused=args.fused,
+                                                       journal=journal)
+        total_processed = sum(model["files_count"] for model in successful_models)
+        sequential_models = []
+    
+    for i, model_config in enumerate(sequential_models, 1):
         edit_id = model_config["edit_id"]
         code = model_config["code"]
         source_dir = model_config["source_dir"]
@@ -774,7 +1076,12 @@ Examples:
                 dest_dir=dest_dir,
                 generate_postman=generate_postman,
                 postman_collection_name=postman_collection_name,
-                postman_file_name=model_config.get('postman_file_name')
+                postman_file_name=model_config.get('postman_file_name'),
+                generator_options=generator_options,
+                quiet=args.quiet,
+                metrics=metrics,
+                fused=args.fused,
+                journal=journal.model(model_key(source_dir)) if journal else None
             )
             
             if renamed_files:
@@ -792,6 +1099,9 @@ Examples:
         except Exception as e:
             print(f"ERROR Model TS_{ts_number} ({edit_id}_{code}): Failed with error - {e}")
     
+    if journal:
+        journal.finish()
+    
     # Summary
     print("\n" + "=" * 60)
     print("SUMMARY PROCESSING SUMMARY")
@@ -818,6 +1128,8 @@ Examples:
         print("Files are now ready for API testing with Postman.")
     else:
         print("\nERROR No files were processed.")
+    
+    report_metrics(metrics, args.metrics_json)
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@
 # This file now supports both static configurations and dynamic discovery
 
 import os
+from functools import lru_cache
 from dynamic_models import discover_ts_folders, get_model_by_ts_number, get_all_models
 
 # Static model configurations (for backward compatibility)
@@ -166,7 +167,7 @@ STATIC_MODELS_CONFIG = {
 }
 
 # Dynamic model discovery
-def get_models_config(use_dynamic=True, use_wgs_csbd_destination=False, use_gbdf_mcr=False):
+def get_models_config(use_dynamic=True, use_wgs_csbd_destination=False, use_gbdf_mcr=False, refresh_discovery=False):
     """
     Get model configurations using dynamic discovery or static config.
     
@@ -174,6 +175,7 @@ def get_models_config(use_dynamic=True, use_wgs_csbd_destination=False, use_gbdf
         use_dynamic: If True, use dynamic discovery; if False, use static config
         use_wgs_csbd_destination: If True, use WGS_CSBD as destination folder instead of renaming_jsons
         use_gbdf_mcr: If True, use GBDF MCR models instead of WGS_CSBD
+        refresh_discovery: If True, ignore the on-disk discovery cache and rescan
         
     Returns:
         List of model configurations
@@ -182,7 +184,7 @@ def get_models_config(use_dynamic=True, use_wgs_csbd_destination=False, use_gbdf
         try:
             if use_gbdf_mcr:
                 # Use dynamic discovery for GBDF MCR
-                discovered_models = discover_ts_folders("source_folder/GBDF", False)
+                discovered_models = discover_ts_folders("source_folder/GBDF", False, refresh=refresh_discovery)
                 if discovered_models:
                     print(f"Dynamic discovery found {len(discovered_models)} GBDF MCR models")
                     return discovered_models
@@ -191,7 +193,7 @@ def get_models_config(use_dynamic=True, use_wgs_csbd_destination=False, use_gbdf
                     return STATIC_MODELS_CONFIG.get("gbdf", [])
             else:
                 # Use dynamic discovery for WGS_CSBD
-                discovered_models = discover_ts_folders("source_folder/WGS_CSBD", use_wgs_csbd_destination)
+                discovered_models = discover_ts_folders("source_folder/WGS_CSBD", use_wgs_csbd_destination, refresh=refresh_discovery)
                 if discovered_models:
                     print(f"Dynamic discovery found {len(discovered_models)} WGS_CSBD models")
                     return discovered_models
@@ -226,8 +228,22 @@ def get_model_by_ts(ts_number):
         print(f"Error getting model for TS_{ts_number}: {e}")
         return None
 
-# For backward compatibility, keep MODELS_CONFIG as a property
-MODELS_CONFIG = get_models_config(use_dynamic=True)
+@lru_cache(maxsize=None)
+def get_default_models_config():
+    """
+    Get the default (WGS_CSBD) model configurations, discovering them on first use.
+    
+    Returns:
+        List of model configurations (shared; callers must not modify it)
+    """
+    return get_models_config(use_dynamic=True)
+
+def __getattr__(name):
+    # For backward compatibility, MODELS_CONFIG is still available as a module attribute,
+    # but it is computed on first access so importing this module doesn't scan source_folder
+    if name == "MODELS_CONFIG":
+        return get_default_models_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Global settings
 GENERATE_POSTMAN_COLLECTIONS = True
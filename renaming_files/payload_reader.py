@@ -0,0 +1,121 @@
+"""
+Payload Reader - Overlap payload file reads while keeping collection order.
+Used by the Postman generator so that building a collection from a high-latency share
+(e.g. a network mount) is bound by bandwidth rather than by per-file latency.
+"""
+
+import asyncio
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Queue markers for the results handed from the event loop thread to the consumer
+_RESULT = "result"
+_ERROR = "error"
+_DONE = "done"
+
+
+async def _produce(func: Callable[[T], R], items: Iterable[T], concurrency: int,
+                   results: "queue.Queue", stop: threading.Event):
+    """Run func over items on a thread pool, at most `concurrency` at a time, and put
+    the outcomes on `results` in input order."""
+    loop = asyncio.get_running_loop()
+
+    def put(kind, value) -> bool:
+        # The queue is bounded, so a slow consumer holds back new reads
+        while not stop.is_set():
+            try:
+                results.put((kind, value), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def emit(kind, value) -> bool:
+        if stop.is_set():
+            return False
+        try:
+            results.put_nowait((kind, value))
+            return True
+        except queue.Full:
+            # Wait for the consumer on another thread, so the event loop is never blocked
+            return await loop.run_in_executor(None, put, kind, value)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="payload-reader") as executor:
+        # Sliding window of in-flight reads; the oldest one is always awaited first
+        window = deque()
+
+        async def emit_oldest() -> bool:
+            try:
+                value = await window.popleft()
+            except Exception as e:
+                # Nothing after a failed item is needed
+                await emit(_ERROR, e)
+                return False
+            return await emit(_RESULT, value)
+
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                window.append(loop.run_in_executor(executor, func, item))
+                if len(window) >= concurrency and not await emit_oldest():
+                    return
+            while window:
+                if not await emit_oldest():
+                    return
+            await emit(_DONE, None)
+        except Exception as e:
+            await emit(_ERROR, e)
+        finally:
+            for future in window:
+                future.cancel()
+
+
+def map_ordered(func: Callable[[T], R], items: Iterable[T], concurrency: int = 1) -> Iterator[R]:
+    """Lazily yield func(item) for each item, in order, computing up to `concurrency` ahead.
+
+    With concurrency > 1 an asyncio event loop in a background thread offloads the calls
+    to a thread pool through a bounded sliding window, and an ordered hand-off queue feeds
+    the results back to the (synchronous) caller. At most about 2 x concurrency results
+    are held at once, so memory stays bounded no matter how many items there are.
+    An exception raised by func is re-raised at that item's position.
+
+    Args:
+        func: Function to apply, typically reading and parsing one payload file
+        items: Items to process
+        concurrency: Maximum number of calls in flight (1 = plain sequential map)
+
+    Yields:
+        func(item) for each item, in input order
+    """
+    if concurrency <= 1:
+        yield from map(func, items)
+        return
+
+    results = queue.Queue(maxsize=concurrency)
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=lambda: asyncio.run(_produce(func, items, concurrency, results, stop)),
+        name="payload-reader-loop",
+        daemon=True
+    )
+    thread.start()
+
+    try:
+        while True:
+            kind, value = results.get()
+            if kind == _DONE:
+                break
+            if kind == _ERROR:
+                raise value
+            yield value
+    finally:
+        # Also reached when the consumer stops early; waits only for reads already in flight
+        stop.set()
+        thread.join()
@@ -0,0 +1,164 @@
+"""
+Pipeline Metrics - Stage timers, per-model counters and per-file latency for a processing run.
+Also provides the throttled progress line used instead of per-file output in quiet mode.
+"""
+
+import sys
+import json
+import math
+import time
+import contextlib
+from typing import Dict, List, Any, Optional
+
+
+# Stages recorded by the pipeline, in the order they are reported
+PIPELINE_STAGES = ["discovery", "rename", "collection_build", "serialization", "write"]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list (None if it is empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class PipelineMetrics:
+    """Collect timing and counters for one run of the pipeline.
+
+    Worker processes each collect their own metrics and send snapshot() back to the
+    parent, which folds them in with merge().
+    """
+
+    def __init__(self):
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self._start = time.perf_counter()
+        # stage name -> [total seconds, number of timed sections]
+        self.stages: Dict[str, List[float]] = {}
+        # model label -> counter name -> value
+        self.models: Dict[str, Dict[str, int]] = {}
+        # Seconds spent on each individual file move
+        self.file_latencies: List[float] = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as (part of) stage `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - start)
+
+    def add_stage_time(self, name: str, seconds: float, sections: int = 1):
+        totals = self.stages.setdefault(name, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += sections
+
+    def count(self, model: str, counter: str, amount: int = 1):
+        counters = self.models.setdefault(model, {})
+        counters[counter] = counters.get(counter, 0) + amount
+
+    def record_file(self, seconds: float):
+        self.file_latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Raw, picklable state for merging into another PipelineMetrics."""
+        return {
+            "stages": self.stages,
+            "models": self.models,
+            "file_latencies": self.file_latencies
+        }
+
+    def merge(self, snapshot: Optional[Dict[str, Any]]):
+        """Fold in the snapshot() of metrics collected elsewhere (e.g. a worker process)."""
+        if not snapshot:
+            return
+        for name, (seconds, sections) in snapshot.get("stages", {}).items():
+            self.add_stage_time(name, seconds, sections)
+        for model, counters in snapshot.get("models", {}).items():
+            for counter, amount in counters.items():
+                self.count(model, counter, amount)
+        self.file_latencies.extend(snapshot.get("file_latencies", []))
+
+    def summary(self) -> Dict[str, Any]:
+        """Metrics as a JSON-serializable report.
+
+        Stage times from parallel workers are summed, so they can exceed wall_seconds.
+        """
+        latencies = sorted(self.file_latencies)
+        ordered = [name for name in PIPELINE_STAGES if name in self.stages]
+        ordered += sorted(name for name in self.stages if name not in PIPELINE_STAGES)
+
+        totals: Dict[str, int] = {}
+        for counters in self.models.values():
+            for counter, amount in counters.items():
+                totals[counter] = totals.get(counter, 0) + amount
+
+        def ms(seconds):
+            return round(seconds * 1000, 3) if seconds is not None else None
+
+        return {
+            "started_at": self.started_at,
+            "wall_seconds": round(time.perf_counter() - self._start, 4),
+            "stages": {
+                name: {"seconds": round(self.stages[name][0], 4), "sections": self.stages[name][1]}
+                for name in ordered
+            },
+            "file_latency_ms": {
+                "count": len(latencies),
+                "p50": ms(percentile(latencies, 0.50)),
+                "p95": ms(percentile(latencies, 0.95)),
+                "max": ms(latencies[-1] if latencies else None),
+                "mean": ms(sum(latencies) / len(latencies) if latencies else None)
+            },
+            "totals": totals,
+            "models": self.models
+        }
+
+    def write_json(self, path: str):
+        """Write summary() to `path` as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+            f.write("\n")
+
+
+class ProgressLine:
+    """A single progress line, redrawn at most once per interval.
+
+    On a terminal the line is rewritten in place; otherwise (log files, captured
+    worker output) a plain line is printed every few seconds.
+    """
+
+    def __init__(self, label: str, total: int, interval: Optional[float] = None):
+        self.label = label
+        self.total = total
+        self._stream = sys.stdout
+        self._tty = hasattr(self._stream, "isatty") and self._stream.isatty()
+        self.interval = interval if interval is not None else (0.2 if self._tty else 5.0)
+        self._start = time.perf_counter()
+        self._last = self._start
+        self._drawn = False
+
+    def _render(self, done: int) -> str:
+        elapsed = time.perf_counter() - self._start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        return f"{self.label}: {done}/{self.total} files ({rate:.0f} files/s)"
+
+    def update(self, done: int):
+        now = time.perf_counter()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        if self._tty:
+            self._stream.write("\r" + self._render(done))
+            self._stream.flush()
+            self._drawn = True
+        else:
+            print(self._render(done), file=self._stream)
+
+    def finish(self, done: int):
+        if self._tty and self._drawn:
+            self._stream.write("\r" + self._render(done) + "\n")
+            self._stream.flush()
+        else:
+            print(self._render(done), file=self._stream)
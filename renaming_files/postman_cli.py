@@ -5,12 +5,16 @@ from renamed JSON files in the renaming_postman_collection project
 """
 
 import argparse
+import contextlib
 import sys
 import os
+import time
 from pathlib import Path
 
 # Import the Postman generator
-from postman_generator import PostmanCollectionGenerator
+from postman_generator import (PostmanCollectionGenerator, add_generator_arguments, check_generator_arguments,
+                               generator_options)
+from profiling import profiled
 
 
 def main():
@@ -22,6 +26,15 @@ Examples:
     # Generate Postman collection for all JSON files
     python postman_cli.py generate --collection-name "RevenueTestCollection"
     
+    # Embed payloads exactly as stored instead of re-serializing them (faster for large suites)
+    python postman_cli.py generate --collection-name "RevenueTestCollection" --body-mode raw
+    
+    # Only rebuild requests whose payload changed since the last run
+    python postman_cli.py generate --collection-name "RevenueTestCollection" --incremental
+    
+    # Overlap payload reads when the JSON files live on a network share
+    python postman_cli.py generate --collection-name "RevenueTestCollection" --read-concurrency 16
+    
     # Generate collection for specific directory
     python postman_cli.py generate --directory "renaming_jsons/TS_01_REVENUE_WGS_CSBD_rvn001_00W5_payloads_dis"
     
@@ -36,8 +49,27 @@ Examples:
     
     # Validate a collection
     python postman_cli.py validate --collection-path "postman_collections/test_collection/postman_collection.json"
+    
+    # Also check every request (method, URL, raw JSON body) while streaming the collection
+    python postman_cli.py validate --collection-path "postman_collections/test_collection/postman_collection.json" --check-items
+    
+    # Deep check for CI: request names too, on 8 worker processes, failing after 10 minutes
+    python postman_cli.py validate --collection-path "postman_collections/test_collection/postman_collection.json" --deep --jobs 8 --time-budget 600
+    
+    # Validate every collection under postman_collections/ on a worker pool (exits 1 on any failure)
+    python postman_cli.py validate-all --jobs 8
+    
+    # Generate gzip-compressed collections (validate reads .json.gz/.json.zst directly)
+    python postman_cli.py generate-all --compress gzip
+    
+    # Profile a run (writes postman_cli_profile.pstats/.collapsed/.hot.json)
+    python postman_cli.py --profile generate-all
         """
     )
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the command with cProfile (writes .pstats, flamegraph .collapsed and .hot.json files)")
+    parser.add_argument("--profile-output", default="postman_cli_profile", metavar="PREFIX",
+                        help="Path prefix for the profile files (default: postman_cli_profile)")
     
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
     
@@ -47,15 +79,22 @@ Examples:
     generate_parser.add_argument("--directory", help="Generate collection for specific directory")
     generate_parser.add_argument("--source-dir", default="renaming_jsons", help="Source directory containing JSON files")
     generate_parser.add_argument("--output-dir", default="postman_collections", help="Output directory for Postman collections")
+    add_generator_arguments(generate_parser)
     
     # Generate all command
     generate_all_parser = subparsers.add_parser("generate-all", help="Generate collections for all directories")
     generate_all_parser.add_argument("--source-dir", default="renaming_jsons", help="Source directory containing JSON files")
     generate_all_parser.add_argument("--output-dir", default="postman_collections", help="Output directory for Postman collections")
+    add_generator_arguments(generate_all_parser)
     
     # List directories command
     list_dirs_parser = subparsers.add_parser("list-directories", help="List available directories")
     list_dirs_parser.add_argument("--source-dir", default="renaming_jsons", help="Source directory containing JSON files")
+    list_dirs_parser.add_argument("--refresh", action="store_true",
+                                  help="Ignore the cached directory statistics and rescan the source directory. "
+                                       "The cache is checked against directory mtimes only: added, removed and "
+                                       "renamed files are picked up, but a file rewritten in place (or a change "
+                                       "on a filesystem with coarse mtimes) is not, so use --refresh after those")
     
     # Stats command
     stats_parser = subparsers.add_parser("stats", help="Show statistics for a directory")
@@ -65,29 +104,63 @@ Examples:
     # Validate command
     validate_parser = subparsers.add_parser("validate", help="Validate a Postman collection")
     validate_parser.add_argument("--collection-path", required=True, help="Path to collection file")
+    validate_parser.add_argument("--check-items", action="store_true",
+                                 help="Also check every request's name, method, URL and raw JSON body")
+    validate_parser.add_argument("--deep", action="store_true",
+                                 help="Check every request as --check-items does, plus its name against the "
+                                      "TC#id#edit#code#suffix template, on a pool of worker processes")
+    validate_parser.add_argument("--jobs", type=int, default=None,
+                                 help="Worker processes for --deep (default: number of CPUs)")
+    validate_parser.add_argument("--time-budget", type=float, default=None, metavar="SECONDS",
+                                 help="Fail if the item checks do not finish within this many seconds")
+    validate_parser.add_argument("--strict", action="store_true",
+                                 help="Exit with status 1 if the collection is invalid (e.g. to fail a CI job)")
+    
+    # Validate-all command
+    validate_all_parser = subparsers.add_parser("validate-all", help="Validate every collection in a directory tree")
+    validate_all_parser.add_argument("--collections-dir", default="postman_collections",
+                                     help="Directory searched recursively for collections (.json, .json.gz, .json.zst)")
+    validate_all_parser.add_argument("--jobs", type=int, default=None,
+                                     help="Worker processes (default: number of CPUs)")
+    validate_all_parser.add_argument("--check-items", action="store_true",
+                                     help="Also check every request's name, method, URL and raw JSON body")
+    validate_all_parser.add_argument("--deep", action="store_true",
+                                     help="As --check-items, plus request names against the TC#id#edit#code#suffix template")
     
     args = parser.parse_args()
     
     if not args.command:
         parser.print_help()
         return
+    if getattr(args, "jobs", None) is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.command in ("generate", "generate-all"):
+        check_generator_arguments(parser, args)
     
     try:
-        if args.command == "generate":
-            handle_generate(args)
-        elif args.command == "generate-all":
-            handle_generate_all(args)
-        elif args.command == "list-directories":
-            handle_list_directories(args)
-        elif args.command == "stats":
-            handle_stats(args)
-        elif args.command == "validate":
-            handle_validate(args)
+        with profiled(args.profile_output) if args.profile else contextlib.nullcontext():
+            run_command(args)
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
 
 
+def run_command(args):
+    """Dispatch a parsed command to its handler."""
+    if args.command == "generate":
+        handle_generate(args)
+    elif args.command == "generate-all":
+        handle_generate_all(args)
+    elif args.command == "list-directories":
+        handle_list_directories(args)
+    elif args.command == "stats":
+        handle_stats(args)
+    elif args.command == "validate":
+        handle_validate(args)
+    elif args.command == "validate-all":
+        handle_validate_all(args)
+
+
 def handle_generate(args):
     """Handle the generate command."""
     print("🔧 Generating Postman API collection...")
@@ -95,7 +168,8 @@ def handle_generate(args):
     
     generator = PostmanCollectionGenerator(
         source_dir=args.source_dir,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        **generator_options(args)
     )
     
     if args.directory:
@@ -126,7 +200,8 @@ def handle_generate_all(args):
     
     generator = PostmanCollectionGenerator(
         source_dir=args.source_dir,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        **generator_options(args)
     )
     
     collections = generator.generate_all_collections()
@@ -152,22 +227,19 @@ def handle_generate_all(args):
 def handle_list_directories(args):
     """Handle the list-directories command."""
     generator = PostmanCollectionGenerator(source_dir=args.source_dir)
-    directories = generator.list_available_directories()
+    # One scan of the source tree for every directory (cached between runs)
+    all_stats = generator.get_all_directory_stats(refresh=args.refresh)
     
-    if directories:
+    if all_stats:
         print("Available directories for Postman collections:")
         print("=" * 50)
-        for directory in directories:
-            stats = generator.get_directory_stats(directory)
-            if "error" not in stats:
-                print(f"📁 {directory}:")
-                print(f"   Files: {stats['total_files']}")
-                print(f"   Types: {', '.join(stats['suffixes'])}")
-                print(f"   Edit IDs: {', '.join(stats['edit_ids'])}")
-                print(f"   EOB Codes: {', '.join(stats['eob_codes'])}")
-                print()
-            else:
-                print(f"📁 {directory}: {stats['error']}")
+        for directory, stats in all_stats.items():
+            print(f"📁 {directory}:")
+            print(f"   Files: {stats['total_files']}")
+            print(f"   Types: {', '.join(stats['suffixes'])}")
+            print(f"   Edit IDs: {', '.join(stats['edit_ids'])}")
+            print(f"   EOB Codes: {', '.join(stats['eob_codes'])}")
+            print()
     else:
         print("No directories found in source directory.")
 
@@ -199,7 +271,12 @@ def handle_validate(args):
         sys.exit(1)
     
     generator = PostmanCollectionGenerator()
-    validation_result = generator.validate_collection(collection_path)
+    jobs = (args.jobs or os.cpu_count() or 1) if args.deep else (args.jobs or 1)
+    validation_result = generator.validate_collection(collection_path,
+                                                      check_items=args.check_items or args.time_budget is not None,
+                                                      check_names=args.deep,
+                                                      jobs=jobs,
+                                                      time_budget=args.time_budget)
     
     print(f"Validation Results for {collection_path}:")
     print("=" * 50)
@@ -220,6 +297,66 @@ def handle_validate(args):
         print("\n📊 Statistics:")
         for key, value in validation_result["stats"].items():
             print(f"  {key}: {value}")
+    
+    if args.strict and not validation_result["valid"]:
+        sys.exit(1)
+
+
+def handle_validate_all(args):
+    """Handle the validate-all command."""
+    collections_dir = Path(args.collections_dir)
+    
+    if not collections_dir.is_dir():
+        print(f"❌ Collections directory not found: {collections_dir}")
+        sys.exit(1)
+    
+    generator = PostmanCollectionGenerator()
+    collection_paths = generator.find_collection_files(collections_dir)
+    if not collection_paths:
+        print(f"⚠️  No collections found under {collections_dir}")
+        return
+    
+    print(f"🔍 Validating {len(collection_paths)} collections under {collections_dir}...")
+    print("=" * 50)
+    
+    started = time.perf_counter()
+    results = []
+    total = len(collection_paths)
+    for done, (path, result, seconds) in enumerate(
+            generator.validate_collections(collection_paths, jobs=args.jobs,
+                                           check_items=args.check_items or args.deep,
+                                           check_names=args.deep), 1):
+        results.append((path, result, seconds))
+        label = path.relative_to(collections_dir)
+        if "shards" in result["stats"]:
+            detail = f"index of {result['stats']['shards']} shards"
+        else:
+            detail = f"{result['stats'].get('total_requests', 0)} requests"
+        if result["valid"]:
+            print(f"✅ [{done}/{total}] {label} ({detail}, {seconds:.2f}s)")
+        else:
+            print(f"❌ [{done}/{total}] {label} ({seconds:.2f}s)")
+            for error in result["errors"]:
+                print(f"  - {error}")
+    elapsed = time.perf_counter() - started
+    
+    failed = sorted(path for path, result, _ in results if not result["valid"])
+    print("\n📊 Summary:")
+    print(f"  Collections: {total}")
+    print(f"  Valid: {total - len(failed)}")
+    print(f"  Invalid: {len(failed)}")
+    print(f"  Requests: {sum(result['stats'].get('total_requests', 0) for _, result, _ in results)}")
+    print(f"  Wall time: {elapsed:.2f}s (validation time summed over collections: "
+          f"{sum(seconds for _, _, seconds in results):.2f}s)")
+    print("  Slowest:")
+    for path, _, seconds in sorted(results, key=lambda entry: entry[2], reverse=True)[:5]:
+        print(f"    {seconds:.2f}s  {path.relative_to(collections_dir)}")
+    
+    if failed:
+        print("\n❌ Invalid collections:")
+        for path in failed:
+            print(f"  - {path.relative_to(collections_dir)}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
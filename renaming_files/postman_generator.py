@@ -3,22 +3,317 @@ Postman Collection Generator - Generate Postman API collections from JSON files
 Converts organized JSON files into Postman collections for API testing and validation
 """
 
+import io
 import json
 import os
+import gzip
+import mmap
+import codecs
+import hashlib
 import re
 import uuid
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Optional, Tuple, Union
 from datetime import datetime
 
+try:
+    import zstandard
+except ImportError:
+    # Optional: only needed for zstd-compressed collections
+    zstandard = None
+
+from payload_reader import map_ordered
+from collection_stream import iter_collection, check_json, check_json_text, CollectionFormatError, ARRAY, VALUE
+from collection_checks import ItemChecker
+from directory_stats import collect_directory_stats, scan_directory_stats
+from filename_parser import ParsedFilename, parse_filename
+
+
+# Stand-in for the item list when rendering the text around it (see _write_collection_stream)
+_ITEMS_PLACEHOLDER = "__postman_collection_items__"
+# Stand-in for a memory-mapped request body while rendering the item around it
+_BODY_PLACEHOLDER = "__postman_payload_body__"
+
+
+# How payload files are embedded as request bodies:
+#   pretty     - parse and re-serialize with indent=2 (original behaviour)
+#   raw        - embed the file text exactly as stored, after checking it is valid JSON
+#   normalized - like raw, with a UTF-8 BOM, CRLF line endings and surrounding whitespace removed
+BODY_MODES = ("pretty", "raw", "normalized")
+
+# HTTP method by filename suffix
+SUFFIX_METHODS = {
+    'LR': 'POST',  # Limited Response - POST for validation
+    'NR': 'POST',  # No Response - POST for validation
+    'EX': 'POST'   # Exception - POST for validation
+}
+
+# Headers sent with every request
+REQUEST_HEADERS = (
+    ("Content-Type", "application/json"),
+    ("meta-transid", "20220117181853TMBL20359Cl893580999"),
+    ("meta-src-envrmt", "IMSH")
+)
+_REQUEST_URL = "{{baseUrl}}/api/validate/{{tc_id}}"
+
+# Parts of every v2.1 item that never change, shared by all items instead of rebuilt for each
+_ITEM_HEADERS = [{"key": key, "value": value, "type": "text"} for key, value in REQUEST_HEADERS]
+_ITEM_URL = {
+    "raw": _REQUEST_URL,
+    "host": ["{{baseUrl}}"],
+    "path": ["api", "validate", "{{tc_id}}"]
+}
+_RAW_JSON_OPTIONS = {"raw": {"language": "json"}}
+
+# Item problems listed individually by validate_collection(check_items=True); the rest are counted
+MAX_REPORTED_ITEM_ERRORS = 100
+
+# Compressed collection output: compression name -> file extension added to the collection file
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Files written beside collections that are not collections themselves
+_MANIFEST_SUFFIX = ".manifest.json"
+_SHARD_INDEX_SUFFIX = ".index.json"
+
+# Bumped whenever the manifest layout or the rendering of collection items changes
+MANIFEST_VERSION = 1
+
+# In raw and normalized mode, payload files of at least this many bytes are checked and
+# embedded straight from a memory map, a chunk at a time, instead of being read into memory
+MMAP_THRESHOLD = 1 << 20
+_MMAP_CHUNK_SIZE = 1 << 18
+
+
+def split_compression_extension(filename: str) -> Tuple[str, Optional[str]]:
+    """Split a collection filename into the name without its compression extension and
+    the compression used (None for plain JSON), e.g. "a.json.gz" -> ("a.json", "gzip")."""
+    for compression, extension in COMPRESSIONS.items():
+        if filename.endswith(extension):
+            return filename[:-len(extension)], compression
+    return filename, None
+
+
+def open_collection_file(path: Path):
+    """Open a collection file for binary reading, decompressing .gz and .zst files."""
+    _, compression = split_compression_extension(Path(path).name)
+    if compression == "gzip":
+        return gzip.open(path, 'rb')
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError(f"Reading {path} requires the zstandard package (pip install zstandard)")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def add_generator_arguments(parser) -> None:
+    """Add the collection generation options to an argparse parser (or subparser).
+    
+    Shared by main_processor.py, postman_cli.py and this module's main(), so the flags stay
+    the same everywhere; read them back with generator_options() after
+    check_generator_arguments().
+    """
+    parser.add_argument("--body-mode", choices=BODY_MODES, default="pretty",
+                        help="How payloads are embedded: re-serialized (pretty) or as stored (raw/normalized)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse unchanged requests from the previous collection (tracked in a .manifest.json beside it)")
+    parser.add_argument("--read-concurrency", type=int, default=1, metavar="N",
+                        help="Payload files read in parallel while building a collection (default: 1; raise for network shares)")
+    parser.add_argument("--max-shard-items", type=int, metavar="N",
+                        help="Split each collection into shards of at most N requests, listed in an .index.json file")
+    parser.add_argument("--max-shard-mb", type=float, metavar="MB",
+                        help="Split each collection into shards of about MB megabytes, listed in an .index.json file")
+    parser.add_argument("--compress", choices=list(COMPRESSIONS),
+                        help="Write collections compressed (.json.gz, or .json.zst with the zstandard package)")
+    parser.add_argument("--shared-headers", action="store_true",
+                        help="Set the request headers once on each collection instead of on every request")
+    parser.add_argument("--deterministic", action="store_true",
+                        help="Sort requests by payload path and derive IDs from content (byte-identical output for unchanged inputs)")
+
+
+def check_generator_arguments(parser, args) -> None:
+    """Report invalid combinations of the add_generator_arguments options with parser.error.
+    
+    Runs before any work is done, so e.g. main_processor does not move every model's files
+    only to fail to write each of their collections.
+    """
+    if args.incremental and (args.max_shard_items or args.max_shard_mb):
+        parser.error("--incremental cannot be combined with --max-shard-items/--max-shard-mb")
+    if args.compress == "zstd" and zstandard is None:
+        parser.error("--compress zstd requires the zstandard package (pip install zstandard)")
+
+
+def generator_options(args) -> Dict[str, Any]:
+    """Keyword arguments for PostmanCollectionGenerator from the add_generator_arguments options."""
+    return {
+        "body_mode": args.body_mode,
+        "incremental": args.incremental,
+        "read_concurrency": args.read_concurrency,
+        "max_shard_items": args.max_shard_items,
+        "max_shard_bytes": int(args.max_shard_mb * 1024 * 1024) if args.max_shard_mb else None,
+        "compression": args.compress,
+        "shared_headers": args.shared_headers,
+        "deterministic": args.deterministic
+    }
+
+
+def _forward_spans(reused: Dict[int, Tuple[int, int]]) -> Dict[int, Tuple[int, int]]:
+    """Keep the reused spans that can be copied in one forward pass over the previous file.
+    
+    Going through the items in collection order, a span is kept only if it starts after the
+    last span kept; items whose span would need a backward seek are left out (and rebuilt).
+    """
+    kept = {}
+    end = 0
+    for index in sorted(reused):
+        offset, length = reused[index]
+        if offset >= end:
+            kept[index] = (offset, length)
+            end = offset + length
+    return kept
+
+
+def _validate_collection_worker(output_dir: str, collection_path: Path,
+                                check_items: bool, check_names: bool) -> Tuple[Dict[str, Any], float]:
+    """Validate one collection inside a worker process (see validate_collections)."""
+    started = time.perf_counter()
+    generator = PostmanCollectionGenerator(output_dir=output_dir)
+    if collection_path.name.endswith(_SHARD_INDEX_SUFFIX):
+        result = generator.validate_shard_index(collection_path)
+    else:
+        result = generator.validate_collection(collection_path, check_items=check_items, check_names=check_names)
+    return result, time.perf_counter() - started
+
+
+def _file_sha256(path: Path) -> str:
+    """SHA-256 of a file, hashed from a memory map rather than a copy of its contents."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+class _MappedPayload:
+    """Request body of a large payload file, read from a memory map each time it is needed."""
+    
+    def __init__(self, path: Path, normalized: bool):
+        self.path = path
+        self.normalized = normalized
+    
+    def chunks(self) -> Iterator[str]:
+        """Yield the body text in pieces, as _read_payload_body would return it in one string."""
+        pieces = self._decoded_chunks()
+        if self.normalized:
+            pieces = self._normalize(pieces)
+        return pieces
+    
+    def _decoded_chunks(self) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, len(mapped), _MMAP_CHUNK_SIZE):
+                text = decoder.decode(mapped[start:start + _MMAP_CHUNK_SIZE])
+                if text:
+                    yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+    
+    @staticmethod
+    def _normalize(pieces: Iterator[str]) -> Iterator[str]:
+        """Translate newlines, then drop a leading BOM and surrounding whitespace across pieces."""
+        carried_cr = ""
+        leading = "bom"
+        trailing_space = ""
+        for text in pieces:
+            text = carried_cr + text
+            carried_cr = "\r" if text.endswith("\r") else ""
+            if carried_cr:
+                # Might be the first half of a CRLF
+                text = text[:-1]
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+            
+            if leading == "bom":
+                text = text.lstrip('\ufeff')
+                if text:
+                    leading = "space"
+            if leading == "space":
+                text = text.lstrip()
+                if text:
+                    leading = None
+            if not text:
+                continue
+            
+            body = text.rstrip()
+            if body:
+                yield trailing_space + body
+                trailing_space = text[len(body):]
+            else:
+                trailing_space += text
+
+
+class _CollectionWriter:
+    """Binary file wrapper that writes text the way a UTF-8 text-mode file would, and
+    keeps track of the byte offset so item positions can be recorded in the manifest."""
+    
+    def __init__(self, f):
+        self._f = f
+        self._newline = os.linesep.encode('ascii')
+        self.position = 0
+    
+    def write(self, text: str) -> None:
+        data = text.encode('utf-8')
+        if self._newline != b"\n":
+            data = data.replace(b"\n", self._newline)
+        self.write_bytes(data)
+    
+    def write_bytes(self, data: bytes) -> None:
+        self._f.write(data)
+        self.position += len(data)
+
 
 class PostmanCollectionGenerator:
     """Generate Postman API collections from organized JSON files."""
     
-    def __init__(self, source_dir: str = "renaming_jsons", output_dir: str = "postman_collections"):
+    def __init__(self, source_dir: str = "renaming_jsons", output_dir: str = "postman_collections",
+                 body_mode: str = "pretty", incremental: bool = False, read_concurrency: int = 1,
+                 metrics=None, mmap_threshold: Optional[int] = MMAP_THRESHOLD,
+                 max_shard_items: Optional[int] = None, max_shard_bytes: Optional[int] = None,
+                 compression: Optional[str] = None, shared_headers: bool = False, deterministic: bool = False):
+        if body_mode not in BODY_MODES:
+            raise ValueError(f"Unknown body mode '{body_mode}' (expected one of: {', '.join(BODY_MODES)})")
+        if (max_shard_items or max_shard_bytes) and incremental:
+            raise ValueError("Incremental generation cannot be combined with sharded output")
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}' (expected one of: {', '.join(COMPRESSIONS)})")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package (pip install zstandard)")
+        
         self.source_dir = Path(source_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.body_mode = body_mode
+        # Reuse unchanged items from the previous collection (see generate_postman_collection)
+        self.incremental = incremental
+        # Payload files read and parsed ahead of the writer; raise it for high-latency shares
+        self.read_concurrency = max(1, read_concurrency)
+        # Optional PipelineMetrics receiving collection_build/serialization/write times
+        self.metrics = metrics
+        # Smallest payload streamed from a memory map in raw/normalized mode (None or 0 = never)
+        self.mmap_threshold = mmap_threshold
+        # Per-shard budgets; when either is set collections are split into numbered shards
+        # plus an index file (see _write_shards)
+        self.max_shard_items = max_shard_items
+        self.max_shard_bytes = max_shard_bytes
+        # Collection files are compressed while they are streamed and get a .gz/.zst extension
+        self.compression = compression
+        # Set REQUEST_HEADERS once on the collection instead of on every request
+        self.shared_headers = shared_headers
+        # Sort items by payload path and derive IDs from content, so unchanged inputs
+        # always produce byte-identical collections
+        self.deterministic = deterministic
         
         # Postman collection structure template - minimal format for better compatibility
         self.collection_template = {
@@ -28,35 +323,72 @@ class PostmanCollectionGenerator:
             "items": []
         }
     
-    def _parse_filename(self, filename: str) -> Optional[Dict[str, str]]:
+    def _parse_filename(self, filename: str) -> Optional[ParsedFilename]:
         """Parse Postman-style filename to extract test case information.
         
         Args:
             filename: Filename in format TC#ID#edit_id#eob_code#suffix.json
             
         Returns:
-            Dictionary with parsed components or None if parsing fails
+            ParsedFilename (tc_prefix, tc_id, edit_id, eob_code, suffix, ...) or None
+            if the name is not in the 5-part template
         """
-        if not filename.endswith('.json'):
-            return None
+        parsed = parse_filename(filename)
+        return parsed if parsed is not None and parsed.is_renamed else None
+    
+    def _is_mapped(self, size: int) -> bool:
+        """Whether a payload file of `size` bytes is streamed from a memory map."""
+        return self.body_mode != "pretty" and bool(self.mmap_threshold) and size >= self.mmap_threshold
+    
+    def _read_payload_body(self, json_file: Path, data: Optional[bytes] = None) -> Union[str, _MappedPayload]:
+        """Read a payload file and return the text to embed as the request body.
+        
+        In "pretty" mode the payload is parsed and re-serialized with indent=2. In "raw"
+        and "normalized" mode the file text is embedded as-is; it is only parsed to check
+        that it is valid JSON, without building its values (see collection_stream).
+        Files of at least mmap_threshold bytes are not kept in memory in these modes: they
+        are checked from a memory map, and the writer later copies them into the collection
+        from the map a chunk at a time (see _write_collection_stream).
+        Unreadable or invalid payloads are embedded as an empty object.
+        
+        Args:
+            json_file: Path to the JSON payload file
+            data: File contents, if the caller has already read them
             
-        name_without_ext = filename.replace('.json', '')
-        
-        if '#' in name_without_ext:
-            parts = name_without_ext.split('#')
-            if len(parts) == 5:
-                return {
-                    'tc_prefix': parts[0],  # TC
-                    'tc_id': parts[1],      # 000001_53626
-                    'edit_id': parts[2],    # rvn002
-                    'eob_code': parts[3],   # 00W06
-                    'suffix': parts[4],     # LR/NR/EX
-                    'original_filename': filename
-                }
+        Returns:
+            Request body text, or a _MappedPayload for large payload files
+        """
+        try:
+            if data is None and self.body_mode != "pretty" and self.mmap_threshold:
+                stat = json_file.stat()
+                if self._is_mapped(stat.st_size):
+                    payload = _MappedPayload(json_file, normalized=self.body_mode == "normalized")
+                    # Checked a buffer at a time, never as one string (see collection_stream.check_json)
+                    check_json(payload.chunks())
+                    return payload
+            
+            if data is None:
+                data = json_file.read_bytes()
+            body = data.decode('utf-8')
+            if self.body_mode != "raw":
+                # Same newline translation as reading the file in text mode;
+                # raw mode keeps the stored line endings
+                body = body.replace('\r\n', '\n').replace('\r', '\n')
+            
+            if self.body_mode == "pretty":
+                return json.dumps(json.loads(body), indent=2)
+            
+            if self.body_mode == "normalized":
+                body = body.lstrip('\ufeff').strip()
+            
+            check_json_text(body)
+        except Exception as e:
+            print(f"Warning: Could not read {json_file}: {e}")
+            return json.dumps({}, indent=2)
         
-        return None
+        return body
     
-    def _create_postman_request(self, json_file_path: Path, parsed_info: Dict[str, str]) -> Dict[str, Any]:
+    def _create_postman_request(self, json_file_path: Path, parsed_info: ParsedFilename) -> Dict[str, Any]:
         """Create a Postman request from a JSON file.
         
         Args:
@@ -67,88 +399,494 @@ class PostmanCollectionGenerator:
             Postman request structure
         """
         # Read JSON content
-        try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                json_content = json.load(f)
-        except Exception as e:
-            print(f"Warning: Could not read {json_file_path}: {e}")
-            json_content = {}
+        body = self._read_payload_body(json_file_path)
         
         # Create request name based on actual filename (without .json extension)
         request_name = json_file_path.stem  # This gets the filename without extension
         
         # Determine HTTP method based on suffix
-        method_map = {
-            'LR': 'POST',  # Limited Response - POST for validation
-            'NR': 'POST',  # No Response - POST for validation
-            'EX': 'POST'   # Exception - POST for validation
-        }
-        method = method_map.get(parsed_info['suffix'], 'POST')
+        method = SUFFIX_METHODS.get(parsed_info.suffix, 'POST')
+        
+        # Deterministic output derives the IDs from the payload instead of drawing random ones
+        request_uid = self._content_uuid(json_file_path, body) if self.deterministic else uuid.uuid4()
         
         # Create Postman request structure - ultra-minimal format
         request = {
-            "uid": str(uuid.uuid4()),
+            "uid": str(request_uid),
             "name": request_name,
             "type": "http",
             "method": method,
-            "url": "{{baseUrl}}/api/validate/{{tc_id}}",
-            "headers": [
-                {
-                    "uid": str(uuid.uuid4()),
-                    "name": "Content-Type",
-                    "value": "application/json",
-                    "enabled": True
-                },
-                {
-                    "uid": str(uuid.uuid4()),
-                    "name": "meta-transid",
-                    "value": "20220117181853TMBL20359Cl893580999",
-                    "enabled": True
-                },
+            "url": _REQUEST_URL
+        }
+        if not self.shared_headers:
+            request["headers"] = [
                 {
-                    "uid": str(uuid.uuid4()),
-                    "name": "meta-src-envrmt",
-                    "value": "IMSH",
+                    "uid": str(uuid.uuid5(request_uid, name) if self.deterministic else uuid.uuid4()),
+                    "name": name,
+                    "value": value,
                     "enabled": True
                 }
-            ],
-            "body": {
-                "mode": "raw",
-                "raw": json.dumps(json_content, indent=2)
-            }
+                for name, value in REQUEST_HEADERS
+            ]
+        request["body"] = {
+            "mode": "raw",
+            "raw": body
         }
         
         return request
     
     
-    def generate_postman_collection(self, collection_name: str = "TestCollection", custom_filename: str = None) -> Optional[Path]:
-        """Generate Postman-compatible collection for JSON files in source directory.
+    def _content_uuid(self, json_file: Path, body: Union[str, _MappedPayload]) -> uuid.UUID:
+        """UUIDv5 derived from a payload's path and request body."""
+        if isinstance(body, _MappedPayload):
+            digest = _file_sha256(json_file)
+        else:
+            digest = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        path = json_file.relative_to(self.source_dir).as_posix()
+        return uuid.uuid5(uuid.NAMESPACE_URL, f"postman-request:{path}:{digest}")
+    
+    def _sort_parsed_files(self, parsed_files):
+        """Put (json_file, parsed_info) pairs in payload path order when output is deterministic."""
+        if self.deterministic:
+            parsed_files.sort(key=lambda parsed_file: parsed_file[0].relative_to(self.source_dir).as_posix())
+    
+    def _build_collection_item(self, json_file: Path, parsed_info: ParsedFilename,
+                               data: Optional[bytes] = None) -> Dict[str, Any]:
+        """Create a Postman v2.1 collection item from a JSON file.
         
         Args:
-            collection_name: Name of the collection to generate
+            json_file: Path to the JSON payload file
+            parsed_info: Parsed filename information
+            data: Payload file contents, if already read
             
         Returns:
-            Path to generated Postman collection file or None if no files found
+            Postman v2.1 item structure
         """
-        if not self.source_dir.exists():
-            print(f"Source directory '{self.source_dir}' not found")
+        body = self._read_payload_body(json_file, data)
+        
+        # Determine HTTP method based on suffix
+        method = SUFFIX_METHODS.get(parsed_info.suffix, 'POST')
+        
+        # Create Postman request - use the actual filename (without .json extension)
+        request_name = json_file.stem  # This gets the filename without extension
+        
+        request_body = {
+            "mode": "raw",
+            "raw": body,
+            "options": _RAW_JSON_OPTIONS
+        }
+        if self.shared_headers:
+            # Headers come from the collection's pre-request script (see _collection_structure)
+            request = {"method": method, "url": _REQUEST_URL, "body": request_body}
+        else:
+            request = {"method": method, "header": _ITEM_HEADERS, "url": _ITEM_URL, "body": request_body}
+        
+        return {
+            "name": request_name,
+            "request": request
+        }
+    
+    def _write_collection_stream(self, f, collection: Dict[str, Any], items_key: str, items,
+                                 item_spans: Optional[List[Tuple[int, int]]] = None) -> int:
+        """Write a collection to an open text file, emitting its items one at a time.
+        
+        The output is byte-identical to json.dump(collection, f, indent=2, ensure_ascii=False)
+        with collection[items_key] set to the list of items, but items may come from a
+        generator so only one of them needs to be in memory at once.
+        
+        Args:
+            f: Text file opened for writing, or a _CollectionWriter
+            collection: Collection structure; its items_key entry is ignored
+            items_key: Key holding the list of requests ("item" or "items")
+            items: Iterable of request structures. With a _CollectionWriter, an item may also
+                be bytes holding an already rendered item (as recorded in item_spans)
+            item_spans: If given (requires a _CollectionWriter), receives the (offset, length)
+                in bytes of each rendered item, indentation included
+            
+        Returns:
+            Number of items written
+        """
+        # Time spent waiting for items (reading and building them), rendering them and writing them
+        clock = time.perf_counter
+        build_seconds = serialize_seconds = write_seconds = 0.0
+        
+        items = iter(items)
+        start = clock()
+        first_item = next(items, None)
+        build_seconds += clock() - start
+        
+        if first_item is None:
+            f.write(json.dumps({**collection, items_key: []}, indent=2, ensure_ascii=False))
+            self._record_write_times(build_seconds, 0.0, 0.0)
+            return 0
+        
+        # Render the collection around a placeholder item to get the text before and
+        # after the item list, and the indentation json.dump uses for list entries
+        skeleton = json.dumps({**collection, items_key: [_ITEMS_PLACEHOLDER]}, indent=2, ensure_ascii=False)
+        placeholder = json.dumps(_ITEMS_PLACEHOLDER)
+        placeholder_start = skeleton.index(placeholder)
+        line_start = skeleton.rindex("\n", 0, placeholder_start) + 1
+        indent = skeleton[line_start:placeholder_start]
+        
+        f.write(skeleton[:line_start])
+        count = 0
+        item = first_item
+        while item is not None:
+            if count:
+                f.write(",\n")
+            offset = f.position if item_spans is not None else 0
+            if isinstance(item, bytes):
+                start = clock()
+                f.write_bytes(item)
+            else:
+                start = clock()
+                mapped = []
+                # json.dumps escapes newlines inside strings, so every newline is structural
+                text = indent + json.dumps(item, indent=2, ensure_ascii=False,
+                                           default=lambda value: self._defer_body(value, mapped)
+                                           ).replace("\n", "\n" + indent)
+                serialized = clock()
+                serialize_seconds += serialized - start
+                start = serialized
+                if mapped:
+                    self._write_mapped_bodies(f, text, mapped)
+                else:
+                    f.write(text)
+            write_seconds += clock() - start
+            if item_spans is not None:
+                item_spans.append((offset, f.position - offset))
+            count += 1
+            
+            start = clock()
+            item = next(items, None)
+            build_seconds += clock() - start
+        f.write(skeleton[placeholder_start + len(placeholder):])
+        
+        self._record_write_times(build_seconds, serialize_seconds, write_seconds)
+        return count
+    
+    @staticmethod
+    def _defer_body(value, mapped: List[_MappedPayload]) -> str:
+        """json.dumps default hook: render memory-mapped bodies as a placeholder for now."""
+        if isinstance(value, _MappedPayload):
+            mapped.append(value)
+            return _BODY_PLACEHOLDER
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    
+    @staticmethod
+    def _write_mapped_bodies(f, text: str, mapped: List[_MappedPayload]):
+        """Write a rendered item, streaming each memory-mapped body in place of its placeholder."""
+        placeholder = json.dumps(_BODY_PLACEHOLDER)
+        for payload in mapped:
+            before, text = text.split(placeholder, 1)
+            f.write(before)
+            f.write('"')
+            for chunk in payload.chunks():
+                # Characters are escaped one at a time, so the pieces concatenate to json.dumps(body)
+                f.write(json.dumps(chunk, ensure_ascii=False)[1:-1])
+            f.write('"')
+        f.write(text)
+    
+    def _record_write_times(self, build_seconds: float, serialize_seconds: float, write_seconds: float):
+        if self.metrics:
+            self.metrics.add_stage_time("collection_build", build_seconds)
+            self.metrics.add_stage_time("serialization", serialize_seconds)
+            self.metrics.add_stage_time("write", write_seconds)
+    
+    def _write_collection_file(self, path: Path, collection: Dict[str, Any], items_key: str, items,
+                               item_spans: Optional[List[Tuple[int, int]]] = None) -> int:
+        """Stream a collection to `path` via a temporary file, replacing it only once complete.
+        
+        Returns:
+            Number of items written
+        """
+        temp_path = path.with_name(path.name + ".tmp")
+        try:
+            with open(temp_path, 'wb') as raw, self._compressor(raw) as f:
+                count = self._write_collection_stream(_CollectionWriter(f), collection, items_key, items,
+                                                      item_spans)
+            os.replace(temp_path, path)
+        except BaseException:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+        return count
+    
+    def _compressor(self, raw):
+        """Wrap a binary file so collection text written to it is compressed as configured."""
+        if self.compression == "gzip":
+            # A fixed mtime and no filename in the header keep identical collections byte-identical
+            return gzip.GzipFile(filename="", mode='wb', fileobj=raw, compresslevel=6, mtime=0)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+        return nullcontext(raw)
+    
+    def _output_name(self, filename: str) -> str:
+        """Collection filename with the extension of the configured compression, if any."""
+        return filename + COMPRESSIONS[self.compression] if self.compression else filename
+    
+    def _write_output(self, path: Path, collection: Dict[str, Any], items_key: str, items):
+        """Write a collection to `path`, or as shards when a shard budget is set.
+        
+        Returns:
+            Tuple of (path of the collection file or shard index, number of items,
+            shard entries of the index - empty when not sharded)
+        """
+        if self.max_shard_items or self.max_shard_bytes:
+            return self._write_shards(path, collection, items_key, items)
+        count = self._write_collection_file(path, collection, items_key, items)
+        self._remove_stale_outputs(path, sharded=False)
+        return path, count, []
+    
+    @staticmethod
+    def _remove_files(paths: List[Path]):
+        for stale_path in paths:
+            try:
+                stale_path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def _listed_shards(self, collection_file: Path) -> List[Path]:
+        """Shard files listed by the shard index of a collection (empty if it has none)."""
+        index_path = self._shard_index_path(collection_file)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            return [index_path.with_name(Path(shard["file"]).name) for shard in index["shards"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+    
+    @staticmethod
+    def _compression_variants(path: Path) -> List[Path]:
+        """`path` with each compression extension, and without one."""
+        name, _ = split_compression_extension(path.name)
+        return [path.with_name(name)] + [path.with_name(name + extension) for extension in COMPRESSIONS.values()]
+    
+    def _remove_stale_outputs(self, path: Path, sharded: bool):
+        """Remove what an earlier run left at `path` in another output layout or compression.
+        
+        Called once the new output is complete. After a sharded write every single-file
+        variant of the collection (.json, .json.gz, .json.zst) and its manifest go; after a
+        single-file write the shard index, every shard it lists and the other variants go.
+        They would otherwise be picked up next to the new output (e.g. by validate-all).
+        """
+        stale = [variant for variant in self._compression_variants(path) if sharded or variant != path]
+        stale += [self._manifest_path(variant) for variant in stale]
+        if not sharded:
+            stale += self._listed_shards(path) + [self._shard_index_path(path)]
+        self._remove_files(stale)
+    
+    def _shard_path(self, collection_file: Path, number: int) -> Path:
+        """Path of shard `number` (from 1) of a collection, e.g. postman_collection.part001.json(.gz)."""
+        name, compression = split_compression_extension(collection_file.name)
+        base = Path(name)
+        extension = COMPRESSIONS[compression] if compression else ""
+        return collection_file.with_name(f"{base.stem}.part{number:03d}{base.suffix}{extension}")
+    
+    def _shard_index_path(self, collection_file: Path) -> Path:
+        """Path of the shard index of a collection, e.g. postman_collection.index.json (never compressed)."""
+        base = Path(split_compression_extension(collection_file.name)[0])
+        return collection_file.with_name(f"{base.stem}.index{base.suffix}")
+    
+    def _write_shards(self, path: Path, collection: Dict[str, Any], items_key: str, items):
+        """Split a collection into numbered shards and write an index file listing them.
+        
+        Every shard is a complete collection that can be imported or run on its own. A shard
+        is closed once it holds max_shard_items items or reaches max_shard_bytes, so a shard
+        only exceeds the byte budget by (part of) its last item. Shards left over from an
+        earlier run with more of them, and an unsharded collection left at `path`, are removed.
+        
+        Returns:
+            Tuple of (index file path, number of items, shard entries of the index)
+        """
+        items = iter(items)
+        pending = next(items, None)
+        shards = []
+        # Shards of the previous run, possibly with another compression extension
+        previous_shards = self._listed_shards(path)
+        
+        while True:
+            number = len(shards) + 1
+            spans = []
+            
+            def shard_items():
+                nonlocal pending
+                while pending is not None:
+                    if spans and ((self.max_shard_items and len(spans) >= self.max_shard_items)
+                                  or (self.max_shard_bytes and sum(spans[-1]) >= self.max_shard_bytes)):
+                        return
+                    yield pending
+                    pending = next(items, None)
+            
+            shard_collection = dict(collection)
+            if "info" in collection:
+                shard_collection["info"] = {**collection["info"], "name": f"{collection['info']['name']} (part {number})"}
+            else:
+                shard_collection["name"] = f"{collection['name']} (part {number})"
+            
+            shard_file = self._shard_path(path, number)
+            count = self._write_collection_file(shard_file, shard_collection, items_key, shard_items(), spans)
+            shards.append({"file": shard_file.name, "items": count, "bytes": shard_file.stat().st_size})
+            if pending is None:
+                break
+        
+        stale = len(shards) + 1
+        while self._shard_path(path, stale).exists():
+            self._shard_path(path, stale).unlink()
+            stale += 1
+        self._remove_files([shard for shard in previous_shards
+                            if shard.name not in {entry["file"] for entry in shards}])
+        self._remove_stale_outputs(path, sharded=True)
+        
+        index = {
+            "name": collection["info"]["name"] if "info" in collection else collection["name"],
+            "items": sum(shard["items"] for shard in shards),
+            "max_shard_items": self.max_shard_items,
+            "max_shard_bytes": self.max_shard_bytes,
+            "shards": shards
+        }
+        index_path = self._shard_index_path(path)
+        temp_path = index_path.with_name(index_path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, index_path)
+        
+        return index_path, index["items"], shards
+    
+    def _manifest_path(self, collection_file: Path) -> Path:
+        """Path of the incremental manifest stored beside a collection file."""
+        return collection_file.with_name(collection_file.name + _MANIFEST_SUFFIX)
+    
+    def _load_manifest(self, collection_file: Path, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Load the manifest of a previous incremental run.
+        
+        The manifest is only trusted if it was written with the same options and the
+        collection file still has the size and mtime recorded when it was written.
+        
+        Args:
+            collection_file: Collection file the manifest belongs to
+            options: Generator options the manifest must have been written with
+            
+        Returns:
+            Manifest dictionary, or None if there is no usable manifest
+        """
+        try:
+            with open(self._manifest_path(collection_file), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            stat = collection_file.stat()
+        except (OSError, ValueError):
+            return None
+        
+        collection = manifest.get("collection") or {}
+        if (manifest.get("version") != MANIFEST_VERSION
+                or manifest.get("options") != options
+                or collection.get("size") != stat.st_size
+                or collection.get("mtime_ns") != stat.st_mtime_ns):
             return None
+        return manifest
+    
+    def _save_manifest(self, collection_file: Path, options: Dict[str, Any], inputs: List[Dict[str, Any]]) -> None:
+        """Write the manifest for a freshly written (or verified) collection file."""
+        stat = collection_file.stat()
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "options": options,
+            "collection": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+            "inputs": inputs
+        }
+        manifest_path = self._manifest_path(collection_file)
+        temp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(temp_path, manifest_path)
+        except OSError as e:
+            print(f"Warning: Could not write manifest {manifest_path}: {e}")
+    
+    def _plan_incremental(self, parsed_files, previous: Optional[Dict[str, Any]]):
+        """Work out which payloads are unchanged since the previous incremental run.
+        
+        A payload is unchanged if its size and mtime match the manifest, or if only the
+        mtime differs and its SHA-256 still matches.
         
-        # Find all JSON files in the source directory and subdirectories
+        Args:
+            parsed_files: List of (json_file, parsed_info) in collection order
+            previous: Manifest of the previous run, or None
+            
+        Returns:
+            Tuple of (manifest input entries in collection order, {index: (offset, length)}
+            of the items that can be copied from the previous collection)
+        """
+        previous_inputs = {entry["path"]: entry for entry in previous["inputs"]} if previous else {}
+        inputs = []
+        reused = {}
+        
+        for index, (json_file, _) in enumerate(parsed_files):
+            stat = json_file.stat()
+            entry = {
+                "path": json_file.relative_to(self.source_dir).as_posix(),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": None
+            }
+            prior = previous_inputs.get(entry["path"])
+            if (prior and prior.get("sha256") and prior["size"] == stat.st_size
+                    and (prior["mtime_ns"] == stat.st_mtime_ns
+                         or _file_sha256(json_file) == prior["sha256"])):
+                entry.update(sha256=prior["sha256"], offset=prior["offset"], length=prior["length"])
+                reused[index] = (prior["offset"], prior["length"])
+            inputs.append(entry)
+        
+        return inputs, reused
+    
+    def _incremental_items(self, parsed_files, inputs: List[Dict[str, Any]], reused: Dict[int, Tuple[int, int]],
+                           previous_file: Path):
+        """Yield collection items, copying unchanged ones verbatim from the previous collection.
+        
+        Changed and new payloads are read once, hashed into their manifest entry, and built
+        into a new item (read_concurrency of them at a time). For a compressed previous
+        collection the reused spans must be in increasing offset order (see _forward_spans).
+        """
+        def build(index: int):
+            if index in reused:
+                return None
+            json_file, parsed_info = parsed_files[index]
+            data = None
+            try:
+                if self._is_mapped(inputs[index]["size"]):
+                    # Large payloads are hashed here and embedded straight from the file
+                    inputs[index]["sha256"] = _file_sha256(json_file)
+                else:
+                    data = json_file.read_bytes()
+                    inputs[index]["sha256"] = hashlib.sha256(data).hexdigest()
+            except OSError:
+                pass
+            return self._build_collection_item(json_file, parsed_info, data)
+        
+        with (open_collection_file(previous_file) if reused else nullcontext()) as previous:
+            for index, item in enumerate(map_ordered(build, range(len(parsed_files)), self.read_concurrency)):
+                if index in reused:
+                    offset, length = reused[index]
+                    previous.seek(offset)
+                    item = previous.read(length)
+                yield item
+    
+    def _build_items(self, build, parsed_files):
+        """Build request structures for parsed_files in order, reading read_concurrency payloads at a time."""
+        return map_ordered(lambda parsed_file: build(*parsed_file), parsed_files, self.read_concurrency)
+    
+    def _find_json_files(self) -> List[Path]:
+        """Find all JSON files in the source directory and subdirectories."""
         json_files = []
         for root, dirs, files in os.walk(self.source_dir):
             for file in files:
                 if file.endswith('.json'):
                     json_files.append(Path(root) / file)
-        
-        if not json_files:
-            print(f"No JSON files found in '{self.source_dir}'")
-            return None
-        
-        print(f"Found {len(json_files)} JSON files for collection '{collection_name}'")
-        
-        # Create Postman collection structure
-        postman_collection = {
+        return json_files
+    
+    def _collection_structure(self, collection_name: str) -> Dict[str, Any]:
+        """Postman v2.1 collection structure, without its items."""
+        collection = {
             "info": {
                 "name": f"{collection_name} API Collection",
                 "description": f"API collection for {collection_name} test cases",
@@ -163,90 +901,209 @@ class PostmanCollectionGenerator:
                 }
             ]
         }
+        if self.shared_headers:
+            collection["event"] = [
+                {
+                    "listen": "prerequest",
+                    "script": {
+                        "type": "text/javascript",
+                        "exec": [
+                            f"pm.request.headers.upsert({{ key: {json.dumps(key)}, value: {json.dumps(value)} }});"
+                            for key, value in REQUEST_HEADERS
+                        ]
+                    }
+                }
+            ]
+        return collection
+    
+    def _shared_minimal_headers(self, collection_name: str) -> List[Dict[str, Any]]:
+        """Collection-level headers for the minimal format, with IDs derived from the collection name."""
+        return [
+            {
+                "uid": str(uuid.uuid5(uuid.NAMESPACE_URL, f"postman-collection:{collection_name}/header/{name}")),
+                "name": name,
+                "value": value,
+                "enabled": True
+            }
+            for name, value in REQUEST_HEADERS
+        ]
+    
+    def _collection_file(self, collection_name: str, custom_filename: Optional[str]) -> Path:
+        """Create the collection's directory and return the path of its collection file."""
+        collection_dir = self.output_dir / collection_name
+        collection_dir.mkdir(exist_ok=True)
         
-        # Parse files and create requests
+        # Use custom filename if provided, otherwise use default
+        filename = custom_filename if custom_filename else "postman_collection.json"
+        return collection_dir / self._output_name(filename)
+    
+    def generate_postman_collection(self, collection_name: str = "TestCollection", custom_filename: str = None,
+                                    preloaded=None) -> Optional[Path]:
+        """Generate Postman-compatible collection for JSON files in source directory.
+        
+        Args:
+            collection_name: Name of the collection to generate
+            custom_filename: Collection filename (default: postman_collection.json)
+            preloaded: Optional iterable of (json_file, parsed_info, contents) for payloads in
+                source_dir that were just read by the caller (fused rename-and-collect). It is
+                consumed while the collection is written, so those files are not read again;
+                other JSON files already in source_dir follow them and are read as usual.
+            
+        Returns:
+            Path to generated Postman collection file or None if no files found
+        """
+        if preloaded is not None:
+            if not (self.incremental or self.deterministic):
+                return self._generate_fused(collection_name, custom_filename, preloaded)
+            # Incremental builds need every payload's size and mtime up front, and deterministic
+            # ones every payload's path to sort them, so only let the caller finish its work
+            # and then build from the directory as usual
+            for _ in preloaded:
+                pass
+        
+        if not self.source_dir.exists():
+            print(f"Source directory '{self.source_dir}' not found")
+            return None
+        
+        json_files = self._find_json_files()
+        
+        if not json_files:
+            print(f"No JSON files found in '{self.source_dir}'")
+            return None
+        
+        print(f"Found {len(json_files)} JSON files for collection '{collection_name}'")
+        
+        # Create Postman collection structure
+        postman_collection = self._collection_structure(collection_name)
+        
+        # Only files with a parseable name become requests
+        parsed_files = []
         for json_file in json_files:
             parsed_info = self._parse_filename(json_file.name)
             if parsed_info:
-                try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        json_content = json.load(f)
-                except Exception as e:
-                    print(f"Warning: Could not read {json_file}: {e}")
-                    json_content = {}
-                
-                # Determine HTTP method based on suffix
-                method_map = {
-                    'LR': 'POST',
-                    'NR': 'POST',
-                    'EX': 'POST'
-                }
-                method = method_map.get(parsed_info['suffix'], 'POST')
-                
-                # Create Postman request - use the actual filename (without .json extension)
-                request_name = json_file.stem  # This gets the filename without extension
-                
-                postman_request = {
-                    "name": request_name,
-                    "request": {
-                        "method": method,
-                        "header": [
-                            {
-                                "key": "Content-Type",
-                                "value": "application/json",
-                                "type": "text"
-                            },
-                            {
-                                "key": "meta-transid",
-                                "value": "20220117181853TMBL20359Cl893580999",
-                                "type": "text"
-                            },
-                            {
-                                "key": "meta-src-envrmt",
-                                "value": "IMSH",
-                                "type": "text"
-                            }
-                        ],
-                        "url": {
-                            "raw": "{{baseUrl}}/api/validate/{{tc_id}}",
-                            "host": ["{{baseUrl}}"],
-                            "path": ["api", "validate", "{{tc_id}}"]
-                        },
-                        "body": {
-                            "mode": "raw",
-                            "raw": json.dumps(json_content, indent=2),
-                            "options": {
-                                "raw": {
-                                    "language": "json"
-                                }
-                            }
-                        }
-                    }
-                }
-                
-                postman_collection["item"].append(postman_request)
+                parsed_files.append((json_file, parsed_info))
         
-        if not postman_collection["item"]:
+        if not parsed_files:
             print(f"No valid requests could be created for collection '{collection_name}'")
             return None
+        self._sort_parsed_files(parsed_files)
         
         # Save Postman collection file
-        collection_dir = self.output_dir / collection_name
-        collection_dir.mkdir(exist_ok=True)
+        postman_file = self._collection_file(collection_name, custom_filename)
         
-        # Use custom filename if provided, otherwise use default
-        filename = custom_filename if custom_filename else "postman_collection.json"
-        postman_file = collection_dir / filename
+        if self.incremental:
+            return self._generate_incremental(postman_collection, collection_name, postman_file,
+                                              parsed_files, len(json_files))
+        
+        # Requests are built and written one at a time, so only one payload is held in memory
+        items = self._build_items(self._build_collection_item, parsed_files)
         
         try:
-            with open(postman_file, 'w', encoding='utf-8') as f:
-                json.dump(postman_collection, f, indent=2, ensure_ascii=False)
+            output_file, _, shards = self._write_output(postman_file, postman_collection, "item", items)
             
-            print(f"SUCCESS: Generated Postman collection: {postman_file}")
+            print(f"SUCCESS: Generated Postman collection: {output_file}")
             print(f"   - Collection: {collection_name}")
-            print(f"   - Requests: {len(postman_collection['item'])}")
+            print(f"   - Requests: {len(parsed_files)}")
+            if shards:
+                print(f"   - Shards: {len(shards)}")
             print(f"   - Files processed: {len(json_files)}")
             
+            return output_file
+            
+        except Exception as e:
+            print(f"ERROR: Error saving Postman collection for {collection_name}: {e}")
+            return None
+    
+    def _generate_fused(self, collection_name: str, custom_filename: Optional[str], preloaded) -> Optional[Path]:
+        """Write a collection from payloads handed over by the caller as they are produced.
+        
+        Returns:
+            Path to the collection file or None on error
+        """
+        postman_file = self._collection_file(collection_name, custom_filename)
+        preloaded_names = set()
+        files_count = [0]
+        
+        def items():
+            for json_file, parsed_info, data in preloaded:
+                preloaded_names.add(json_file.name)
+                files_count[0] += 1
+                if parsed_info is not None and parsed_info.is_renamed:
+                    yield self._build_collection_item(json_file, parsed_info, data)
+            
+            # Payloads left in source_dir by earlier runs are included, as in a normal build
+            remaining = []
+            for json_file in self._find_json_files():
+                if json_file.parent == self.source_dir and json_file.name in preloaded_names:
+                    continue
+                files_count[0] += 1
+                parsed_info = self._parse_filename(json_file.name)
+                if parsed_info:
+                    remaining.append((json_file, parsed_info))
+            yield from self._build_items(self._build_collection_item, remaining)
+        
+        try:
+            output_file, count, shards = self._write_output(postman_file, self._collection_structure(collection_name),
+                                                            "item", items())
+            
+            print(f"SUCCESS: Generated Postman collection: {output_file}")
+            print(f"   - Collection: {collection_name}")
+            print(f"   - Requests: {count}")
+            if shards:
+                print(f"   - Shards: {len(shards)}")
+            print(f"   - Files processed: {files_count[0]}")
+            
+            return output_file
+            
+        except Exception as e:
+            print(f"ERROR: Error saving Postman collection for {collection_name}: {e}")
+            return None
+    
+    def _generate_incremental(self, postman_collection: Dict[str, Any], collection_name: str, postman_file: Path,
+                              parsed_files, files_count: int) -> Optional[Path]:
+        """Write a collection reusing unchanged items recorded in its manifest.
+        
+        When no payload was added, removed or changed the collection is left untouched.
+        
+        Returns:
+            Path to the collection file or None on error
+        """
+        options = {"collection_name": collection_name, "body_mode": self.body_mode}
+        if self.shared_headers:
+            options["shared_headers"] = True
+        
+        try:
+            previous = self._load_manifest(postman_file, options)
+            inputs, reused = self._plan_incremental(parsed_files, previous)
+            if split_compression_extension(postman_file.name)[1] is not None:
+                # A compressed collection is only read forwards (zstd streams cannot seek back,
+                # gzip ones only by decompressing again from the start), so reordered items
+                # that would need a backward seek are rebuilt instead
+                reused = _forward_spans(reused)
+            
+            if (previous is not None and len(reused) == len(parsed_files)
+                    and [entry["path"] for entry in inputs] == [entry["path"] for entry in previous["inputs"]]):
+                if inputs != previous["inputs"]:
+                    # Only mtimes changed; record them so the files are not hashed again next time
+                    self._save_manifest(postman_file, options, inputs)
+                print(f"SUCCESS: Postman collection up to date: {postman_file}")
+                print(f"   - Collection: {collection_name}")
+                print(f"   - Requests: {len(parsed_files)} (unchanged)")
+                return postman_file
+            
+            spans = []
+            items = self._incremental_items(parsed_files, inputs, reused, postman_file)
+            self._write_collection_file(postman_file, postman_collection, "item", items, spans)
+            self._remove_stale_outputs(postman_file, sharded=False)
+            for entry, (offset, length) in zip(inputs, spans):
+                entry.update(offset=offset, length=length)
+            self._save_manifest(postman_file, options, inputs)
+            
+            print(f"SUCCESS: Generated Postman collection: {postman_file}")
+            print(f"   - Collection: {collection_name}")
+            print(f"   - Requests: {len(parsed_files)} ({len(reused)} reused, {len(parsed_files) - len(reused)} rebuilt)")
+            print(f"   - Files processed: {files_count}")
+            
             return postman_file
             
         except Exception as e:
@@ -277,24 +1134,26 @@ class PostmanCollectionGenerator:
         
         print(f"Found {len(json_files)} JSON files for directory '{dir_name}'")
         
-        # Parse files and create requests
-        requests = []
+        # Parse filenames; requests are built later while the collection is written
+        parsed_files = []
         for json_file in json_files:
             parsed_info = self._parse_filename(json_file.name)
             if parsed_info:
-                request = self._create_postman_request(json_file, parsed_info)
-                requests.append(request)
+                parsed_files.append((json_file, parsed_info))
             else:
                 print(f"Warning: Could not parse filename '{json_file.name}'")
         
-        if not requests:
+        if not parsed_files:
             print(f"No valid requests could be created for directory '{dir_name}'")
             return None
+        self._sort_parsed_files(parsed_files)
         
         # Create collection structure - minimal format
         collection = self.collection_template.copy()
         collection["name"] = f"{dir_name} API Collection"
-        collection["items"] = requests
+        if self.shared_headers:
+            collection["headers"] = self._shared_minimal_headers(collection["name"])
+        requests = self._build_items(self._create_postman_request, parsed_files)
         
         # Create Postman collection directory structure with flexible naming
         # Extract TS number from directory name for consistent naming
@@ -309,19 +1168,20 @@ class PostmanCollectionGenerator:
         collection_dir.mkdir(exist_ok=True)
         
         # Save collection.json file
-        collection_file = collection_dir / "collection.json"
+        collection_file = collection_dir / self._output_name("collection.json")
         
         try:
-            with open(collection_file, 'w', encoding='utf-8') as f:
-                json.dump(collection, f, indent=2, ensure_ascii=False)
+            output_file, _, shards = self._write_output(collection_file, collection, "items", requests)
             
-            print(f"SUCCESS: Generated Postman collection: {collection_file}")
+            print(f"SUCCESS: Generated Postman collection: {output_file}")
             print(f"   - Directory: {dir_name}")
-            print(f"   - Requests: {len(requests)}")
+            print(f"   - Requests: {len(parsed_files)}")
+            if shards:
+                print(f"   - Shards: {len(shards)}")
             print(f"   - Files processed: {len(json_files)}")
             print(f"   - Collection directory: {collection_dir}")
             
-            return collection_file
+            return output_file
             
         except Exception as e:
             print(f"ERROR: Error saving collection for {dir_name}: {e}")
@@ -385,38 +1245,40 @@ class PostmanCollectionGenerator:
         if not dir_path.exists():
             return {"error": f"Directory '{dir_path}' not found"}
         
-        json_files = list(dir_path.glob("**/*.json"))
-        
-        stats = {
-            "directory_name": dir_name,
-            "total_files": len(json_files),
-            "file_types": {},
-            "edit_ids": set(),
-            "eob_codes": set(),
-            "suffixes": set()
-        }
-        
-        for json_file in json_files:
-            parsed_info = self._parse_filename(json_file.name)
-            if parsed_info:
-                suffix = parsed_info['suffix']
-                stats["file_types"][suffix] = stats["file_types"].get(suffix, 0) + 1
-                stats["edit_ids"].add(parsed_info['edit_id'])
-                stats["eob_codes"].add(parsed_info['eob_code'])
-                stats["suffixes"].add(suffix)
+        return scan_directory_stats(str(dir_path), dir_name)
+    
+    def get_all_directory_stats(self, use_cache: bool = True, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Get statistics for every directory in the source directory in one pass.
         
-        # Convert sets to lists for JSON serialization
-        stats["edit_ids"] = list(stats["edit_ids"])
-        stats["eob_codes"] = list(stats["eob_codes"])
-        stats["suffixes"] = list(stats["suffixes"])
+        The source directory is listed once and each directory tree walked once (see
+        directory_stats); results are cached and reused while no directory mtime changes.
         
-        return stats
+        Args:
+            use_cache: If False, neither read nor write the stats cache
+            refresh: If True, ignore the stats cache and rescan
+            
+        Returns:
+            Dictionary mapping each directory name (sorted) to its statistics
+        """
+        return collect_directory_stats(str(self.source_dir), use_cache=use_cache, refresh=refresh)
     
-    def validate_collection(self, collection_path: Path) -> Dict[str, Any]:
+    def validate_collection(self, collection_path: Path, check_items: bool = False,
+                            check_names: bool = False, jobs: int = 1,
+                            time_budget: Optional[float] = None) -> Dict[str, Any]:
         """Validate a Postman collection file.
         
+        The file is read incrementally (see collection_stream), so only one request is
+        held in memory at a time, whatever the size of the collection.
+        
         Args:
-            collection_path: Path to the collection file
+            collection_path: Path to the collection file (.json, .json.gz or .json.zst)
+            check_items: Also check that every request has a name, method and URL, and
+                that its raw JSON body parses
+            check_names: Also check that every request name follows the
+                TC#id#edit#code#suffix template (implies check_items)
+            jobs: Worker processes to run the item checks on (see collection_checks)
+            time_budget: Seconds to spend on item checks; items not reached in time are
+                reported as unchecked and make the collection invalid
             
         Returns:
             Dictionary containing validation results
@@ -428,58 +1290,172 @@ class PostmanCollectionGenerator:
             "stats": {}
         }
         
+        keys = set()
+        # Top-level key -> number of elements, for keys holding an array
+        counts = {}
+        check_items = check_items or check_names
+        
         try:
-            with open(collection_path, 'r', encoding='utf-8') as f:
-                collection = json.load(f)
+            with (ItemChecker(check_names, jobs, time_budget) if check_items else nullcontext()) as checker, \
+                    io.TextIOWrapper(open_collection_file(collection_path), encoding='utf-8') as f:
+                for key, event, value in iter_collection(f):
+                    keys.add(key)
+                    if event == ARRAY:
+                        counts[key] = 0
+                    elif event == VALUE:
+                        counts.pop(key, None)
+                    else:
+                        counts[key] += 1
+                        if checker and key in ("item", "items"):
+                            checker.add(counts[key], value, minimal=key == "items")
+                item_problems = checker.finish() if checker else []
             
-            # Check for Postman v2.1.0 format first
-            if "info" in collection and "item" in collection:
-                # Postman v2.1.0 format
+            # Postman v2.1.0 format if it has info and item, minimal format otherwise
+            if "info" in keys and "item" in keys:
                 required_fields = ["info", "item"]
-                for field in required_fields:
-                    if field not in collection:
-                        validation_result["errors"].append(f"Missing required field: {field}")
-                
-                # Check collection structure
-                if "item" in collection and isinstance(collection["item"], list):
-                    total_requests = len(collection["item"])
-                    validation_result["stats"]["total_requests"] = total_requests
-                
-                # Check if collection has requests
-                if validation_result["stats"].get("total_requests", 0) == 0:
-                    validation_result["warnings"].append("Collection contains no requests")
-                
-                # If no errors, mark as valid
-                if not validation_result["errors"]:
-                    validation_result["valid"] = True
-                    
+                items_key = "item"
             else:
-                # Minimal format
                 required_fields = ["version", "name", "type", "items"]
-                for field in required_fields:
-                    if field not in collection:
-                        validation_result["errors"].append(f"Missing required field: {field}")
-                
-                # Check collection structure
-                if "items" in collection and isinstance(collection["items"], list):
-                    total_requests = len(collection["items"])
-                    validation_result["stats"]["total_requests"] = total_requests
-                
-                # Check if collection has requests
-                if validation_result["stats"].get("total_requests", 0) == 0:
-                    validation_result["warnings"].append("Collection contains no requests")
-                
-                # If no errors, mark as valid
-                if not validation_result["errors"]:
-                    validation_result["valid"] = True
+                items_key = "items"
+            
+            for field in required_fields:
+                if field not in keys:
+                    validation_result["errors"].append(f"Missing required field: {field}")
+            
+            # Check collection structure
+            if items_key in counts:
+                validation_result["stats"]["total_requests"] = counts[items_key]
+            
+            # Check if collection has requests
+            if validation_result["stats"].get("total_requests", 0) == 0:
+                validation_result["warnings"].append("Collection contains no requests")
+            
+            if checker:
+                validation_result["stats"]["item_errors"] = len(item_problems)
+                validation_result["stats"]["items_checked"] = checker.checked
+                validation_result["errors"].extend(f"Item {index}: {problem}"
+                                                   for index, problem in item_problems[:MAX_REPORTED_ITEM_ERRORS])
+                if len(item_problems) > MAX_REPORTED_ITEM_ERRORS:
+                    validation_result["errors"].append(
+                        f"... and {len(item_problems) - MAX_REPORTED_ITEM_ERRORS} more item errors")
+                if checker.skipped:
+                    validation_result["stats"]["items_unchecked"] = checker.skipped
+                    validation_result["errors"].append(
+                        f"Time budget of {time_budget:g}s exceeded: {checker.skipped} items not checked")
+            
+            # If no errors, mark as valid
+            if not validation_result["errors"]:
+                validation_result["valid"] = True
+            
+        except CollectionFormatError as e:
+            validation_result["errors"].append(f"Invalid JSON format: {e}")
+        except Exception as e:
+            validation_result["errors"].append(f"Validation error: {e}")
+        
+        return validation_result
+    
+    def find_collection_files(self, root: Optional[Path] = None) -> List[Path]:
+        """Find every collection file under a directory.
+        
+        Plain and compressed collections (.json, .json.gz, .json.zst) and shard indexes
+        are returned; incremental manifests are skipped.
+        
+        Args:
+            root: Directory to search (default: the output directory)
+            
+        Returns:
+            Sorted list of collection file paths
+        """
+        root = Path(root) if root is not None else self.output_dir
+        if not root.is_dir():
+            return []
+        
+        found = []
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                name, _ = split_compression_extension(filename)
+                if name.endswith(".json") and not name.endswith(_MANIFEST_SUFFIX):
+                    found.append(Path(dirpath) / filename)
+        return sorted(found)
+    
+    def validate_shard_index(self, index_path: Path) -> Dict[str, Any]:
+        """Validate a shard index (see _write_shards): every shard it lists must exist.
+        
+        The shards themselves are validated as collections of their own.
+        
+        Args:
+            index_path: Path to the .index.json file
+            
+        Returns:
+            Dictionary containing validation results, as validate_collection
+        """
+        validation_result = {
+            "valid": False,
+            "errors": [],
+            "warnings": [],
+            "stats": {}
+        }
+        
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            shards = index.get("shards") if isinstance(index, dict) else None
+            if not isinstance(shards, list):
+                validation_result["errors"].append("Missing required field: shards")
+            else:
+                for shard in shards:
+                    shard_file = shard.get("file") if isinstance(shard, dict) else None
+                    if not isinstance(shard_file, str) or not shard_file:
+                        validation_result["errors"].append("Shard entry without a file name")
+                    elif not (Path(index_path).parent / shard_file).is_file():
+                        validation_result["errors"].append(f"Shard file not found: {shard_file}")
+                validation_result["stats"]["shards"] = len(shards)
+                validation_result["stats"]["indexed_requests"] = index.get("items", 0)
             
+            if not validation_result["errors"]:
+                validation_result["valid"] = True
+        
         except json.JSONDecodeError as e:
             validation_result["errors"].append(f"Invalid JSON format: {e}")
         except Exception as e:
             validation_result["errors"].append(f"Validation error: {e}")
         
         return validation_result
-
+    
+    def validate_collections(self, collection_paths: List[Path], jobs: Optional[int] = None,
+                             check_items: bool = False,
+                             check_names: bool = False) -> Iterator[Tuple[Path, Dict[str, Any], float]]:
+        """Validate many collections concurrently on a pool of worker processes.
+        
+        Each collection is validated in a single worker (item checks run in-process there),
+        so one Python process per CPU is started however many collections there are.
+        
+        Args:
+            collection_paths: Collection files, e.g. from find_collection_files
+            jobs: Number of worker processes (None or <= 0 uses the CPU count)
+            check_items: Passed to validate_collection
+            check_names: Passed to validate_collection
+            
+        Yields:
+            (collection path, validation result, seconds taken) for each collection, in
+            completion order
+        """
+        if jobs is not None and jobs <= 0:
+            jobs = None
+        
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                executor.submit(_validate_collection_worker, str(self.output_dir), path, check_items, check_names): path
+                for path in collection_paths
+            }
+            for future in as_completed(futures):
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. broken process pool)
+                    result = {"valid": False, "errors": [f"Validation error: {e}"], "warnings": [], "stats": {}}
+                    seconds = 0.0
+                yield futures[future], result, seconds
 
 def main():
     """Main function for standalone execution."""
@@ -492,10 +1468,12 @@ def main():
     parser.add_argument("--directory", help="Generate collection for specific directory")
     parser.add_argument("--list-directories", action="store_true", help="List available directories")
     parser.add_argument("--stats", help="Show statistics for specific directory")
+    add_generator_arguments(parser)
     
     args = parser.parse_args()
+    check_generator_arguments(parser, args)
     
-    generator = PostmanCollectionGenerator(args.source_dir, args.output_dir)
+    generator = PostmanCollectionGenerator(args.source_dir, args.output_dir, **generator_options(args))
     
     if args.list_directories:
         directories = generator.list_available_directories()
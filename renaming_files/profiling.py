@@ -0,0 +1,196 @@
+"""
+Profiling - cProfile hook shared by main_processor.py and postman_cli.py (--profile).
+Writes a .pstats file, a collapsed-stack file for flamegraph tools, and a summary of the
+time spent in the pipeline's known hot functions.
+"""
+
+import os
+import json
+import time
+import cProfile
+import pstats
+import contextlib
+from typing import Dict, List, Any, Optional, Tuple
+
+
+# Functions whose time is reported separately after every profiled run
+HOT_FUNCTIONS = [
+    "discover_ts_folders",
+    "rename_files",
+    "move_file",
+    "_parse_filename",
+    "generate_postman_collection",
+    "_build_collection_item",
+    "_read_payload_body",
+    "_write_collection_stream",
+    "validate_collection",
+]
+
+# Collapsed stacks are cut off at this depth, and paths below this many seconds are dropped
+_MAX_STACK_DEPTH = 64
+_MIN_STACK_SECONDS = 1e-6
+# Call paths expanded in total; the number of paths through the call graph can grow
+# exponentially with its depth (every function called from two places doubles them)
+_MAX_STACK_PATHS = 100_000
+
+
+def _frame_label(func: Tuple[str, int, str]) -> str:
+    filename, _, name = func
+    if filename == "~":
+        # Built-ins such as <built-in method posix.replace>
+        return name
+    return f"{os.path.basename(filename)}:{name}"
+
+
+def write_collapsed_stacks(stats: pstats.Stats, path: str) -> int:
+    """Write an approximate collapsed-stack file from cProfile's call graph.
+
+    cProfile only records caller/callee pairs, not full stacks, so each function's own
+    time is spread over its callers in proportion to the time each caller spent in it.
+    The result is in the "frame;frame;frame microseconds" format read by flamegraph.pl
+    and speedscope.
+
+    At most _MAX_STACK_PATHS call paths are expanded. Past that limit (or _MAX_STACK_DEPTH)
+    a callee is not expanded and its time is counted in its caller's frame instead, so the
+    totals stay right while the file stays bounded.
+
+    Args:
+        stats: Profile statistics
+        path: Output file path
+
+    Returns:
+        Number of stack lines written
+    """
+    entries = stats.stats
+    callees: Dict[Any, List[Any]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+
+    lines: Dict[str, float] = {}
+    paths_left = _MAX_STACK_PATHS
+
+    def walk(func, share: float, stack: List[str]):
+        nonlocal paths_left
+        paths_left -= 1
+        stack = stack + [_frame_label(func)]
+        seconds = entries[func][2] * share
+        for callee in callees.get(func, []):
+            callee_total = entries[callee][3]
+            edge_total = entries[callee][4][func][3]
+            callee_share = share * edge_total / callee_total if callee_total > 0 else 0.0
+            if callee_share * callee_total < _MIN_STACK_SECONDS or _frame_label(callee) in stack:
+                continue
+            if len(stack) >= _MAX_STACK_DEPTH or paths_left <= 0:
+                seconds += callee_share * callee_total
+                continue
+            walk(callee, callee_share, stack)
+        key = ";".join(stack)
+        lines[key] = lines.get(key, 0.0) + seconds
+
+    for func, (_, _, _, _, callers) in entries.items():
+        if not callers:
+            walk(func, 1.0, [])
+
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, seconds in sorted(lines.items()):
+            microseconds = int(round(seconds * 1_000_000))
+            if microseconds > 0:
+                f.write(f"{stack} {microseconds}\n")
+                written += 1
+    return written
+
+
+def hot_function_report(stats: pstats.Stats, names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Summarize calls and time for the named hot functions.
+
+    Args:
+        stats: Profile statistics
+        names: Function names to report (defaults to HOT_FUNCTIONS)
+
+    Returns:
+        Dictionary keyed by function name with calls, own seconds and cumulative seconds
+    """
+    names = names or HOT_FUNCTIONS
+    report = {name: {"calls": 0, "own_seconds": 0.0, "cumulative_seconds": 0.0} for name in names}
+    for (filename, _, name), (_, calls, own_time, total_time, _) in stats.stats.items():
+        if name in report and filename != "~":
+            report[name]["calls"] += calls
+            report[name]["own_seconds"] += own_time
+            report[name]["cumulative_seconds"] += total_time
+    for entry in report.values():
+        entry["own_seconds"] = round(entry["own_seconds"], 6)
+        entry["cumulative_seconds"] = round(entry["cumulative_seconds"], 6)
+    return report
+
+
+def write_profile(profiler: cProfile.Profile, prefix: str, wall_seconds: Optional[float] = None) -> Dict[str, str]:
+    """Write the .pstats, .collapsed and .hot.json files for a finished profile.
+
+    Args:
+        profiler: Disabled cProfile.Profile
+        prefix: Output path prefix (e.g. "profiles/nightly" -> profiles/nightly.pstats)
+        wall_seconds: Wall-clock time of the profiled run, stored with the hot-function report
+
+    Returns:
+        Dictionary mapping "pstats", "collapsed" and "hot" to the written paths
+    """
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    paths = {
+        "pstats": f"{prefix}.pstats",
+        "collapsed": f"{prefix}.collapsed",
+        "hot": f"{prefix}.hot.json"
+    }
+    profiler.dump_stats(paths["pstats"])
+    stats = pstats.Stats(paths["pstats"])
+    write_collapsed_stacks(stats, paths["collapsed"])
+
+    report = {"wall_seconds": round(wall_seconds, 4) if wall_seconds is not None else None,
+              "functions": hot_function_report(stats)}
+    with open(paths["hot"], 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    return paths
+
+
+def print_hot_functions(report: Dict[str, Dict[str, Any]]):
+    """Print the hot functions that were called, slowest first."""
+    called = [(name, entry) for name, entry in report.items() if entry["calls"]]
+    if not called:
+        return
+    print("Hot functions (cumulative / own seconds, calls):")
+    for name, entry in sorted(called, key=lambda item: item[1]["cumulative_seconds"], reverse=True):
+        print(f"   - {name}: {entry['cumulative_seconds']:.3f}s / {entry['own_seconds']:.3f}s, {entry['calls']} calls")
+
+
+@contextlib.contextmanager
+def profiled(prefix: str, quiet: bool = False):
+    """Profile the enclosed block with cProfile and write the results under `prefix`.
+
+    The profile is written even if the block exits via sys.exit() or an exception.
+
+    Args:
+        prefix: Output path prefix for the .pstats, .collapsed and .hot.json files
+        quiet: If True, don't print the file locations and hot-function summary
+    """
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        wall_seconds = time.perf_counter() - start
+        try:
+            paths = write_profile(profiler, prefix, wall_seconds)
+        except OSError as e:
+            print(f"ERROR Could not write profile to {prefix}: {e}")
+        else:
+            if not quiet:
+                print(f"\nPROFILE Written {paths['pstats']}, {paths['collapsed']} and {paths['hot']}")
+                print_hot_functions(hot_function_report(pstats.Stats(paths["pstats"])))
@@ -0,0 +1,242 @@
+"""
+Run Journal - Append-only record of the work done by a main_processor batch run.
+Every moved file, generated collection and completed model is appended to a JSONL file
+as it happens, so a run that crashes or is killed can be resumed (main_processor --resume):
+completed models are skipped and a half-moved model finishes only the files still left.
+Journaling is opt-in (main_processor --journal), and a journal whose run did not finish is
+never replaced unless the new run asks for it (--fresh).
+
+Records (one JSON object per line):
+    {"event": "run", "started": ..., "options": {...}}          a run (or resumed run) started
+    {"event": "move", "model": key, "source": name, "dest": name}
+    {"event": "collection", "model": key, "path": path}
+    {"event": "model", "model": key, "files": count}             the model is complete
+    {"event": "end", "finished": ...}                            the run (or resumed run) finished
+
+Move records are not synced to disk one by one (that would cost an fsync per file), so
+after a power loss a resumed run also looks in the destination directory for moved files
+(see ModelJournal.recover_moves).
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from filename_parser import parse_filename
+
+
+# Used by main_processor when --journal (or --resume) is given without a path
+DEFAULT_JOURNAL_PATH = "main_processor_journal.jsonl"
+
+
+class UnfinishedJournalError(RuntimeError):
+    """Raised when starting a new journal would replace the journal of an unfinished run."""
+
+
+def model_key(source_dir: str) -> str:
+    """Journal key of a model: its source directory, which no two models share."""
+    return os.path.normpath(source_dir)
+
+
+class _JournalWriter:
+    """Appends records to the journal file.
+
+    Each record is written with a single write() on a file opened with O_APPEND, so records
+    from several worker processes never interleave, and a record is on disk (in the OS
+    cache) as soon as it is written: killing the process loses nothing already recorded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    def __getstate__(self):
+        # Worker processes open their own descriptor
+        state = dict(self.__dict__)
+        state["_fd"] = None
+        return state
+
+    def _write(self, data: bytes, sync: bool = False):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        os.write(self._fd, data)
+        if sync:
+            os.fsync(self._fd)
+
+    def append(self, record: Dict[str, Any], sync: bool = False):
+        """Append one record; with sync, also flush it to disk."""
+        self._write((json.dumps(record) + "\n").encode("utf-8"), sync)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class ModelJournal(_JournalWriter):
+    """Journal of one model, handed to rename_files (and picklable for worker processes)."""
+
+    def __init__(self, path: str, key: str, moved: Optional[Dict[str, str]] = None, resumed: bool = False):
+        """Create a model journal.
+
+        Args:
+            path: Journal file
+            key: Model key (see model_key)
+            moved: Files moved by earlier runs, source filename -> destination filename
+            resumed: True if the model belongs to a resumed run
+        """
+        super().__init__(path)
+        self.key = key
+        self.moved = dict(moved or {})
+        self.resumed = resumed
+
+    def recover_moves(self, dest_dir: str, edit_id: str, code: str, pending: Iterable[str] = ()) -> int:
+        """Count the model's files found in dest_dir as moved, even if their move was not journaled.
+
+        A move record written just before a power loss may never have reached the disk. The
+        file itself was moved, so it is no longer in the source directory and would otherwise
+        be left out of the resumed model. Only renamed (5-part) files of this model are
+        counted, and files still waiting in the source directory (pending) are not.
+
+        Args:
+            dest_dir: The model's destination directory
+            edit_id: The model's edit ID
+            code: The model's EOB code
+            pending: Filenames still in the source directory
+
+        Returns:
+            Number of moves recovered
+        """
+        if not os.path.isdir(dest_dir):
+            return 0
+        known = set(self.moved.values()) | set(pending)
+        recovered = 0
+        for filename in sorted(os.listdir(dest_dir)):
+            if filename in known or not filename.endswith(".json"):
+                continue
+            parsed = parse_filename(filename)
+            if parsed is not None and parsed.is_renamed and parsed.edit_id == edit_id and parsed.eob_code == code:
+                # The source name is unknown; the destination name stands in for it
+                self.moved[filename] = filename
+                recovered += 1
+        return recovered
+
+    def record_move(self, source: str, dest: str):
+        """Record a file moved from the model's source directory to its destination directory."""
+        self.moved[source] = dest
+        self.append({"event": "move", "model": self.key, "source": source, "dest": dest})
+
+    def record_collection(self, path):
+        """Record the model's generated Postman collection."""
+        self.append({"event": "collection", "model": self.key, "path": str(path)}, sync=True)
+
+    def record_done(self, files_count: int):
+        """Record that the model is complete; a resumed run skips it."""
+        self.append({"event": "model", "model": self.key, "files": files_count}, sync=True)
+
+
+class RunJournal(_JournalWriter):
+    """Journal of a batch run over many models."""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, resume: bool = False,
+                 options: Optional[Dict[str, Any]] = None, fresh: bool = False):
+        """Start a new journal, or continue an existing one.
+
+        Args:
+            path: Journal file
+            resume: If True, load the work recorded in an existing journal and append to it;
+                otherwise an existing journal is replaced
+            options: Run options stored in the run record (a resumed run warns if they changed)
+            fresh: Replace an existing journal even if its run did not finish
+
+        Raises:
+            UnfinishedJournalError: If the existing journal's run did not finish and neither
+                resume nor fresh is given
+        """
+        super().__init__(path)
+        self.resumed = resume
+        # Model key -> {source filename: destination filename}
+        self.moved: Dict[str, Dict[str, str]] = {}
+        # Model key -> collection path
+        self.collections: Dict[str, str] = {}
+        # Model key -> files count, for completed models
+        self.completed: Dict[str, int] = {}
+        previous_options = None
+
+        if resume:
+            previous_options = self._load()
+            if previous_options is not None and options is not None and previous_options != options:
+                print(f"Warning: Resuming journal {path} with different options than the interrupted run")
+        elif os.path.exists(path):
+            if not fresh and not journal_finished(path):
+                raise UnfinishedJournalError(
+                    f"Journal {path} belongs to a run that did not finish; resume it with --resume "
+                    f"or discard it with --fresh")
+            os.remove(path)
+
+        self.append({"event": "run", "started": datetime.now().isoformat(), "resumed": resume,
+                     "options": options}, sync=True)
+        # Models write through their own ModelJournal
+        self.close()
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        """Read the existing journal; returns the options of its first run record."""
+        options = None
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        for line in data.splitlines():
+            try:
+                record = json.loads(line)
+                event = record["event"]
+                key = record.get("model")
+                if event == "run" and options is None:
+                    options = record.get("options")
+                elif event == "move":
+                    self.moved.setdefault(key, {})[record["source"]] = record["dest"]
+                elif event == "collection":
+                    self.collections[key] = record["path"]
+                elif event == "model":
+                    self.completed[key] = record["files"]
+            except (ValueError, KeyError, TypeError):
+                # A record cut short when the run was killed
+                continue
+
+        if data and not data.endswith(b"\n"):
+            # Terminate the cut-off record so the next one starts on a line of its own
+            self._write(b"\n")
+        return options
+
+    def finish(self):
+        """Record that the run finished; a later run may then replace the journal."""
+        self.append({"event": "end", "finished": datetime.now().isoformat()}, sync=True)
+        self.close()
+
+    def is_done(self, key: str) -> bool:
+        """True if the model completed in an earlier run and its collection (if any) still exists."""
+        if key not in self.completed:
+            return False
+        collection = self.collections.get(key)
+        return collection is None or os.path.exists(collection)
+
+    def model(self, key: str) -> ModelJournal:
+        """Journal for one model, carrying the files it moved in earlier runs."""
+        return ModelJournal(self.path, key, self.moved.get(key), resumed=self.resumed)
+
+
+def journal_finished(path: str) -> bool:
+    """True if the last complete record of the journal at path is the end of a run."""
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines()
+    for line in reversed(lines):
+        try:
+            return json.loads(line)["event"] == "end"
+        except (ValueError, KeyError, TypeError):
+            # A record cut short when the run was killed
+            continue
+    # Nothing recorded: there is no run to lose
+    return not lines
@@ -0,0 +1,104 @@
+"""Tests for collection_checks and the item checks of validate_collection."""
+
+import json
+from concurrent.futures import Future
+
+import pytest
+
+import collection_checks
+from collection_checks import ItemChecker, check_item
+from postman_generator import PostmanCollectionGenerator
+
+
+def _item(name="TC#01_10001#rvn001#00W5#LR", raw='{"claim": 1}', method="POST"):
+    request = {"method": method, "url": {"raw": "{{baseUrl}}/api/validate/01_10001"},
+               "body": {"mode": "raw", "raw": raw, "options": {"raw": {"language": "json"}}}}
+    return {"name": name, "request": request}
+
+
+def _items(count):
+    """Items of which every 7th has a broken body and every 11th a name off the template."""
+    return [_item(name=f"TC#{index:02d}_1{index:04d}#rvn001#00W5#LR" if index % 11 else f"request {index}",
+                  raw='{"claim": ' if index % 7 == 3 else json.dumps({"claim": index}))
+            for index in range(1, count + 1)]
+
+
+def test_check_item():
+    assert check_item(_item(), minimal=False) == []
+    assert check_item(_item(raw="{"), minimal=False)[0].startswith("'TC#01_10001#rvn001#00W5#LR': raw body is not valid JSON")
+    assert check_item(_item(method=""), minimal=False) == ["'TC#01_10001#rvn001#00W5#LR': missing request method"]
+    assert check_item({"name": "folder", "item": [_item(raw="{")]}, minimal=False)[0].startswith("'folder' > item 1:")
+    assert check_item({"name": "x", "method": "GET", "url": "http://host"}, minimal=True) == []
+
+
+def test_check_names():
+    assert check_item(_item(), minimal=False, check_names=True) == []
+    assert check_item(_item(name="request"), minimal=False, check_names=True) == \
+        ["'request': name does not match TC#id#edit#code#suffix"]
+    assert check_item(_item(name="TC#01_1#rvn001#00W5#XX"), minimal=False, check_names=True) == \
+        ["'TC#01_1#rvn001#00W5#XX': unknown suffix 'XX'"]
+    # Names are only checked when asked for
+    assert check_item(_item(name="request"), minimal=False) == []
+
+
+def _check(items, **options):
+    with ItemChecker(**options) as checker:
+        for index, item in enumerate(items, 1):
+            checker.add(index, item, minimal=False)
+        problems = checker.finish()
+    return problems, checker
+
+
+@pytest.mark.parametrize("check_names", [False, True])
+def test_worker_pool_matches_in_process_checks(monkeypatch, check_names):
+    # Small chunks, so many are in flight and the oldest are waited for while adding
+    monkeypatch.setattr(collection_checks, "CHUNK_ITEMS", 8)
+    items = _items(300)
+
+    expected, sequential = _check(items, check_names=check_names)
+    problems, pooled = _check(items, check_names=check_names, jobs=2)
+
+    assert problems == expected
+    assert [index for index, _ in problems] == sorted(index for index, _ in problems)
+    assert len(expected) == len([index for index in range(1, 301) if index % 7 == 3]) + \
+        (len([index for index in range(1, 301) if index % 11 == 0]) if check_names else 0)
+    assert pooled.checked == sequential.checked == 300
+    assert pooled.skipped == 0
+
+
+class _StalledExecutor:
+    """Stands in for the process pool: chunks are accepted but never finish."""
+
+    def submit(self, *args):
+        return Future()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_waiting_for_a_chunk_respects_the_time_budget(monkeypatch):
+    monkeypatch.setattr(collection_checks, "CHUNK_ITEMS", 2)
+    checker = ItemChecker(jobs=2, time_budget=0.2)
+    checker._executor.shutdown()
+    checker._executor = _StalledExecutor()
+
+    # More chunks than the pool may hold: adding has to wait for the oldest one, but only
+    # until the budget runs out
+    for index in range(1, 21):
+        checker.add(index, _item(), minimal=False)
+    assert checker.finish() == []
+    assert checker.checked == 0
+    assert checker.skipped == 20
+
+
+def test_time_budget_marks_items_unchecked_and_the_collection_invalid(tmp_path):
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps({"info": {"name": "Budget", "schema": "v2.1"}, "item": _items(50)}))
+    generator = PostmanCollectionGenerator(output_dir=str(tmp_path / "out"))
+
+    result = generator.validate_collection(path, check_items=True, time_budget=0)
+
+    assert not result["valid"]
+    assert result["stats"]["items_unchecked"] == 50
+    assert result["stats"]["items_checked"] == 0
+    assert any("Time budget of 0s exceeded: 50 items not checked" in error for error in result["errors"])
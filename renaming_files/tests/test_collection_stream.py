@@ -0,0 +1,129 @@
+"""Tests for collection_stream."""
+
+import io
+import json
+
+import pytest
+
+from collection_stream import (ARRAY, CHUNK_SIZE, ELEMENT, VALUE, CollectionFormatError, check_json,
+                               iter_collection)
+
+CHECK_DOCUMENTS = [
+    '{"a": [1, 2.5, -3e2, true, false, null], "b": {"c": "d"}}',
+    '[{"x": "café € \U0001f600"}, {"y": "\\"quoted\\" \\\\ \\u00e9 \\ud83d\\ude00"}]',
+    '  {"nested": [[[[{"deep": [1, [2, [3]]]}]]]], "n": 12345.678e-9}  ',
+    '"just a string"',
+    '123.5',
+    '[]',
+    '{}',
+    '{"a": [1, 2,]}',
+    '{"a" 1}',
+    '[1 2]',
+    '{"a": tru}',
+    '{"a": "unterminated}',
+    '[1, 2]]',
+    '[1, 2] [3]',
+    '{"a": 1.}',
+    '',
+    '   ',
+    '﻿{}',
+    '{"a": "bad \\x escape"}',
+]
+
+
+def _is_valid(text):
+    try:
+        json.loads(text)
+    except ValueError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("text", CHECK_DOCUMENTS)
+def test_check_json_agrees_with_json_loads_for_every_buffer_size(text):
+    for chunk_size in range(1, len(text) + 2):
+        for piece_size in (1, 3, chunk_size):
+            pieces = [text[i:i + piece_size] for i in range(0, len(text), piece_size)]
+            if _is_valid(text):
+                check_json(pieces, chunk_size=chunk_size)
+            else:
+                with pytest.raises(CollectionFormatError):
+                    check_json(pieces, chunk_size=chunk_size)
+
+
+def test_check_json_reports_error_offset():
+    text = '{"items": [' + ", ".join(['{"a": 1}'] * 100) + ', {"a": }]}'
+    with pytest.raises(CollectionFormatError, match=rf"char {text.index('}]}')}"):
+        check_json([text], chunk_size=16)
+
+
+COLLECTION = {
+    "info": {"name": "Reclamación – 請求 \U0001f9fe", "schema": "v2.1"},
+    "item": [
+        {"name": "TC#01_1#rvn001#00W5#LR", "request": {"body": {"raw": "{\"note\": \"say \\\"hi\\\" – ünïcödé\"}"}}},
+        {"name": "quote \" and backslash \\ and é€\U0001f600", "value": 12345.678e-3},
+        [1, -2.5, True, False, None, "\u0000\u001f"],
+        "",
+    ],
+    "empty": [],
+    "variable": [{"key": "baseUrl", "value": "http://localhost:3000"}],
+    "count": 1234567890,
+}
+
+
+class _SplitRaw(io.RawIOBase):
+    """Raw binary file that returns its data in two reads, split at a given byte offset."""
+
+    def __init__(self, data: bytes, split: int):
+        self._reads = [data[:split], data[split:]]
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self._reads and not self._reads[0]:
+            self._reads.pop(0)
+        if not self._reads:
+            return 0
+        data = self._reads[0][:len(buffer)]
+        self._reads[0] = self._reads[0][len(data):]
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _text_file(data: bytes, split: int):
+    return io.TextIOWrapper(io.BufferedReader(_SplitRaw(data, split), buffer_size=8), encoding="utf-8")
+
+
+def _expected_events(document):
+    events = []
+    for key, value in document.items():
+        if isinstance(value, list):
+            events.append((key, ARRAY, None))
+            events.extend((key, ELEMENT, element) for element in value)
+        else:
+            events.append((key, VALUE, value))
+    return events
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, CHUNK_SIZE])
+def test_iter_collection_at_every_byte_split(chunk_size):
+    data = json.dumps(COLLECTION, ensure_ascii=False, indent=1).encode("utf-8")
+    expected = _expected_events(json.loads(data))
+
+    for split in range(len(data) + 1):
+        assert list(iter_collection(_text_file(data, split), chunk_size)) == expected, split
+
+
+def test_iter_collection_rejects_truncated_documents():
+    data = json.dumps(COLLECTION, ensure_ascii=False).encode("utf-8")
+    for end in range(len(data)):
+        text = data[:end].decode("utf-8", errors="ignore")
+        with pytest.raises(CollectionFormatError):
+            list(iter_collection(io.StringIO(text), chunk_size=5))
+
+
+@pytest.mark.parametrize("text", ['[{"a": 1}]', '{"a" 1}', '{"a": [1 2]}', '{"a": 1} {}', '{a: 1}'])
+def test_iter_collection_rejects_malformed_documents(text):
+    with pytest.raises(CollectionFormatError):
+        list(iter_collection(io.StringIO(text), chunk_size=3))
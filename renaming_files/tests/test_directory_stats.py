@@ -0,0 +1,81 @@
+"""Tests for directory_stats.collect_directory_stats and its cache."""
+
+import os
+
+import pytest
+
+import directory_stats
+from directory_stats import collect_directory_stats
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source = tmp_path / "renaming_jsons"
+    model = source / "TS_01_model" / "regression"
+    model.mkdir(parents=True)
+    for index in range(3):
+        (model / f"TC#{index:02d}_1000{index}#rvn001#00W5#LR.json").write_text("{}")
+    return source
+
+
+def _bump_mtime(path):
+    # Directory mtimes may not move on fast successive changes; make every change visible
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _model_dir(source_dir):
+    return source_dir / "TS_01_model" / "regression"
+
+
+def _scans(monkeypatch):
+    """Count the directory trees walked (i.e. not served from the cache)."""
+    walked = []
+    walk = directory_stats._walk_json_files
+    monkeypatch.setattr(directory_stats, "_walk_json_files", lambda path: walked.append(path) or walk(path))
+    return walked
+
+
+def test_unchanged_tree_is_served_from_the_cache(source_dir, monkeypatch):
+    first = collect_directory_stats(str(source_dir))
+    walked = _scans(monkeypatch)
+
+    assert collect_directory_stats(str(source_dir)) == first
+    assert walked == []
+    assert first["TS_01_model"]["total_files"] == 3
+
+
+@pytest.mark.parametrize("change", ["add", "remove", "rename"])
+def test_file_changes_invalidate_the_cache(source_dir, monkeypatch, change):
+    collect_directory_stats(str(source_dir))
+    model = _model_dir(source_dir)
+    existing = model / "TC#00_10000#rvn001#00W5#LR.json"
+    if change == "add":
+        (model / "TC#09_10009#rvn001#00W5#UN.json").write_text("{}")
+        expected_files, expected_suffixes = 4, ["LR", "UN"]
+    elif change == "remove":
+        existing.unlink()
+        expected_files, expected_suffixes = 2, ["LR"]
+    else:
+        existing.rename(model / "TC#00_10000#rvn001#00W5#UN.json")
+        expected_files, expected_suffixes = 3, ["LR", "UN"]
+    _bump_mtime(model)
+    walked = _scans(monkeypatch)
+
+    stats = collect_directory_stats(str(source_dir))["TS_01_model"]
+
+    assert len(walked) == 1
+    assert stats["total_files"] == expected_files
+    assert stats["suffixes"] == expected_suffixes
+    # The rescan is cached in turn
+    assert collect_directory_stats(str(source_dir))["TS_01_model"] == stats
+    assert len(walked) == 1
+
+
+def test_refresh_rescans(source_dir, monkeypatch):
+    collect_directory_stats(str(source_dir))
+    walked = _scans(monkeypatch)
+
+    collect_directory_stats(str(source_dir), refresh=True)
+
+    assert len(walked) == 1
@@ -0,0 +1,51 @@
+"""Tests for dynamic_models.ModelIndex."""
+
+import pytest
+
+from dynamic_models import ModelIndex
+
+
+def _model(ts_number, edit_id, code):
+    return {"ts_number": ts_number, "edit_id": edit_id, "code": code}
+
+
+@pytest.fixture
+def index():
+    return ModelIndex([
+        _model("01", "rvn001", "00W5"),
+        _model("07", "rvn007", "00W7"),
+        _model("07", "rvn017", "00W8"),
+        _model("100", "RULEEM000100", "00W28"),
+    ])
+
+
+def test_unique_ts_number(index):
+    assert index.get("TS01")["edit_id"] == "rvn001"
+    assert index.get("1")["edit_id"] == "rvn001"
+    assert index.get("99") is None
+    assert [model["edit_id"] for model in index.resolve("01,100")] == ["rvn001", "RULEEM000100"]
+
+
+def test_shared_ts_number_is_ambiguous(index):
+    with pytest.raises(ValueError, match="TS07 is ambiguous.*rvn007_00W7, rvn017_00W8"):
+        index.get("07")
+    with pytest.raises(ValueError, match="ambiguous"):
+        index.resolve("01,TS07")
+
+
+def test_matches_lists_every_model_of_a_ts_number_in_discovery_order(index):
+    # The legacy --TSNN flags take the first of these instead of failing
+    assert [model["edit_id"] for model in index.matches("TS07")] == ["rvn007", "rvn017"]
+    assert [model["edit_id"] for model in index.matches("1")] == ["rvn001"]
+    assert index.matches("99") == []
+    assert index.matches("rvn001") == []
+
+
+def test_range_selects_every_model_of_a_shared_ts_number(index):
+    assert [model["edit_id"] for model in index.resolve("1-10")] == ["rvn001", "rvn007", "rvn017"]
+
+
+def test_models_sharing_a_ts_number_are_selected_by_edit_id_or_code(index):
+    assert [model["edit_id"] for model in index.resolve("rvn017,00W7,rvn017")] == ["rvn017", "rvn007"]
+    with pytest.raises(ValueError, match="No model found"):
+        index.resolve("rvn999")
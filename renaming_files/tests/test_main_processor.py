@@ -0,0 +1,36 @@
+"""Tests for the main_processor command line and fused rename_files."""
+
+import json
+import sys
+
+import pytest
+
+import main_processor
+
+
+@pytest.mark.parametrize("option", ["--incremental", "--deterministic"])
+def test_fused_cannot_be_combined_with_full_payload_builds(monkeypatch, capsys, option):
+    monkeypatch.setattr(sys, "argv", ["main_processor.py", "--wgs_csbd", "--all", "--fused", option])
+    with pytest.raises(SystemExit) as exit_info:
+        main_processor.main()
+    assert exit_info.value.code == 2
+    assert "--fused cannot be combined with --incremental or --deterministic" in capsys.readouterr().err
+
+
+def test_fused_is_turned_off_for_a_deterministic_build(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    for index in range(3):
+        (source_dir / f"TC#{index:02d}_1000{index}#deny.json").write_text(json.dumps({"claim": index}))
+
+    renamed = main_processor.rename_files(edit_id="rvn001", code="00W5", source_dir=str(source_dir),
+                                          dest_dir=str(tmp_path / "dest"), quiet=True, fused=True,
+                                          generator_options={"deterministic": True})
+
+    out = capsys.readouterr().out
+    assert len(renamed) == 3
+    assert "Fused mode is off for this run" in out
+    assert "while moving files" not in out
+    assert "Generating Postman collection..." in out
+    assert list((tmp_path / "postman_collections").rglob("*.json"))
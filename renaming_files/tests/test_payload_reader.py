@@ -0,0 +1,55 @@
+"""Tests for payload_reader.map_ordered."""
+
+import random
+import threading
+import time
+
+import pytest
+
+from payload_reader import map_ordered
+
+
+def _slow_square(value):
+    time.sleep(random.uniform(0, 0.003))
+    return value * value
+
+
+@pytest.mark.parametrize("concurrency", [1, 2, 8])
+def test_results_keep_input_order(concurrency):
+    assert list(map_ordered(_slow_square, range(200), concurrency)) == [value * value for value in range(200)]
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_exception_is_raised_at_the_failing_item(concurrency):
+    def func(value):
+        if value == 5:
+            raise ValueError("item 5")
+        return _slow_square(value)
+
+    results = []
+    with pytest.raises(ValueError, match="item 5"):
+        for result in map_ordered(func, range(20), concurrency):
+            results.append(result)
+    assert results == [value * value for value in range(5)]
+
+
+def test_early_exit_stops_the_producer():
+    started = []
+
+    def items():
+        value = 0
+        while True:
+            started.append(value)
+            yield value
+            value += 1
+
+    results = map_ordered(_slow_square, items(), concurrency=4)
+    assert [next(results) for _ in range(3)] == [0, 1, 4]
+    results.close()
+
+    # Only reads already in flight (and queued results) were started, and nothing is left running
+    assert len(started) <= 3 + 4 * 3
+    count = len(started)
+    time.sleep(0.05)
+    assert len(started) == count
+    assert not any(thread.name.startswith("payload-reader") for thread in threading.enumerate())
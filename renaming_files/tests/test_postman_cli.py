@@ -0,0 +1,31 @@
+"""Tests for the postman_cli commands."""
+
+import sys
+
+import pytest
+
+import postman_cli
+
+
+def _run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["postman_cli.py", *argv])
+    postman_cli.main()
+
+
+@pytest.fixture
+def invalid_collection(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "collection.json"
+    path.write_text('{"bad": 1}')
+    return str(path)
+
+
+def test_validate_reports_an_invalid_collection_without_failing(invalid_collection, monkeypatch, capsys):
+    _run(monkeypatch, "validate", "--collection-path", invalid_collection)
+    assert "Collection has errors" in capsys.readouterr().out
+
+
+def test_validate_strict_fails_on_an_invalid_collection(invalid_collection, monkeypatch):
+    with pytest.raises(SystemExit) as exit_info:
+        _run(monkeypatch, "validate", "--collection-path", invalid_collection, "--strict")
+    assert exit_info.value.code == 1
@@ -0,0 +1,190 @@
+"""Tests for postman_generator."""
+
+import argparse
+import json
+import tracemalloc
+
+import pytest
+
+import postman_generator
+from postman_generator import (PostmanCollectionGenerator, _MappedPayload, add_generator_arguments,
+                               check_generator_arguments, generator_options, open_collection_file, zstandard)
+
+
+def _large_payload(lines: int) -> str:
+    return json.dumps({"claim": {"lines": [{"line": i, "code": "0450", "desc": "é" * 40}
+                                           for i in range(lines)]}})
+
+
+@pytest.fixture
+def generator(tmp_path):
+    return PostmanCollectionGenerator(source_dir=str(tmp_path), output_dir=str(tmp_path / "out"),
+                                      body_mode="raw", mmap_threshold=1 << 16)
+
+
+def test_large_payload_is_checked_without_materializing(generator, tmp_path):
+    text = _large_payload(60000)
+    payload_file = tmp_path / "TC#01_1#E#C#LR.json"
+    payload_file.write_text(text, encoding="utf-8")
+    size = payload_file.stat().st_size
+    assert size > 4 << 20
+
+    tracemalloc.start()
+    try:
+        body = generator._read_payload_body(payload_file)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert isinstance(body, _MappedPayload)
+    # The check holds a few buffers of the file at most, never the whole text
+    assert peak < size // 4
+    assert "".join(body.chunks()) == text
+
+
+def test_invalid_large_payload_is_rejected(generator, tmp_path, capsys):
+    text = _large_payload(30000)
+    middle = len(text) // 2
+    payload_file = tmp_path / "TC#01_1#E#C#LR.json"
+    # Drop a comma between two array elements in the middle of the file
+    cut = text.index("}, {", middle)
+    payload_file.write_text(text[:cut + 1] + text[cut + 2:], encoding="utf-8")
+
+    body = generator._read_payload_body(payload_file)
+
+    assert body == "{}"
+    assert "Could not read" in capsys.readouterr().out
+
+
+def test_truncated_large_payload_is_rejected(generator, tmp_path):
+    payload_file = tmp_path / "TC#01_1#E#C#LR.json"
+    payload_file.write_text(_large_payload(30000)[:-3], encoding="utf-8")
+
+    assert generator._read_payload_body(payload_file) == "{}"
+
+
+@pytest.mark.parametrize("compression", [
+    None,
+    "gzip",
+    pytest.param("zstd", marks=pytest.mark.skipif(zstandard is None, reason="zstandard is not installed")),
+])
+def test_incremental_rebuild_with_reordered_items(tmp_path, monkeypatch, capsys, compression):
+    source_dir = tmp_path / "payloads"
+    source_dir.mkdir()
+    for index in range(6):
+        (source_dir / f"TC#{index:02d}_1000{index}#rvn001#00W5#LR.json").write_text(
+            json.dumps({"claim": index, "lines": ["x" * 100] * index}))
+    generator = PostmanCollectionGenerator(source_dir=str(source_dir), output_dir=str(tmp_path / "out"),
+                                           incremental=True, compression=compression)
+    first = generator.generate_postman_collection("Reorder")
+    with open_collection_file(first) as f:
+        names = [item["name"] for item in json.load(f)["item"]]
+
+    # Non-deterministic builds take the files in directory order, which may change between runs
+    find_json_files = generator._find_json_files
+    monkeypatch.setattr(generator, "_find_json_files", lambda: find_json_files()[::-1])
+    capsys.readouterr()
+    second = generator.generate_postman_collection("Reorder")
+
+    assert second == first
+    with open_collection_file(second) as f:
+        collection = json.load(f)
+    assert [item["name"] for item in collection["item"]] == names[::-1]
+    assert [json.loads(item["request"]["body"]["raw"])["claim"] for item in collection["item"]] == \
+        [int(name.split("#")[1][:2]) for name in names[::-1]]
+    assert "reused" in capsys.readouterr().out
+
+
+def _write_payloads(source_dir, count=6):
+    source_dir.mkdir()
+    for index in range(count):
+        (source_dir / f"TC#{index:02d}_1000{index}#rvn001#00W5#LR.json").write_text(json.dumps({"claim": index}))
+
+
+def _collection_names(output_dir):
+    return sorted(path.name for path in (output_dir / "Switch").iterdir())
+
+
+def test_switching_between_sharded_and_single_file_output(tmp_path):
+    source_dir = tmp_path / "payloads"
+    output_dir = tmp_path / "out"
+    _write_payloads(source_dir)
+
+    def generate(**options):
+        generator = PostmanCollectionGenerator(source_dir=str(source_dir), output_dir=str(output_dir), **options)
+        return generator.generate_postman_collection("Switch")
+
+    generate(max_shard_items=2)
+    assert _collection_names(output_dir) == ["postman_collection.index.json", "postman_collection.part001.json",
+                                             "postman_collection.part002.json", "postman_collection.part003.json"]
+
+    generate(incremental=True)
+    assert _collection_names(output_dir) == ["postman_collection.json", "postman_collection.json.manifest.json"]
+
+    generate(max_shard_items=3)
+    assert _collection_names(output_dir) == ["postman_collection.index.json", "postman_collection.part001.json",
+                                             "postman_collection.part002.json"]
+
+    generate()
+    assert _collection_names(output_dir) == ["postman_collection.json"]
+    generator = PostmanCollectionGenerator(output_dir=str(output_dir))
+    results = list(generator.validate_collections(generator.find_collection_files(), jobs=1))
+    assert sum(result["stats"].get("total_requests", 0) for _, result, _ in results) == 6
+
+
+def test_generator_arguments_map_to_generator_options(tmp_path):
+    parser = argparse.ArgumentParser()
+    add_generator_arguments(parser)
+
+    args = parser.parse_args(["--body-mode", "raw", "--max-shard-mb", "1.5", "--compress", "gzip"])
+    check_generator_arguments(parser, args)
+    options = generator_options(args)
+
+    assert options["max_shard_bytes"] == int(1.5 * 1024 * 1024)
+    assert options["compression"] == "gzip" and options["body_mode"] == "raw"
+    PostmanCollectionGenerator(output_dir=str(tmp_path), **options)
+    with pytest.raises(SystemExit):
+        check_generator_arguments(parser, parser.parse_args(["--incremental", "--max-shard-items", "10"]))
+
+
+@pytest.mark.parametrize("sharded", [False, True])
+def test_switching_compression_leaves_one_variant(tmp_path, sharded):
+    source_dir = tmp_path / "payloads"
+    output_dir = tmp_path / "out"
+    _write_payloads(source_dir)
+    compressions = [None, "gzip"] + (["zstd"] if zstandard is not None else []) + [None]
+    shard_options = {"max_shard_items": 4} if sharded else {}
+
+    for compression in compressions:
+        generator = PostmanCollectionGenerator(source_dir=str(source_dir), output_dir=str(output_dir),
+                                               compression=compression, incremental=not sharded, **shard_options)
+        generator.generate_postman_collection("Switch")
+        extension = {None: "", "gzip": ".gz", "zstd": ".zst"}[compression]
+        if sharded:
+            expected = ["postman_collection.index.json", f"postman_collection.part001.json{extension}",
+                        f"postman_collection.part002.json{extension}"]
+        else:
+            expected = [f"postman_collection.json{extension}", f"postman_collection.json{extension}.manifest.json"]
+        assert _collection_names(output_dir) == expected
+
+        results = list(generator.validate_collections(generator.find_collection_files(), jobs=1))
+        assert sum(result["stats"].get("total_requests", 0) for _, result, _ in results) == 6
+
+
+def test_zstd_without_the_package_is_rejected_when_parsing(monkeypatch, capsys):
+    monkeypatch.setattr(postman_generator, "zstandard", None)
+    parser = argparse.ArgumentParser()
+    add_generator_arguments(parser)
+
+    with pytest.raises(SystemExit):
+        check_generator_arguments(parser, parser.parse_args(["--compress", "zstd"]))
+    assert "requires the zstandard package" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("text, valid", [('{"a": [1, 2.5, "é"]}', True), ('{"a": [1, 2.5,]}', False),
+                                         ('{"a": 1} {}', False), ('﻿{"a": 1}', False)])
+def test_small_payload_is_checked_in_raw_mode(generator, tmp_path, text, valid):
+    payload_file = tmp_path / "TC#01_1#E#C#LR.json"
+    payload_file.write_text(text, encoding="utf-8")
+
+    assert generator._read_payload_body(payload_file) == (text if valid else "{}")
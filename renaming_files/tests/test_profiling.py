@@ -0,0 +1,69 @@
+"""Tests for profiling.write_collapsed_stacks."""
+
+import marshal
+import pstats
+
+import pytest
+
+import profiling
+
+
+def _diamond_stats(tmp_path, layers):
+    """pstats.Stats for main -> layers of two functions, each called by both functions of the layer above.
+
+    There are 2 ** layers call paths from main to the last layer. Every function has one
+    second of own time.
+    """
+    def func(layer, name):
+        return ("graph.py", layer, name if layer < 0 else f"{name}{layer}")
+
+    entries = {}
+    cumulative = 1.0
+    for layer in reversed(range(layers)):
+        for name in "ab":
+            if layer == 0:
+                callers = {func(-1, "main"): (1, 1, 1.0, cumulative)}
+            else:
+                callers = {func(layer - 1, parent): (1, 1, 0.5, cumulative / 2) for parent in "ab"}
+            entries[func(layer, name)] = (2, 2, 1.0, cumulative, callers)
+        # A function's cumulative time: its own second plus one call into each function below
+        cumulative += 1.0
+    entries[func(-1, "main")] = (1, 1, 1.0, 1.0 + 2 * (cumulative - 1.0), {})
+
+    path = tmp_path / "graph.pstats"
+    with open(path, "wb") as f:
+        marshal.dump(entries, f)
+    return pstats.Stats(str(path)), entries[func(-1, "main")][3]
+
+
+def _read_collapsed(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.rsplit(" ", 1) for line in f.read().splitlines()]
+
+
+def test_small_graph_is_expanded_in_full(tmp_path):
+    stats, total = _diamond_stats(tmp_path, 3)
+    path = tmp_path / "small.collapsed"
+
+    written = profiling.write_collapsed_stacks(stats, str(path))
+
+    lines = _read_collapsed(path)
+    # main, 2 functions below it, 4 paths to the second layer and 8 to the third
+    assert written == len(lines) == 1 + 2 + 4 + 8
+    assert ["graph.py:main", "1000000"] in lines
+    assert sum(int(microseconds) for _, microseconds in lines) == round(total * 1_000_000)
+
+
+def test_exponential_graph_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "_MAX_STACK_PATHS", 500)
+    # 2 ** 40 call paths: without the cap this would never finish
+    stats, total = _diamond_stats(tmp_path, 40)
+    path = tmp_path / "large.collapsed"
+
+    written = profiling.write_collapsed_stacks(stats, str(path))
+
+    lines = _read_collapsed(path)
+    assert written == len(lines) <= 500 + 1
+    # Time below the paths that were not expanded is counted in their callers (paths
+    # rounding to 0 microseconds are left out of the file)
+    assert sum(int(microseconds) for _, microseconds in lines) == pytest.approx(total * 1_000_000, rel=1e-4)
@@ -0,0 +1,158 @@
+"""Tests for run_journal and the journaled main_processor.rename_files."""
+
+import json
+import os
+
+import pytest
+
+import main_processor
+from run_journal import RunJournal, UnfinishedJournalError, journal_finished, model_key
+
+EDIT_ID = "rvn001"
+CODE = "00W5"
+
+
+@pytest.fixture
+def model_dirs(tmp_path):
+    source_dir = tmp_path / "source"
+    dest_dir = tmp_path / "dest"
+    source_dir.mkdir()
+    for index in range(5):
+        (source_dir / f"TC#{index:02d}_1000{index}#deny.json").write_text(json.dumps({"claim": index}))
+    return str(source_dir), str(dest_dir)
+
+
+def _records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _rename(source_dir, dest_dir, journal):
+    return main_processor.rename_files(edit_id=EDIT_ID, code=CODE, source_dir=source_dir, dest_dir=dest_dir,
+                                       generate_postman=False, quiet=True,
+                                       journal=journal.model(model_key(source_dir)))
+
+
+def _crash_after(monkeypatch, moves):
+    """Make main_processor.move_file kill the run once `moves` files were moved."""
+    real_move = main_processor.move_file
+    done = []
+
+    def move_file(source_path, dest_path):
+        if len(done) == moves:
+            raise KeyboardInterrupt
+        done.append(source_path)
+        return real_move(source_path, dest_path)
+
+    monkeypatch.setattr(main_processor, "move_file", move_file)
+
+
+def test_resume_moves_only_the_files_left(tmp_path, model_dirs, monkeypatch):
+    source_dir, dest_dir = model_dirs
+    path = str(tmp_path / "journal.jsonl")
+
+    journal = RunJournal(path)
+    _crash_after(monkeypatch, 2)
+    with pytest.raises(KeyboardInterrupt):
+        _rename(source_dir, dest_dir, journal)
+    monkeypatch.undo()
+    assert len(os.listdir(source_dir)) == 3
+    assert not journal_finished(path)
+
+    resumed = RunJournal(path, resume=True)
+    key = model_key(source_dir)
+    assert len(resumed.moved[key]) == 2
+    assert not resumed.is_done(key)
+
+    renamed = _rename(source_dir, dest_dir, resumed)
+    resumed.finish()
+
+    assert len(renamed) == 5
+    assert os.listdir(source_dir) == []
+    assert sorted(os.listdir(dest_dir)) == sorted(renamed)
+    moves = [record for record in _records(path) if record["event"] == "move"]
+    assert len(moves) == 5
+    assert RunJournal(path, resume=True).is_done(key)
+
+
+def test_resume_recovers_moves_missing_from_the_journal(tmp_path, model_dirs, monkeypatch):
+    source_dir, dest_dir = model_dirs
+    path = str(tmp_path / "journal.jsonl")
+
+    journal = RunJournal(path)
+    _crash_after(monkeypatch, 3)
+    with pytest.raises(KeyboardInterrupt):
+        _rename(source_dir, dest_dir, journal)
+    monkeypatch.undo()
+    # The last move record never reached the disk
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(lines[:-1])
+
+    resumed = RunJournal(path, resume=True)
+    assert len(resumed.moved[model_key(source_dir)]) == 2
+    renamed = _rename(source_dir, dest_dir, resumed)
+
+    assert len(renamed) == 5
+    assert sorted(renamed) == sorted(os.listdir(dest_dir))
+    assert RunJournal(path, resume=True).completed[model_key(source_dir)] == 5
+
+
+def test_load_skips_a_truncated_record(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = RunJournal(path)
+    model = journal.model("model-a")
+    model.record_move("a.json", "A.json")
+    model.record_move("b.json", "B.json")
+    model.close()
+    with open(path, "ab") as f:
+        f.write(b'{"event": "move", "model": "model-a", "sou')
+
+    resumed = RunJournal(path, resume=True)
+    assert resumed.moved == {"model-a": {"a.json": "A.json", "b.json": "B.json"}}
+
+    model = resumed.model("model-a")
+    model.record_done(2)
+    model.close()
+    # The cut-off record was terminated, so the records after it are read back
+    assert RunJournal(path, resume=True).completed == {"model-a": 2}
+
+
+def test_is_done_requires_the_collection_to_exist(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    collection = tmp_path / "collection.json"
+    collection.write_text("{}")
+    journal = RunJournal(path)
+    for key, collection_path in (("with-collection", collection), ("without-collection", None)):
+        model = journal.model(key)
+        if collection_path is not None:
+            model.record_collection(collection_path)
+        model.record_done(1)
+        model.close()
+
+    resumed = RunJournal(path, resume=True)
+    assert resumed.is_done("with-collection")
+    assert resumed.is_done("without-collection")
+    assert not resumed.is_done("never-started")
+
+    collection.unlink()
+    assert not RunJournal(path, resume=True).is_done("with-collection")
+
+
+def test_unfinished_journal_is_not_replaced(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    model = RunJournal(path).model("model-a")
+    model.record_move("a.json", "A.json")
+    model.close()
+
+    with pytest.raises(UnfinishedJournalError):
+        RunJournal(path)
+    assert RunJournal(path, resume=True).moved == {"model-a": {"a.json": "A.json"}}
+
+    fresh = RunJournal(path, fresh=True)
+    assert [record["event"] for record in _records(path)] == ["run"]
+    fresh.finish()
+    # A finished journal is replaced by the next run
+    RunJournal(path)
+    assert [record["event"] for record in _records(path)] == ["run"]